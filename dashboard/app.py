@@ -1,8 +1,19 @@
-from flask import Flask
-from utils.performance import PerformanceMonitor
+import requests
+from flask import Flask, Response, jsonify
+from utils import get_env, health_report
+from utils.performance import PerformanceMonitor, metrics
+
+# The pipeline runs in the market-data daemon (zpt_marketdata.py); with MARKETDATA_URL set,
+# /metrics and /health report its registry instead of this web process's own, mostly idle one
+MARKETDATA_URL = get_env("MARKETDATA_URL", "")
 
 app = Flask(__name__)
 
+def _daemon(path: str) -> requests.Response:
+    resp = requests.get(f"{MARKETDATA_URL}{path}", timeout=5)
+    resp.raise_for_status()
+    return resp
+
 @app.route("/")
 def home():
     monitor = PerformanceMonitor()
@@ -13,5 +24,24 @@ def home():
     elapsed = monitor.elapsed()
     return f"Dashboard loaded! PerformanceMonitor: {elapsed:.4f} seconds"
 
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus text exposition of stage histograms and upstream call counters."""
+    if not MARKETDATA_URL:
+        return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+    try:
+        return Response(_daemon("/metrics").text, mimetype="text/plain; version=0.0.4")
+    except requests.RequestException as e:
+        return Response(f"# market-data daemon unreachable: {e}\n", status=502, mimetype="text/plain")
+
+@app.route("/health")
+def health():
+    if not MARKETDATA_URL:
+        return jsonify(health_report())
+    try:
+        return jsonify(_daemon("/status").json())
+    except requests.RequestException as e:
+        return jsonify({"error": f"market-data daemon unreachable: {e}"}), 502
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
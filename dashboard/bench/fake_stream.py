@@ -0,0 +1,95 @@
+"""Local websocket stand-in for the Binance combined stream and Bybit public linear stream.
+
+Emits miniTicker/kline (Binance) and tickers (Bybit) messages from the same
+deterministic price path as FakeUpstream, so streamed and REST data agree.
+`drop_after` closes every connection after N messages to exercise reconnects;
+`subscriptions` records what each connection asked for.
+"""
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+from websockets.asyncio.server import serve
+
+from bench.fake_upstream import kline, mid_price
+from utils.resample import bar_open
+
+class FakeStream:
+    def __init__(self, interval_s: float = 0.2, drop_after=None):
+        self.interval_s = interval_s
+        self.drop_after = drop_after
+        self.connections = 0
+        self.subscriptions = []  # ("binance", streams) / ("bybit", topics) per connection
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+        self._ready = threading.Event()
+
+    @property
+    def binance_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    @property
+    def bybit_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/v5/public/linear"
+
+    def _binance_messages(self, streams):
+        now = int(time.time() * 1000)
+        for stream in streams:
+            symbol, kind = stream.split("@", 1)
+            symbol = symbol.upper()
+            if kind == "miniTicker":
+                data = {"e": "24hrMiniTicker", "E": now, "s": symbol, "c": f"{mid_price(symbol, now):.8f}"}
+            else:
+                interval = kind.split("_", 1)[1]
+                row = kline(symbol, interval, bar_open(now, interval))
+                data = {"e": "kline", "E": now, "s": symbol, "k": {
+                    "t": row[0], "T": row[6], "s": symbol, "i": interval, "o": row[1], "h": row[2], "l": row[3],
+                    "c": f"{mid_price(symbol, now):.8f}", "v": row[5], "n": row[8], "x": False,
+                    "q": row[7], "V": "0", "Q": "0"}}
+            yield {"stream": stream, "data": data}
+
+    async def _handler(self, ws):
+        self.connections += 1
+        parsed = urlparse(ws.request.path)
+        sent = 0
+        if parsed.path.startswith("/v5/public"):
+            sub = json.loads(await ws.recv())
+            await ws.send(json.dumps({"success": True, "op": "subscribe"}))
+            topics = [t for t in sub.get("args", []) if t.startswith("tickers.")]
+            self.subscriptions.append(("bybit", topics))
+        else:
+            streams = parse_qs(parsed.query).get("streams", [""])[0].split("/")
+            self.subscriptions.append(("binance", streams))
+        try:
+            while self.drop_after is None or sent < self.drop_after:
+                if parsed.path.startswith("/v5/public"):
+                    now = int(time.time() * 1000)
+                    msgs = [{"topic": t, "type": "snapshot", "ts": now,
+                             "data": {"symbol": t.split(".", 1)[1], "lastPrice": f"{mid_price(t.split('.', 1)[1], now):.8f}"}}
+                            for t in topics]
+                else:
+                    msgs = list(self._binance_messages(streams))
+                for msg in msgs:
+                    await ws.send(json.dumps(msg))
+                    sent += 1
+                await asyncio.sleep(self.interval_s)
+        except Exception:
+            pass
+
+    async def _start(self):
+        self._server = await serve(self._handler, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        await self._server.serve_forever()
+
+    def start(self) -> "FakeStream":
+        threading.Thread(target=self._loop.run_until_complete, args=(self._start(),), daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
@@ -0,0 +1,274 @@
+"""Local stand-in for Binance, Bybit, MetalPriceAPI and OpenAI used by the benchmarks.
+
+Responses are replayed from recorded fixtures (see record.py) when present in the
+fixtures directory, otherwise synthesized deterministically so the suite runs
+fully offline. Latency and error injection are configurable per server.
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from utils.resample import INTERVAL_MS, bar_open
+from utils.scheduler import request_weight
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SYNTH_MS = INTERVAL_MS["15m"]  # finest synthesized bar; longer intervals aggregate these
+BASE_SYMBOLS = ["BTCUSDT", "ETHUSDT", "DOGEUSDT", "SHIBUSDT", "PEPEUSDT"]
+NEW_COIN_LIST_TIME = 1700000000000  # newer than get_new_bybit_coins' cutoff
+
+def _seed(*parts) -> int:
+    return zlib.crc32("|".join(str(p) for p in parts).encode())
+
+def base_price(symbol: str) -> float:
+    return {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0, "DOGEUSDT": 0.15, "SHIBUSDT": 0.00002, "PEPEUSDT": 0.00001}.get(
+        symbol, 1 + _seed(symbol) % 1000 / 10)
+
+def mid_price(symbol: str, t_ms: int) -> float:
+    """Smooth, deterministic price path so consecutive candles line up."""
+    phase = _seed(symbol) % 1000
+    hours = t_ms / 3_600_000
+    return base_price(symbol) * (1 + 0.04 * math.sin(hours / 9 + phase) + 0.015 * math.sin(hours / 1.7 + phase))
+
+def kline(symbol: str, interval: str, open_time: int) -> list:
+    step = INTERVAL_MS[interval]
+    if step > SYNTH_MS:
+        # Like the exchange, a long bar is the aggregate of the short bars it spans
+        subs = [kline(symbol, "15m", t) for t in range(open_time, open_time + step, SYNTH_MS)]
+        vol, qav = sum(float(k[5]) for k in subs), sum(float(k[7]) for k in subs)
+        return [open_time, subs[0][1], f"{max(float(k[2]) for k in subs):.8f}", f"{min(float(k[3]) for k in subs):.8f}",
+                subs[-1][4], f"{vol:.4f}", open_time + step - 1, f"{qav:.4f}", sum(k[8] for k in subs), "0", "0", "0"]
+    o, c = mid_price(symbol, open_time), mid_price(symbol, open_time + step)
+    rng = random.Random(_seed(symbol, interval, open_time))
+    h = max(o, c) * (1 + rng.uniform(0, 0.006))
+    lo = min(o, c) * (1 - rng.uniform(0, 0.006))
+    vol = rng.uniform(50, 150) * (3 if rng.random() < 0.05 else 1)
+    return [open_time, f"{o:.8f}", f"{h:.8f}", f"{lo:.8f}", f"{c:.8f}", f"{vol:.4f}",
+            open_time + step - 1, f"{vol * c:.4f}", rng.randint(100, 1000), "0", "0", "0"]
+
+class FakeUpstream:
+    """Threaded HTTP server; call start() and point the *_API_URL env vars at `url`."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 new_coins: int = 20, fixtures_dir: str = FIXTURES_DIR, seed: int = 42, token_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms  # gap between streamed completion chunks
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.symbols = BASE_SYMBOLS + [f"NEW{i}USDT" for i in range(new_coins)]
+        self.new_coins = self.symbols[len(BASE_SYMBOLS):]
+        self.fixtures_dir = fixtures_dir
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = {}
+        self._weight = {}  # minute -> Binance weight used, echoed in X-MBX-USED-WEIGHT-1M
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeUpstream":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _fixture(self, name: str):
+        path = os.path.join(self.fixtures_dir, f"{name}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return None
+
+    def _delay_and_fail(self) -> int:
+        with self._rng_lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+            fail = self._rng.random() < self.error_rate
+            status = self._rng.choice([429, 500, 502]) if fail else 200
+        if delay:
+            time.sleep(delay / 1000)
+        return status
+
+    def _charge(self, path: str, q: dict) -> int:
+        """Add this request's Binance weight to the current minute; return the minute's total."""
+        minute = int(time.time() // 60)
+        with self._rng_lock:
+            self._weight[minute] = self._weight.get(minute, 0) + request_weight("binance", path, q)
+            return self._weight[minute]
+
+    # --- endpoint bodies ---
+
+    def binance_ticker(self, q):
+        now = int(time.time() * 1000)
+        tickers = self._fixture("binance_ticker_price") or [
+            {"symbol": s, "price": f"{mid_price(s, now):.8f}"} for s in self.symbols[:len(BASE_SYMBOLS)]]
+        if "symbol" in q:
+            match = [t for t in tickers if t["symbol"] == q["symbol"]]
+            if not match and q["symbol"] in self.symbols:
+                match = [{"symbol": q["symbol"], "price": f"{mid_price(q['symbol'], now):.8f}"}]
+            return (200, match[0]) if match else (400, {"code": -1121, "msg": "Invalid symbol."})
+        return 200, tickers
+
+    def binance_klines(self, q):
+        symbol, interval = q.get("symbol"), q.get("interval", "1h")
+        if symbol not in self.symbols or interval not in INTERVAL_MS:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        limit = min(int(q.get("limit", 500)), 1000)
+        recorded = self._fixture(f"binance_klines_{symbol}_{interval}")
+        if recorded is not None:
+            return 200, recorded[-limit:]
+        step = INTERVAL_MS[interval]
+        last_open = bar_open(int(time.time() * 1000), interval)
+        if "startTime" in q:
+            first = bar_open(int(q["startTime"]) - 1, interval) + step
+            opens = range(first, min(last_open, first + (limit - 1) * step) + 1, step)
+        elif "endTime" in q:
+            last = min(last_open, bar_open(int(q["endTime"]), interval))
+            opens = range(last - (limit - 1) * step, last + 1, step)
+        else:
+            opens = range(last_open - (limit - 1) * step, last_open + 1, step)
+        return 200, [kline(symbol, interval, t) for t in opens]
+
+    def bybit_tickers(self, q):
+        category = q.get("category", "linear")
+        now = int(time.time() * 1000)
+        tickers = self._fixture(f"bybit_tickers_{category}")
+        if tickers is None:
+            symbols = self.symbols if category == "spot" else self.symbols[:len(BASE_SYMBOLS)]
+            tickers = [{"symbol": s, "lastPrice": f"{mid_price(s, now) * 1.0002:.8f}"} for s in symbols]
+            if category == "spot":
+                for t in tickers:
+                    if t["symbol"] in self.new_coins:
+                        t["listTime"] = str(NEW_COIN_LIST_TIME)
+        if "symbol" in q:
+            tickers = [t for t in tickers if t["symbol"] == q["symbol"]]
+        return 200, {"retCode": 0, "retMsg": "OK", "result": {"category": category, "list": tickers}}
+
+    def metalprice_latest(self, q):
+        return 200, self._fixture("metalprice_latest") or {
+            "success": True, "base": "USD", "timestamp": int(time.time()), "rates": {"XAU": 1 / 2400.0}}
+
+    def openai_chat(self, body):
+        recorded = self._fixture("openai_chat")
+        if recorded is not None:
+            return 200, recorded
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        content = ("Multi-timeframe structure is aligned; price swept liquidity below the range (SMC) "
+                   "on rising volume (Wyckoff) and printed a bullish rejection candle. ") + f"[{len(prompt)} chars]"
+        return 200, {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "gpt-4"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 40, "total_tokens": 90},
+        }
+
+    def openai_chunks(self, body):
+        """Server-sent chat.completion.chunk events for a stream=true request, one per word."""
+        _, completion = self.openai_chat(body)
+        content = completion["choices"][0]["message"]["content"]
+        words = content.split(" ")
+        base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                "model": completion["model"]}
+        yield dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for i, word in enumerate(words):
+            if self.token_ms:
+                time.sleep(self.token_ms / 1000)
+            text = word if i == len(words) - 1 else word + " "
+            yield dict(base, choices=[{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+        yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client cancelled (e.g. the losing side of a price race)
+
+            def _send_events(self, events):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for event in events:
+                        data = f"data: {json.dumps(event)}\n\n".encode()
+                        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                        self.wfile.flush()
+                    done = b"data: [DONE]\n\n"
+                    self.wfile.write(f"{len(done):x}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # client stopped reading (cancelled stream)
+
+            def _route(self, body=None):
+                parsed = urlparse(self.path)
+                q = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                upstream.requests[parsed.path] = upstream.requests.get(parsed.path, 0) + 1
+                status = upstream._delay_and_fail()
+                headers = {}
+                if parsed.path.startswith("/api/v3/"):
+                    headers["X-MBX-USED-WEIGHT-1M"] = str(upstream._charge(parsed.path, q))
+                if status != 200:
+                    if status == 429:
+                        headers["Retry-After"] = "1"
+                    return self._send(status, {"code": status, "msg": "injected error"}, headers)
+                routes = {
+                    "/api/v3/ticker/price": upstream.binance_ticker,
+                    "/api/v3/klines": upstream.binance_klines,
+                    "/v5/market/tickers": upstream.bybit_tickers,
+                    "/v1/latest": upstream.metalprice_latest,
+                }
+                if parsed.path in routes:
+                    return self._send(*routes[parsed.path](q), headers)
+                if parsed.path == "/v1/chat/completions" and body is not None:
+                    if body.get("stream"):
+                        return self._send_events(upstream.openai_chunks(body))
+                    return self._send(*upstream.openai_chat(body))
+                self._send(404, {"error": "not found"})
+
+            def do_GET(self):
+                self._route()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._route(json.loads(self.rfile.read(length) or b"{}"))
+
+        return Handler
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the fake exchange/OpenAI upstream")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-ms", type=float, default=0.0, help="delay between streamed OpenAI chunks")
+    args = parser.parse_args()
+    server = FakeUpstream(latency_ms=args.latency_ms, error_rate=args.error_rate, token_ms=args.token_ms).start()
+    print(f"Fake upstream listening on {server.url}")
+    threading.Event().wait()
@@ -0,0 +1,71 @@
+"""Record live upstream responses into bench/fixtures for FakeUpstream to replay.
+
+    python -m bench.record --symbols BTCUSDT ETHUSDT --intervals 15m 1h 4h
+    python -m bench.record --parity --symbols BTCUSDT       # tests/fixtures/klines for the resample test
+
+OpenAI and MetalPriceAPI responses are not recorded by default (they need keys
+and cost money); the synthesized responses are used instead.
+"""
+import argparse
+import json
+import os
+
+import requests
+
+from bench.fake_upstream import FIXTURES_DIR
+from utils.resample import INTERVAL_MS
+
+PARITY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          "tests", "fixtures", "klines")
+# Base interval -> native intervals recorded over the same span for tests/test_resample.py
+# (1d is also a base, so it is recorded once, in full)
+PARITY_SETS = {"15m": ["1h", "4h", "1d"], "1d": ["1w"]}
+
+def _save(name: str, payload, directory: str = FIXTURES_DIR):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.json"), "w") as f:
+        json.dump(payload, f)
+    print(f"recorded {name}")
+
+def _klines(symbol: str, interval: str, **params) -> list:
+    resp = requests.get("https://api.binance.com/api/v3/klines",
+                        params={"symbol": symbol, "interval": interval, **params}, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+def record_parity(symbols):
+    """Each base series plus the native bars spanning it, downloaded back to back."""
+    for symbol in symbols:
+        for base, natives in PARITY_SETS.items():
+            rows = _klines(symbol, base, limit=1000)
+            _save(f"{symbol}_{base}", rows, PARITY_DIR)
+            for interval in natives:
+                if interval in PARITY_SETS:
+                    continue  # recorded in full as a base series of its own
+                span = (rows[-1][0] - rows[0][0]) // INTERVAL_MS[interval] + 2
+                _save(f"{symbol}_{interval}", _klines(symbol, interval, startTime=rows[0][0], limit=span),
+                      PARITY_DIR)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record live exchange responses as bench fixtures")
+    parser.add_argument("--symbols", nargs="*", default=["BTCUSDT", "ETHUSDT", "DOGEUSDT", "SHIBUSDT", "PEPEUSDT"])
+    parser.add_argument("--intervals", nargs="*", default=["15m", "1h", "4h"])
+    parser.add_argument("--parity", action="store_true", help="record base + native klines for the resample test")
+    args = parser.parse_args(argv)
+
+    if args.parity:
+        record_parity(args.symbols)
+        return
+
+    _save("binance_ticker_price", requests.get("https://api.binance.com/api/v3/ticker/price", timeout=10).json())
+    for category in ("linear", "spot"):
+        resp = requests.get("https://api.bybit.com/v5/market/tickers", params={"category": category}, timeout=10)
+        _save(f"bybit_tickers_{category}", resp.json().get("result", {}).get("list", []))
+    for symbol in args.symbols:
+        for interval in args.intervals:
+            resp = requests.get("https://api.binance.com/api/v3/klines",
+                                params={"symbol": symbol, "interval": interval, "limit": 1000}, timeout=10)
+            _save(f"binance_klines_{symbol}_{interval}", resp.json())
+
+if __name__ == "__main__":
+    main()
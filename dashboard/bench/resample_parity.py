@@ -0,0 +1,77 @@
+"""Check resampled timeframes against the exchange's native candles.
+
+Run from the dashboard directory:
+
+    python -m bench.resample_parity                          # offline, against FakeUpstream
+    python -m bench.resample_parity --live --symbols BTCUSDT ETHUSDT --timeframes 1h 4h 1d 1w
+
+For every symbol/timeframe the closed bars built by fetch_ohlc_binance (from the
+configured base series) are compared field by field with a native download of the
+same timeframe. Exits non-zero on any mismatch.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from bench.run_bench import _point_env_at
+
+FIELDS = ["open", "high", "low", "close", "volume", "qav", "num_trades"]
+
+def compare(resampled, native, rtol: float) -> dict:
+    """Mismatch counts per field over the closed bars both frames share."""
+    merged = resampled.merge(native, on="open_time", suffixes=("_r", "_n")).iloc[:-1]  # drop the forming bar
+    mismatches = {}
+    for field in FIELDS:
+        r = merged[f"{field}_r"].astype(float).to_numpy()
+        n = merged[f"{field}_n"].astype(float).to_numpy()
+        bad = int((~np.isclose(r, n, rtol=rtol, atol=0)).sum())
+        if bad:
+            mismatches[field] = bad
+    return {"bars": len(merged), "mismatches": mismatches}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="query the real Binance API instead of FakeUpstream")
+    parser.add_argument("--symbols", nargs="*", default=["BTCUSDT", "ETHUSDT"])
+    parser.add_argument("--timeframes", nargs="*", default=["30m", "1h", "4h", "12h", "1d", "1w"])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--rtol", type=float, default=1e-6, help="relative tolerance (volume sums round)")
+    args = parser.parse_args(argv)
+
+    upstream = None
+    if args.live:
+        os.environ["CANDLE_CACHE_DIR"] = tempfile.mkdtemp(prefix="zpt-parity-candles-")
+    else:
+        from bench.fake_upstream import FakeUpstream
+        upstream = FakeUpstream().start()
+        _point_env_at(upstream.url)
+    os.environ["PRICE_STREAM"] = "0"
+
+    import zpt_analysis
+    from utils import pick_base, resample_bases
+
+    failed = False
+    try:
+        for symbol in args.symbols:
+            for tf in args.timeframes:
+                base = pick_base(tf, resample_bases(symbol))
+                if base in (None, tf):
+                    print(f"{symbol:10s} {tf:4s} fetched natively, nothing to compare")
+                    continue
+                resampled = zpt_analysis.fetch_ohlc_binance(symbol, tf, args.limit)
+                native = zpt_analysis._fetch_klines(symbol, tf, args.limit)
+                result = compare(resampled, native, args.rtol)
+                ok = result["bars"] > 0 and not result["mismatches"]
+                failed |= not ok
+                print(f"{symbol:10s} {tf:4s} from {base:4s} bars={result['bars']:4d} "
+                      f"{'OK' if ok else 'MISMATCH ' + str(result['mismatches'] or 'no overlapping bars')}")
+    finally:
+        if upstream is not None:
+            upstream.stop()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
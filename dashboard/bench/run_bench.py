@@ -0,0 +1,161 @@
+"""Offline benchmark for the price/analysis pipeline.
+
+Run from the dashboard directory:
+
+    python -m bench.run_bench                      # warm caches, writes bench/results/<commit>.json
+    python -m bench.run_bench --cold --latency-ms 50 --error-rate 0.05
+    python -m bench.run_bench --compare bench/results/abc1234.json
+
+All upstream hosts (Binance, Bybit, MetalPriceAPI, OpenAI) are served by the
+local FakeUpstream, so no network access or real API keys are needed.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench.fake_upstream import FakeUpstream
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def _point_env_at(url: str):
+    """Must run before the zpt_* modules are imported: they read these at import time."""
+    os.environ.update({
+        "BINANCE_API_URL": url,
+        "BYBIT_API_URL": url,
+        "METALPRICE_API_URL": url,
+        "OPENAI_BASE_URL": f"{url}/v1",
+        "OPENAI_API_KEY": "bench",
+        "METALS_API_KEY": "bench",
+        "CANDLE_CACHE_DIR": tempfile.mkdtemp(prefix="zpt-bench-candles-"),
+        "SIGNAL_JOURNAL_PATH": os.path.join(tempfile.mkdtemp(prefix="zpt-bench-journal-"), "signals.db"),
+    })
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+def measure(fn, iterations: int, reset=None) -> dict:
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if reset is not None:
+            reset()
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+    ms = np.array(latencies) * 1000
+    return {
+        "n": iterations,
+        "errors": errors,
+        "throughput_per_s": iterations / total if total else 0.0,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+def run(args) -> dict:
+    upstream = FakeUpstream(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            new_coins=args.new_coins, token_ms=args.token_ms).start()
+    _point_env_at(upstream.url)
+    import zpt_pricefeed
+    import zpt_analysis
+    import zpt_llm
+
+    questions = itertools.count()
+
+    async def first_token():
+        # A fresh question each time: time until a bot reply could show the first words
+        async for _ in zpt_llm.stream(f"What is a pin bar? #{next(questions)}", cache=False):
+            break
+
+    def reset_caches():
+        for cache in (zpt_pricefeed._quotes, zpt_pricefeed._snapshots):
+            cache._entries.clear()
+        zpt_analysis._candles.clear()
+        zpt_analysis._explanations._entries.clear()
+
+    reset = reset_caches if args.cold else None
+    cases = {
+        "get_price": (lambda: zpt_pricefeed.get_price("BTC"), args.iterations),
+        "price_health": (zpt_pricefeed.price_health, args.iterations),
+        "multi_timeframe_confluence": (lambda: zpt_analysis.multi_timeframe_confluence("BTCUSDT"), args.iterations),
+        "analyze": (lambda: zpt_analysis.analyze("BTCUSDT"), args.iterations),
+        "analyze_explained": (lambda: zpt_analysis.analyze("ETHUSDT").explanation, args.iterations),
+        "llm_first_token": (lambda: asyncio.run(first_token()), args.iterations),
+        "llm_cached_answer": (lambda: asyncio.run(zpt_llm.complete("What is a pin bar?")), args.iterations),
+        "meme_shitcoin_analysis": (zpt_analysis.meme_shitcoin_analysis, max(1, args.iterations // 10)),
+    }
+    results = {}
+    try:
+        for name, (fn, n) in cases.items():
+            if args.only and name not in args.only:
+                continue
+            fn()  # warm-up (imports, connection pool)
+            results[name] = measure(fn, n, reset)
+            print(f"{name:28s} p50={results[name]['p50_ms']:8.2f}ms p95={results[name]['p95_ms']:8.2f}ms "
+                  f"p99={results[name]['p99_ms']:8.2f}ms {results[name]['throughput_per_s']:8.1f}/s "
+                  f"errors={results[name]['errors']}")
+    finally:
+        upstream.stop()
+    return {
+        "commit": _commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        "upstream_requests": upstream.requests,
+        "results": results,
+    }
+
+def compare(current: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('commit')} ({baseline_path}):")
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        deltas = " ".join(
+            f"{k}={cur[k] / base[k]:.2f}x" for k in ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s") if base[k])
+        print(f"{name:28s} {deltas}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests that fail")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="delay between streamed OpenAI chunks")
+    parser.add_argument("--new-coins", type=int, default=20, help="synthetic new Bybit listings for the meme scan")
+    parser.add_argument("--cold", action="store_true", help="clear in-process caches before every iteration")
+    parser.add_argument("--only", nargs="*", help="subset of benchmark names to run")
+    parser.add_argument("--output", help="result JSON path (default bench/results/<commit>.json)")
+    parser.add_argument("--compare", help="baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}{'-cold' if args.cold else ''}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,8 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from utils.performance import PerformanceMonitor
-# Import the whole module and use zpt_analysis.meme_shitcoin_analysis and zpt_analysis.multi_timeframe_confluence
-import zpt_analysis
-from zpt_pricefeed import get_price
-import time
+import zpt_scanner
+import dashboard_data as data
 
 # Page config
 st.set_page_config(
@@ -71,12 +69,8 @@ user_vibe = st.sidebar.selectbox(
     index=3
 )
 
-# Auto-refresh
-auto_refresh = st.sidebar.checkbox("🔄 Auto-refresh (30s)", value=False)
-
-if auto_refresh:
-    time.sleep(1)
-    st.rerun()
+# Auto-refresh: only the live-price panel reruns on this interval; the analysis stays cached
+auto_refresh = st.sidebar.checkbox(f"🔄 Auto-refresh ({data.PRICE_REFRESH_SECONDS:.0f}s)", value=False)
 
 # Main content
 col1, col2, col3 = st.columns([2, 1, 1])
@@ -85,8 +79,8 @@ with col1:
     st.subheader(f"📊 {symbol} Analysis")
     
     # Get analysis
-    with st.spinner("🤖 AI is analyzing market data..."):
-        analysis = zpt_analysis.analyze(symbol)
+    with st.spinner("🤖 AI is analyzing market data..."), monitor.span("render"):
+        analysis = data.analysis(symbol)
         
         # Signal display
         confidence_class = "confidence-high" if analysis["confidence"] > 0.9 else "confidence-medium" if analysis["confidence"] > 0.8 else "confidence-low"
@@ -102,7 +96,7 @@ with col1:
         # AI Explanation
         if "AI Explanations" in ai_features:
             st.subheader("🧠 AI Analysis")
-            st.info(analysis["explanation"])
+            st.info(data.explanation(symbol, analysis["action"], analysis["price"], analysis["confidence"]))
         
         # Multi-timeframe
         if "Multi-Timeframe Analysis" in ai_features:
@@ -124,39 +118,83 @@ with col1:
             for i, tp in enumerate(tp_levels):
                 st.metric(f"🎯 TP{i+1}", f"${tp:.4f}")
 
-with col2:
-    st.subheader("📈 Live Price")
-    price = get_price(symbol)
+        # Price chart (1h candles)
+        df = data.ohlc(symbol, "1h", 100)
+        if not df.empty:
+            fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+            times = pd.to_datetime(df["open_time"], unit="ms")
+            fig.add_trace(go.Candlestick(x=times, open=df["open"], high=df["high"], low=df["low"], close=df["close"], name=symbol), row=1, col=1)
+            fig.add_trace(go.Bar(x=times, y=df["volume"], name="Volume"), row=2, col=1)
+            fig.update_layout(height=420, xaxis_rangeslider_visible=False, showlegend=False, margin=dict(t=10, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+
+        # Previously issued signals come from the journal, nothing is recomputed
+        history = data.signal_history(symbol)
+        if history:
+            st.subheader("📜 Signal History")
+            hist_df = pd.DataFrame(history)[["created_at", "sn", "action", "confidence", "price", "sl"]]
+            hist_df["created_at"] = pd.to_datetime(hist_df["created_at"], unit="s")
+            st.dataframe(hist_df, use_container_width=True, hide_index=True)
+
+@st.fragment(run_every=data.PRICE_REFRESH_SECONDS if auto_refresh else None)
+def live_price(symbol: str):
+    """Reruns on its own every refresh interval without re-running the rest of the page."""
+    price = data.price(symbol)
     st.metric(
         label="Current Price",
         value=f"${price:.4f}" if price else "N/A",
         delta="Live"
     )
+
+with col2:
+    st.subheader("📈 Live Price")
+    live_price(symbol)
     
-    # Performance stats
+    # Performance stats (filled in at the end of the run, once all stages have been timed)
     st.subheader("⚡ Performance")
-    st.metric("Response Time", f"{monitor.elapsed():.3f}s")
+    perf_placeholder = st.empty()
     
 with col3:
     st.subheader("🎮 Quick Actions")
     
     if st.button("🔥 Meme Coin Scan", type="secondary"):
         if "Meme Coin Scanner" in ai_features:
-            with st.spinner("Scanning meme coins..."):
-                meme_results = zpt_analysis.meme_shitcoin_analysis()
-                if meme_results:
-                    st.success(f"Found {len(meme_results)} high-confidence signals!")
-                    for result in meme_results[:3]:  # Show top 3
+            progress = st.progress(0.0, text="Scanning meme coins...")
+            meme_results = []
+            # Signals are shown as soon as each coin finishes instead of after the whole scan
+            for done, total, result in zpt_scanner.iter_meme_scan():
+                progress.progress(done / total, text=f"Scanning meme coins... {done}/{total}")
+                if result is not None:
+                    meme_results.append(result)
+                    if len(meme_results) <= 3:  # Show top 3
                         st.write(f"🚀 {result['symbol']}: {result['action']} ({result['confidence']:.1%})")
-                else:
-                    st.warning("No high-confidence meme signals found.")
+            progress.empty()
+            if meme_results:
+                st.success(f"Found {len(meme_results)} high-confidence signals!")
+            else:
+                st.warning("No high-confidence meme signals found.")
+        else:
             st.info("Enable 'Meme Coin Scanner' in AI Features")
     
+    serial = st.text_input("🔎 Look up serial", placeholder="#SN-0K4ZQ7M1B2C3D-BTCUSDT-0101")
+    if serial:
+        entry = data.signal_by_sn(serial)
+        if entry:
+            st.write(f"{entry['symbol']}: {entry['action']} ({entry['confidence']:.1%}) @ {entry['price']}")
+            st.caption(f"SL {entry['sl']}, TP {entry['tp']}, issued {pd.to_datetime(entry['created_at'], unit='s'):%Y-%m-%d %H:%M} UTC")
+        else:
+            st.warning("No signal found for that serial.")
+
     if st.button("🧘 Trading Psychology"):
         from zpt_analysis import vibe_response
         advice = vibe_response(user_vibe, "LONG")  # Example signal
         st.info(advice)
 
+with perf_placeholder.container():
+    st.metric("Response Time", f"{monitor.elapsed():.3f}s")
+    with st.expander("Stage breakdown"):
+        st.json({path: f"{ms:.1f} ms" for path, ms in monitor.breakdown().items()})
+
 # Footer
 st.markdown("---")
 st.markdown("© ChatZiPT v4 by Tiffany | Powered by AI & Technical Analysis")
\ No newline at end of file
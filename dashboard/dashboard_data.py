@@ -0,0 +1,58 @@
+"""Cached data layer for the Streamlit dashboard.
+
+Every rerun (widget change, refresh, another open tab) reads through these caches
+instead of re-running the pipeline. Cached values are shared by all sessions of
+the Streamlit server and keyed by their arguments; TTLs are overridable via env.
+"""
+import streamlit as st
+
+import zpt_analysis
+import zpt_pricefeed
+from utils import get_env, journal
+
+ANALYSIS_TTL = float(get_env("DASHBOARD_ANALYSIS_TTL", 60))
+EXPLANATION_TTL = float(get_env("DASHBOARD_EXPLANATION_TTL", 900))
+PRICE_TTL = float(get_env("DASHBOARD_PRICE_TTL", 5))
+OHLC_TTL = float(get_env("DASHBOARD_OHLC_TTL", 30))
+HISTORY_TTL = float(get_env("DASHBOARD_HISTORY_TTL", 10))
+PRICE_REFRESH_SECONDS = float(get_env("DASHBOARD_PRICE_REFRESH", 30))
+
+@st.cache_resource(show_spinner=False)
+def price_engine():
+    """Start the shared price engine once per server process.
+
+    Its pooled HTTP client, quote/candle caches and websocket feed (and zpt_analysis'
+    OpenAI client) are module-level, so every session reuses the same connections.
+    """
+    zpt_pricefeed.start_stream()
+    return zpt_pricefeed
+
+@st.cache_data(ttl=ANALYSIS_TTL, show_spinner=False)
+def analysis(symbol: str) -> dict:
+    """Signal, confluence and SL/TP for a symbol; the AI explanation is fetched separately."""
+    price_engine()
+    return dict(zpt_analysis.analyze(symbol))
+
+@st.cache_data(ttl=EXPLANATION_TTL, show_spinner=False)
+def explanation(symbol: str, action: str, price: float, confidence: float) -> str:
+    price_engine()
+    return zpt_analysis.ai_explain(symbol, action, price, confidence)
+
+@st.cache_data(ttl=PRICE_TTL, show_spinner=False)
+def price(symbol: str):
+    price_engine()
+    return zpt_pricefeed.get_price(symbol)
+
+@st.cache_data(ttl=OHLC_TTL, show_spinner=False)
+def ohlc(symbol: str, interval: str = "1h", limit: int = 100):
+    price_engine()
+    return zpt_analysis.fetch_ohlc_binance(symbol, interval, limit)
+
+@st.cache_data(ttl=HISTORY_TTL, show_spinner=False)
+def signal_history(symbol: str, limit: int = 20) -> list:
+    """Signals already issued for a symbol, read from the journal instead of recomputed."""
+    return journal.recent(symbol, limit)
+
+@st.cache_data(ttl=HISTORY_TTL, show_spinner=False)
+def signal_by_sn(sn: str):
+    return journal.by_sn(sn)
@@ -6,6 +6,10 @@ REM -------------------------------------------------------------------
 REM Activate Python virtual environment
 call "%~dp0.venv\Scripts\activate.bat"
 
+REM Shared market-data daemon; everything started below talks to it
+start "Market Data" cmd /k "python zpt_marketdata.py"
+set MARKETDATA_URL=http://127.0.0.1:8765
+
 start "Manager Bot" cmd /k "python zpt_manager.py"
 start "Worker Bot"  cmd /k "python zpt_worker.py"
 start "Telegram Dash Bot" cmd /k "python telegram_dashboard.py"
@@ -10,9 +10,9 @@ _appb_mod.Updater = _PatchedUpdater
 
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
-from telegram.constants import ParseMode
-from zpt_pricefeed import price_health
-from zpt_analysis import analyze
+from zpt_pricefeed import start_stream
+from zpt_signals import signal_service
+from zpt_replies import send_dashboard
 
 import logging
 logger = logging.getLogger(__name__)
@@ -27,27 +27,15 @@ TELEGRAM_BOT_TOKEN = get_env("TELEGRAM_BOT_TOKEN")
 async def dashboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler for /dashboard: sends system health and AI signals via Telegram."""
     logger.info("dashboard_command triggered by user_id=%s", update.effective_user.id)
-    # System health metrics
-    health = price_health()
-    health_lines = [f"{k}: {v}" for k, v in health.items()]
-    await update.message.reply_text(
-        "*System Health:*\n" + "\n".join(health_lines),
-        parse_mode=ParseMode.MARKDOWN
-    )
-
-    # AI trading signals for core assets
-    assets = ["BTC", "ETH", "XAUUSD"]
-    for asset in assets:
-        res = analyze(asset)
-        await update.message.reply_text(
-            f"*{asset}* signal: {res['action']}, Confidence: {int(res['confidence']*100)}%",
-            parse_mode=ParseMode.MARKDOWN
-        )
+    # Rendered from the background-refreshed snapshot as one message; no exchange/OpenAI calls per request
+    await send_dashboard(update.message)
 
 async def _on_startup(app):
     """Delete any existing webhook and drop pending updates to avoid getUpdates conflicts."""
     logger.info("Running startup: delete webhook and drop pending updates")
     await app.bot.delete_webhook(drop_pending_updates=True)
+    start_stream()
+    signal_service.start()
 
 def main():
     # Build the application, deleting any existing webhook on startup to avoid getUpdates conflicts
@@ -55,6 +43,7 @@ def main():
         ApplicationBuilder()
         .token(TELEGRAM_BOT_TOKEN)
         .post_init(_on_startup)
+        .concurrent_updates(True)  # handlers await their work; don't serialize users behind each other
         .build()
     )
     app.add_handler(CommandHandler('dashboard', dashboard_command))
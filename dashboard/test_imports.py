@@ -2,4 +2,6 @@ import pprint
 from zpt_pricefeed import price_health 
 from zpt_analysis import analyze 
 pprint.pprint(price_health()) 
-pprint.pprint(analyze('BTCUSDT')) 
+result = analyze('BTCUSDT') 
+pprint.pprint(result) 
+print(result.explanation) 
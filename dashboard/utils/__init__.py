@@ -1,5 +1,5 @@
 """Utilities package for ChatZiPT dashboard."""
-from .performance import PerformanceMonitor
+from .performance import PerformanceMonitor, metrics, span
 
 from .zpt_utils import (
     get_env,
@@ -7,11 +7,24 @@ from .zpt_utils import (
     safe_float,
     map_symbol,
     health_report,
+    health_summary,
     get_aura_points,
     pro_features_unlocked,
     generate_referral_code,
 )
 
+from .quote_cache import QuoteCache, DEFAULT_QUOTE_TTLS, DEFAULT_MAX_STALE
+from .candle_store import CandleStore, klines_to_frame, KLINE_COLUMNS
+from .candle_cache import CandleCache
+from .resample import resample_klines, pick_base, base_bars_needed, mtf_timeframes, resample_bases, INTERVAL_MS
+from .ratelimit import TokenBucket
+from .breaker import SourceHealth, source_health, breaker_report
+from .scheduler import RequestScheduler, request_priority, current_priority, with_priority, request_weight
+from .memo import TTLMemo
+from .journal import SignalJournal, journal
+from .handler_pool import HandlerPool, PoolBusy, handler_pool
+from .stream import StreamFeed
 from .sn import generate_sn
+from .intents import IntentRouter
 from .risk import get_max_lot
 from .config import config, load_config
\ No newline at end of file
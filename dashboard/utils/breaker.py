@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+class SourceHealth:
+    """Circuit breaker plus latency/error EWMAs for one upstream source.
+
+    closed -> open after `failure_threshold` consecutive failures; open -> half_open
+    once `cooldown` seconds pass, letting a single probe through; the probe's outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 30.0,
+                 alpha: float = 0.2, window: int = 200, half_life: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.half_life = half_life
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.last_seen = 0.0
+        self._probing = False
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether a request may be sent now (claims the probe slot when half-open)."""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state, self._probing = "half_open", False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def _observe_latency(self, seconds: float):
+        self.last_seen = time.monotonic()
+        self._recent.append(seconds)
+        self.latency_ewma = seconds if self.latency_ewma is None else (
+            self.alpha * seconds + (1 - self.alpha) * self.latency_ewma)
+
+    def record_success(self, seconds: float):
+        with self._lock:
+            self._observe_latency(seconds)
+            self.error_ewma *= 1 - self.alpha
+            self.failures = 0
+            self.state, self._probing = "closed", False
+
+    def record_failure(self, seconds: Optional[float] = None) -> bool:
+        """Count a failed call; True if this failure opened the breaker."""
+        with self._lock:
+            if seconds is not None:
+                self._observe_latency(seconds)
+            self.error_ewma = self.alpha + (1 - self.alpha) * self.error_ewma
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state, self.opened_at, self._probing = "open", time.monotonic(), False
+                return True
+            return False
+
+    def record_abandoned(self, seconds: float):
+        """A call cancelled after `seconds` (lost a hedge): at least that slow, but not a failure."""
+        with self._lock:
+            self._observe_latency(seconds)
+            if self.state == "half_open":
+                self._probing = False
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            samples = list(self._recent)
+        if len(samples) < min_samples:
+            return None
+        return float(np.percentile(samples, 95))
+
+    def score(self) -> float:
+        """Lower is healthier: expected latency inflated by the recent error rate.
+
+        The score fades toward zero while a source goes unused, so a source that
+        once lost the ranking gets retried instead of being starved forever.
+        """
+        fade = 0.5 ** ((time.monotonic() - self.last_seen) / self.half_life)
+        return (self.latency_ewma or 0.0) * (1 + 4 * self.error_ewma) * fade
+
+    def report(self) -> dict:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_ewma, 3),
+        }
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def source_health(name: str) -> SourceHealth:
+    """Process-wide health tracker for an upstream source (created on first use)."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = SourceHealth(name)
+        return _registry[name]
+
+def breaker_report() -> dict:
+    with _registry_lock:
+        sources = dict(_registry)
+    return {name: health.report() for name, health in sorted(sources.items())}
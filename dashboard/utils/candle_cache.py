@@ -0,0 +1,100 @@
+import os
+import re
+import time
+
+import pandas as pd
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None  # on-disk cache disabled, callers fall back to the network
+
+from .zpt_utils import get_env, log
+
+CANDLE_CACHE_DIR = get_env("CANDLE_CACHE_DIR", os.path.join("cache", "candles"))
+
+class CandleCache:
+    """Append-only on-disk OHLC cache stored as Arrow IPC segments.
+
+    Each series (e.g. "BTCUSDT_1h") is a directory of segment files. Appends
+    write a new segment atomically (tmp file + rename) so several containers can
+    share one mounted volume; reads memory-map every segment and later segments
+    win on duplicate keys. Once a series has more than `compact_after` segments
+    they are merged into one.
+    """
+
+    def __init__(self, root=None, compact_after=16, max_rows=50_000):
+        self.root = root or get_env("CANDLE_CACHE_DIR", CANDLE_CACHE_DIR)
+        self.compact_after = compact_after
+        self.max_rows = max_rows
+        self.enabled = pa is not None
+        if self.enabled:
+            os.makedirs(self.root, exist_ok=True)
+
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_.-]", "_", name))
+
+    def _segments(self, name: str) -> list:
+        path = self._dir(name)
+        if not os.path.isdir(path):
+            return []
+        return sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".arrow"))
+
+    @staticmethod
+    def _read(path: str) -> pd.DataFrame:
+        with pa.memory_map(path, "r") as src:
+            return pa.ipc.open_file(src).read_all().to_pandas()
+
+    def _write(self, path: str, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+
+    def _load_segments(self, segments: list, key: str) -> pd.DataFrame:
+        frames = []
+        for seg in segments:
+            try:
+                frames.append(self._read(seg))
+            except FileNotFoundError:
+                continue  # removed by a concurrent compaction; its rows live in the merged segment
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        return df.drop_duplicates(key, keep="last").sort_values(key).reset_index(drop=True)
+
+    def load(self, name: str, key: str = "open_time") -> pd.DataFrame:
+        if not self.enabled:
+            return pd.DataFrame()
+        try:
+            return self._load_segments(self._segments(name), key)
+        except Exception as e:
+            log(f"Candle cache read error ({name}): {e}", level="WARNING")
+            return pd.DataFrame()
+
+    def append(self, name: str, df: pd.DataFrame, key: str = "open_time"):
+        if not self.enabled or df is None or df.empty:
+            return
+        try:
+            os.makedirs(self._dir(name), exist_ok=True)
+            seg = os.path.join(self._dir(name), f"{time.time_ns():020d}-{os.getpid()}.arrow")
+            self._write(seg, df)
+            if len(self._segments(name)) > self.compact_after:
+                self.compact(name, key)
+        except Exception as e:
+            log(f"Candle cache write error ({name}): {e}", level="WARNING")
+
+    def compact(self, name: str, key: str = "open_time"):
+        """Merge all current segments into one, keeping at most max_rows newest rows."""
+        segments = self._segments(name)
+        if len(segments) < 2:
+            return
+        df = self._load_segments(segments, key).tail(self.max_rows)
+        # Named after the newest merged segment so appends made meanwhile still sort after it
+        self._write(segments[-1][:-len(".arrow")] + "-c.arrow", df)
+        for seg in segments:
+            try:
+                os.remove(seg)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pandas as pd
+
+KLINE_COLUMNS = [
+    "open_time", "open", "high", "low", "close", "volume",
+    "close_time", "qav", "num_trades", "taker_base_vol", "taker_quote_vol", "ignore"
+]
+
+# Guards creation of the per-key locks, which happens on whichever thread asks first
+_locks_guard = threading.Lock()
+
+def klines_to_frame(rows) -> pd.DataFrame:
+    """Turn raw Binance kline rows into the DataFrame shape used across the analysis code."""
+    df = pd.DataFrame(rows, columns=KLINE_COLUMNS)
+    for col in ["open", "high", "low", "close", "volume"]:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in ["open_time", "close_time"]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype("int64")
+    return df
+
+class CandleStore:
+    """Rolling in-memory kline windows per (symbol, interval).
+
+    After the first full download only bars from the oldest still-forming candle
+    onwards are requested, and returned bars replace stored rows with the same
+    open_time, so the forming candle is always refreshed in place. Only closed
+    bars are written to disk, each once.
+    """
+
+    def __init__(self, fetch, max_bars=1000, min_refresh=2.0, disk=None):
+        # fetch(symbol, interval, limit, start_time=None) -> DataFrame (empty on error)
+        self._fetch = fetch
+        # Optional CandleCache: cold keys warm-start from disk, fetched bars are appended to it
+        self.disk = disk
+        self.max_bars = max_bars
+        self.min_refresh = min_refresh
+        self._frames = {}
+        self._fetched_at = {}
+        # Keys whose full download came back short: the exchange has no older bars,
+        # so a short window is complete rather than a reason to re-download
+        self._exhausted = set()
+        self._persisted = {}  # key -> open_time of the newest closed bar on disk
+        self._locks = {}
+
+    def _lock(self, key) -> threading.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with _locks_guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+        return lock
+
+    def get(self, symbol: str, interval: str, limit: int = 100) -> pd.DataFrame:
+        key = (symbol, interval)
+        limit = min(limit, self.max_bars)
+        with self._lock(key):
+            df = self._frames.get(key)
+            if df is None and self.disk is not None:
+                df = self.disk.load(f"{symbol}_{interval}")
+                df = df.tail(self.max_bars) if df is not None and not df.empty else None
+                closed = df["open_time"][df["close_time"] < int(time.time() * 1000)] if df is not None else ()
+                if len(closed):
+                    self._persisted[key] = int(closed.iloc[-1])
+            if df is None or (len(df) < limit and key not in self._exhausted):
+                fresh = self._fetch(symbol, interval, limit)
+                if not fresh.empty:
+                    df = fresh
+                    self._persist(symbol, interval, fresh)
+                    if len(fresh) < limit:
+                        self._exhausted.add(key)
+            elif time.monotonic() - self._fetched_at.get(key, 0) >= self.min_refresh:
+                df = self._update(df, symbol, interval)
+            else:
+                return df.tail(limit).reset_index(drop=True).copy()
+            if df is None or df.empty:
+                return pd.DataFrame()
+            self._frames[key] = df.tail(self.max_bars).reset_index(drop=True)
+            self._fetched_at[key] = time.monotonic()
+            return self._frames[key].tail(limit).reset_index(drop=True).copy()
+
+    def apply_live(self, symbol: str, interval: str, live: pd.DataFrame) -> bool:
+        """Merge streamed candles into the stored window.
+
+        Returns False (caller should go through REST) when nothing is stored yet or
+        the streamed candles don't connect to the stored window without a gap.
+        """
+        key = (symbol, interval)
+        with self._lock(key):
+            df = self._frames.get(key)
+            if df is None or df.empty or live is None or live.empty:
+                return False
+            if int(live["open_time"].iloc[0]) > int(df["close_time"].iloc[-1]) + 1:
+                return False
+            merged = pd.concat([df, live], ignore_index=True)
+            merged = merged.drop_duplicates("open_time", keep="last").sort_values("open_time")
+            self._frames[key] = merged.tail(self.max_bars).reset_index(drop=True)
+            self._fetched_at[key] = time.monotonic()
+            return True
+
+    def _update(self, df: pd.DataFrame, symbol: str, interval: str) -> pd.DataFrame:
+        now_ms = int(time.time() * 1000)
+        forming = df[df["close_time"] >= now_ms]
+        start = int(forming["open_time"].iloc[0]) if not forming.empty else int(df["close_time"].iloc[-1]) + 1
+        bar_ms = int(df["close_time"].iloc[-1]) - int(df["open_time"].iloc[-1]) + 1
+        behind = (now_ms - start) // max(bar_ms, 1)
+        if behind >= self.max_bars:
+            # Too far behind (e.g. stale disk cache) to catch up incrementally
+            new = self._fetch(symbol, interval, self.max_bars, start_time=None)
+        else:
+            # Just the bars since `start` (+1 for the forming one, +1 for clock skew), not a full window
+            new = self._fetch(symbol, interval, int(behind) + 2, start_time=start)
+        if new.empty:
+            return df
+        self._persist(symbol, interval, new)
+        merged = pd.concat([df, new], ignore_index=True)
+        return merged.drop_duplicates("open_time", keep="last").sort_values("open_time")
+
+    def _persist(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Append the closed bars not yet on disk; forming bars would be rewritten on every refresh."""
+        if self.disk is None:
+            return
+        key = (symbol, interval)
+        closed = df[df["close_time"] < int(time.time() * 1000)]
+        if key in self._persisted:
+            closed = closed[closed["open_time"] > self._persisted[key]]
+        if closed.empty:
+            return
+        self.disk.append(f"{symbol}_{interval}", closed)
+        self._persisted[key] = int(closed["open_time"].max())
+
+    def clear(self):
+        self._frames.clear()
+        self._fetched_at.clear()
+        self._exhausted.clear()
+        self._persisted.clear()
@@ -0,0 +1,98 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from .performance import metrics
+from .zpt_utils import get_env
+
+class PoolBusy(Exception):
+    """The handler queue is full; tell the user to retry instead of queueing unboundedly."""
+
+class HandlerPool:
+    """Runs blocking Telegram handler work off the bot's event loop with bounded concurrency.
+
+    At most `workers` jobs run at once, each user has at most `per_user` jobs in
+    flight (further ones wait their turn), and at most `max_queue` jobs may be
+    admitted at all; past that `run` raises PoolBusy. A job that exceeds its
+    timeout is dropped if it hasn't started and its result discarded if it has
+    (threads can't be killed; long work should stop cooperatively, e.g. closing
+    a scan generator). Queue depth and outcomes are exported via `metrics`.
+    """
+
+    def __init__(self, name: str = "bot", workers: int = 8, per_user: int = 2,
+                 max_queue: int = 64, timeout: float = 60.0):
+        self.name = name
+        self.per_user = per_user
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"zpt-{name}")
+        self._user_slots = {}  # user_id -> [asyncio.Semaphore, refcount]
+        self._admitted = 0  # loop side: waiting + running
+        self._running = 0  # executor side
+        self._running_lock = threading.Lock()
+
+    def _publish(self):
+        # Timed-out jobs may still be running after leaving their slot, hence the clamp
+        metrics.set_gauge("handler_queue_depth", max(self._admitted - self._running, 0), pool=self.name)
+        metrics.set_gauge("handler_running", self._running, pool=self.name)
+
+    @asynccontextmanager
+    async def slot(self, user_id, timeout=None):
+        """Admission + per-user limit + timeout around a unit of handler work (sync or async)."""
+        if self._admitted >= self.max_queue:
+            metrics.inc("handler_jobs_total", pool=self.name, outcome="rejected")
+            raise PoolBusy(f"{self.name} pool has {self._admitted} jobs queued")
+        entry = self._user_slots.setdefault(user_id, [asyncio.Semaphore(self.per_user), 0])
+        entry[1] += 1
+        self._admitted += 1
+        self._publish()
+        outcome = "ok"
+        try:
+            async with asyncio.timeout(timeout or self.timeout):
+                async with entry[0]:
+                    yield
+        except TimeoutError:
+            outcome = "timeout"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._user_slots.pop(user_id, None)
+            self._admitted -= 1
+            self._publish()
+            metrics.inc("handler_jobs_total", pool=self.name, outcome=outcome)
+
+    def _call(self, enqueued: float, fn, args, kwargs):
+        metrics.observe("queue", time.perf_counter() - enqueued)
+        with self._running_lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._running_lock:
+                self._running -= 1
+
+    async def execute(self, fn, *args, **kwargs):
+        """Run blocking `fn` on the pool's threads; call inside `slot()` to apply the limits."""
+        ctx = contextvars.copy_context()  # keep spans/request priority of the caller
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, ctx.run, self._call, time.perf_counter(), fn, args, kwargs)
+
+    async def run(self, user_id, fn, *args, timeout=None, **kwargs):
+        """Run blocking `fn(*args, **kwargs)` on the pool for `user_id` and await its result."""
+        async with self.slot(user_id, timeout):
+            return await self.execute(fn, *args, **kwargs)
+
+# Shared per-process pool used by the bots' handlers
+handler_pool = HandlerPool(
+    workers=int(get_env("HANDLER_WORKERS", 8)),
+    per_user=int(get_env("HANDLER_PER_USER", 2)),
+    max_queue=int(get_env("HANDLER_MAX_QUEUE", 64)),
+    timeout=float(get_env("HANDLER_TIMEOUT", 60)),
+)
@@ -0,0 +1,144 @@
+"""NumPy indicator kernel matching the `ta` library defaults.
+
+Inputs are 2-D float arrays shaped (symbols, bars). Shorter histories are
+right-aligned and left-padded with NaN (see `stack`), which behaves like the
+series simply starting later. EMAs use the same recursion and min_periods rules
+as pandas `ewm(adjust=False)`, so results equal `ta`'s RSIIndicator, MACD and
+BollingerBands up to floating-point rounding.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGN = 12, 26, 9
+BB_WINDOW, BB_DEV = 20, 2
+
+def stack(series_list) -> np.ndarray:
+    """Right-align 1-D series of different lengths into one NaN-padded 2-D array."""
+    width = max((len(s) for s in series_list), default=0)
+    out = np.full((len(series_list), width), np.nan)
+    for i, s in enumerate(series_list):
+        if len(s):
+            out[i, width - len(s):] = np.asarray(s, dtype=float)
+    return out
+
+def ema(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """pandas ewm(alpha=..., adjust=False).mean() along axis 1, for leading-NaN padded rows.
+
+    Runs pandas' compiled recursion column-wise, so long histories (backtests) stay
+    fast; ignore_na keeps the state unchanged across any NaN inside a row.
+    """
+    if x.size == 0:
+        return np.full(x.shape, np.nan)
+    smoothed = pd.DataFrame(x.T).ewm(alpha=alpha, adjust=False, min_periods=min_periods, ignore_na=True).mean()
+    return smoothed.to_numpy().T.copy()
+
+def _span_alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+def _rsi_directions(close: np.ndarray):
+    diff = np.diff(close, axis=1, prepend=np.nan)
+    # ta: diff.where(diff > 0, 0.0) turns the leading NaN diff into 0 as well
+    started = np.cumsum(~np.isnan(close), axis=1) > 0  # rows with no bars yet stay NaN
+    up = np.where(started, np.where(diff > 0, diff, 0.0), np.nan)
+    down = np.where(started, np.where(diff < 0, -diff, 0.0), np.nan)
+    return up, down
+
+def _rsi_from(emaup, emadn):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + emaup / emadn)
+    return np.where(emadn == 0, 100.0, rsi)
+
+def rsi(close: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    up, down = _rsi_directions(close)
+    return _rsi_from(ema(up, 1 / window, window), ema(down, 1 / window, window))
+
+def macd(close: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW, sign: int = MACD_SIGN):
+    line = ema(close, _span_alpha(fast), fast) - ema(close, _span_alpha(slow), slow)
+    return line, ema(line, _span_alpha(sign), sign)
+
+def bollinger_wband(close: np.ndarray, window: int = BB_WINDOW, dev: float = BB_DEV) -> np.ndarray:
+    out = np.full(close.shape, np.nan)
+    if close.shape[1] >= window:
+        win = sliding_window_view(close, window, axis=1)
+        mavg, mstd = win.mean(axis=2), win.std(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, window - 1:] = (2 * dev * mstd) / mavg * 100
+    return out
+
+def compute_indicators(close: np.ndarray, volume: np.ndarray) -> dict:
+    """All indicators ta_signal needs, for every symbol and bar in one pass."""
+    line, signal = macd(close)
+    counted = (~np.isnan(volume)).sum(axis=1)
+    volume_mean = np.where(counted > 0, np.nansum(volume, axis=1) / np.maximum(counted, 1), np.nan)
+    return {
+        "rsi": rsi(close),
+        "macd": line,
+        "macd_signal": signal,
+        "bb_width": bollinger_wband(close),
+        "volume_mean": volume_mean,
+    }
+
+class IndicatorState:
+    """Carried EMA/window state so the newest bar of every symbol updates in O(1).
+
+    Built from the same history as `compute_indicators`, `update()` returns the
+    values the batch kernel would produce with the new bar appended.
+    """
+
+    def __init__(self, n: int):
+        self.prev_close = np.full(n, np.nan)
+        self.bars = np.zeros(n)
+        self.up = np.full(n, np.nan)
+        self.down = np.full(n, np.nan)
+        self.fast = np.full(n, np.nan)
+        self.slow = np.full(n, np.nan)
+        self.signal = np.full(n, np.nan)
+        self.signal_count = np.zeros(n)
+        self.window = np.full((n, BB_WINDOW), np.nan)
+        self.volume_sum = np.zeros(n)
+        self.volume_count = np.zeros(n)
+
+    @classmethod
+    def from_history(cls, close: np.ndarray, volume: np.ndarray) -> "IndicatorState":
+        state = cls(close.shape[0])
+        for t in range(close.shape[1]):
+            state.update(close[:, t], volume[:, t])
+        return state
+
+    @staticmethod
+    def _step(state, x, alpha, valid):
+        return np.where(valid & np.isnan(state), x, np.where(valid, state + alpha * (x - state), state))
+
+    def update(self, close: np.ndarray, volume: np.ndarray) -> dict:
+        valid = ~np.isnan(close)
+        diff = np.where(np.isnan(self.prev_close), 0.0, close - self.prev_close)
+        self.up = self._step(self.up, np.where(diff > 0, diff, 0.0), 1 / RSI_WINDOW, valid)
+        self.down = self._step(self.down, np.where(diff < 0, -diff, 0.0), 1 / RSI_WINDOW, valid)
+        self.fast = self._step(self.fast, close, _span_alpha(MACD_FAST), valid)
+        self.slow = self._step(self.slow, close, _span_alpha(MACD_SLOW), valid)
+        self.bars += valid
+        self.prev_close = np.where(valid, close, self.prev_close)
+
+        line = np.where(self.bars >= MACD_SLOW, self.fast - self.slow, np.nan)
+        line_valid = ~np.isnan(line)
+        self.signal = self._step(self.signal, line, _span_alpha(MACD_SIGN), line_valid)
+        self.signal_count += line_valid
+
+        self.window = np.where(valid[:, None], np.roll(self.window, -1, axis=1), self.window)
+        self.window[:, -1] = np.where(valid, close, self.window[:, -1])
+        mavg, mstd = self.window.mean(axis=1), self.window.std(axis=1)
+
+        vol_valid = ~np.isnan(volume)
+        self.volume_sum += np.where(vol_valid, volume, 0.0)
+        self.volume_count += vol_valid
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "rsi": np.where(self.bars >= RSI_WINDOW, _rsi_from(self.up, self.down), np.nan),
+                "macd": np.where(self.bars >= MACD_SLOW, self.fast - self.slow, np.nan),
+                "macd_signal": np.where(self.signal_count >= MACD_SIGN, self.signal, np.nan),
+                "bb_width": np.where(self.bars >= BB_WINDOW, (2 * BB_DEV * mstd) / mavg * 100, np.nan),
+                "volume_mean": np.where(self.volume_count > 0, self.volume_sum / np.maximum(self.volume_count, 1), np.nan),
+            }
@@ -0,0 +1,163 @@
+"""Local intent routing for free-text bot messages.
+
+One Aho–Corasick automaton holds every intent phrase, asset alias and exchange
+ticker, so a message is classified in a single pass over its text (linear in its
+length, independent of how many symbols are listed) without an LLM round trip.
+Matches only count on word boundaries.
+
+Most messages are answered locally; only what nothing matches is "chat" for the LLM:
+
+- assets: aliases, core tickers and full pairs (e.g. PEPEUSDT) in any case, other
+  listed tickers as $TICKER or in capitals. Any message naming one is a signal
+  request, whatever its length or phrasing ("how is gold doing right now");
+- a bare lowercase non-core ticker ("pepe") may be an ordinary word, so it only
+  counts in a short command next to a signal phrase ("pepe signal");
+- "shitcoin" and "meme coin" ask for the meme scan anywhere; everyday trigger
+  words ("lots", "help", "memes", ...) only in a short command.
+"""
+QUOTE = "USDT"
+
+# Intent -> trigger phrases (lowercase); several may match, INTENT_ORDER decides
+INTENT_PHRASES = {
+    "lot_size": ["lot size", "lot sizes", "lotsize", "position size", "how many lots", "risk per trade",
+                 "lots", "calculate", "calculator"],
+    "shitcoin": ["meme scan", "scan memes", "scan meme coins", "meme coin signals", "meme signals",
+                 "shitcoin scan", "scan shitcoins", "shitcoin signals",
+                 "shitcoin", "shitcoins", "meme coin", "meme coins", "memecoin", "memecoins", "memes"],
+    "signal": ["signal", "signals", "analyze", "analyse", "analysis", "long or short", "buy or sell",
+               "trade idea", "setup"],
+    "help": ["what can you do", "how do i use", "help", "commands", "menu", "how does this work"],
+}
+INTENT_ORDER = ["lot_size", "shitcoin", "signal", "help"]
+# Everyday words that only trigger their intent in a short command ("help", "memes")
+COMMAND_ONLY = {"lots", "calculate", "calculator", "memes", "help", "commands", "menu", "how does this work"}
+
+# A short command: at most this many words and not phrased as a question; gates the weak matches above
+COMMAND_WORDS = 4
+QUESTION_WORDS = {"what", "whats", "why", "how", "who", "when", "where", "which", "is", "are", "was", "were",
+                  "do", "does", "did", "can", "could", "should", "would", "will", "explain", "tell"}
+
+# Names users type for the assets the bots cover; always matched, any case
+ASSET_ALIASES = {
+    "bitcoin": "BTC", "xbt": "BTC", "ethereum": "ETH", "ether": "ETH",
+    "gold": "XAUUSD", "xau": "XAUUSD", "xauusd": "XAUUSD",
+    "solana": "SOL", "ripple": "XRP", "dogecoin": "DOGE", "shiba": "SHIB", "shiba inu": "SHIB",
+    "cardano": "ADA", "binance coin": "BNB", "litecoin": "LTC", "chainlink": "LINK", "polkadot": "DOT",
+    "avalanche": "AVAX", "tron": "TRX", "toncoin": "TON", "polygon": "MATIC",
+}
+
+def base_asset(symbol: str) -> str:
+    sym = symbol.upper()
+    return sym[:-len(QUOTE)] if sym.endswith(QUOTE) and len(sym) > len(QUOTE) else sym
+
+class PhraseMatcher:
+    """Aho–Corasick automaton over lowercase phrases; finds whole-word occurrences in one pass."""
+
+    def __init__(self, phrases: dict):
+        # phrases: lowercase phrase -> payload
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for phrase, payload in phrases.items():
+            node = 0
+            for ch in phrase:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(phrase), payload))
+        # Breadth-first failure links; each node also inherits its fallbacks' outputs
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, nxt in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def find(self, text: str) -> list:
+        """(start, end, payload) for every match bounded by non-alphanumerics, in order of end."""
+        goto, fail, out = self._goto, self._fail, self._out
+        matches, node = [], 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node] and (i + 1 == len(text) or not text[i + 1].isalnum()):
+                for length, payload in out[node]:
+                    start = i + 1 - length
+                    if start == 0 or not text[start - 1].isalnum():
+                        matches.append((start, i + 1, payload))
+        return matches
+
+class IntentRouter:
+    """Classifies a message as lot_size, shitcoin, signal, help or chat (= ask the LLM).
+
+    `symbols` is the exchange universe (e.g. ["BTCUSDT", ...]) and `core` the tickers
+    the bots always cover, recognised in any case; a mentioned asset is returned as
+    its base ticker, or XAUUSD for gold, the form analyze() takes.
+    """
+
+    def __init__(self, symbols=(), core=()):
+        core = {base_asset(c) for c in core}
+        phrases = {}
+        for symbol in symbols:
+            base = base_asset(symbol)
+            if not base.isalnum():
+                continue
+            # Full pairs are never ambiguous; bare tickers may be ordinary words
+            phrases[symbol.lower()] = ("asset", base, True)
+            phrases.setdefault(base.lower(), ("asset", base, base in core))
+        for ticker in core:
+            phrases[ticker.lower()] = ("asset", ticker, True)
+        for alias, asset in ASSET_ALIASES.items():
+            phrases[alias] = ("asset", asset, True)
+        for intent, words in INTENT_PHRASES.items():
+            for word in words:
+                phrases[word] = ("intent", intent, word not in COMMAND_ONLY)
+        self.size = len(phrases)
+        self._matcher = PhraseMatcher(phrases)
+
+    @staticmethod
+    def _typed_as_ticker(text: str, start: int, end: int) -> bool:
+        # Capitals only count from two letters up: "A" and "I" start sentences
+        return (start > 0 and text[start - 1] == "$") or (end - start > 1 and text[start:end].isupper())
+
+    @staticmethod
+    def is_command(text: str) -> bool:
+        words = "".join(c if c.isalnum() or c == "$" else " " for c in text.lower()).split()
+        return 0 < len(words) <= COMMAND_WORDS and words[0] not in QUESTION_WORDS
+
+    def classify(self, text: str) -> dict:
+        """{"intent": ..., "asset": ticker or None}; intent "chat" when nothing local applies."""
+        lowered = text.lower()
+        original = text if len(lowered) == len(text) else lowered  # case folding changed offsets
+        command = self.is_command(text)
+        intents, assets = set(), []
+        for start, end, (kind, value, strong) in self._matcher.find(lowered):
+            if kind == "intent":
+                if strong or command:
+                    intents.add(value)
+            else:
+                assets.append((start, -(end - start), value, strong or self._typed_as_ticker(original, start, end)))
+        # First asset mentioned wins; among overlapping names the longest ("shiba inu").
+        # A lowercase ticker only counts in a short command that asks for a signal.
+        assets.sort()
+        asset = next((value for _, _, value, strong in assets if strong), None)
+        if asset is None and command and "signal" in intents:
+            asset = next((value for _, _, value, _ in assets if len(value) >= 3), None)
+        for intent in INTENT_ORDER:
+            if intent not in intents or (intent == "help" and asset):
+                continue
+            if intent == "signal" and not (asset or command):
+                continue  # "what is a trading signal?"
+            if intent == "lot_size" and not (command or any(c.isdigit() for c in text)):
+                continue  # "what is a lot size?": no balance to size for
+            return {"intent": intent, "asset": asset}
+        return {"intent": "signal" if asset else "chat", "asset": asset}
@@ -0,0 +1,169 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .performance import metrics
+from .zpt_utils import get_env, log
+
+DEFAULT_JOURNAL_PATH = os.path.join("cache", "signals.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    sn TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    action TEXT,
+    confidence REAL,
+    price REAL,
+    sl REAL,
+    tp TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS signals_sn ON signals (sn);
+CREATE INDEX IF NOT EXISTS signals_asset_time ON signals (asset, created_at);
+CREATE INDEX IF NOT EXISTS signals_time ON signals (created_at);
+"""
+COLUMNS = ["sn", "asset", "symbol", "created_at", "action", "confidence", "price", "sl", "tp", "details"]
+
+def asset_key(symbol: str) -> str:
+    """Journal key for a symbol: "btc", "BTCUSDT" and "BTC" all map to "BTC"."""
+    sym = symbol.strip().upper()
+    return sym[:-4] if sym.endswith("USDT") and len(sym) > 4 else sym
+
+def normalize_sn(sn: str) -> str:
+    """Serials as users quote them back: case-insensitive, '#' optional."""
+    sn = sn.strip().upper()
+    return sn if sn.startswith("#") else f"#{sn}"
+
+class SignalJournal:
+    """Append-only SQLite (WAL) journal of every signal handed out, looked up by serial or symbol.
+
+    record() only enqueues; a background thread commits queued rows in batches, so
+    the request path never waits on disk. Several processes may share one file.
+    An empty SIGNAL_JOURNAL_PATH disables the journal.
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 200, flush_interval: float = 0.5,
+                 max_queue: int = 10_000):
+        self._path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._writer = None
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        # Resolved on first use so the env can still be set after import (benches, tests)
+        if self._path is None:
+            self._path = get_env("SIGNAL_JOURNAL_PATH", DEFAULT_JOURNAL_PATH)
+        return self._path
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def record(self, result: dict) -> None:
+        """Queue an analyze()/build_signal result (never blocks; drops with a warning when saturated)."""
+        if not self.enabled:
+            return
+        sltp = result.get("SLTP") or {}
+        row = (
+            result["SN"], asset_key(result["symbol"]), result["symbol"], time.time(), result.get("action"),
+            float(result.get("confidence") or 0), float(result.get("price") or 0),
+            sltp.get("SL"), json.dumps(sltp.get("TP", []), default=float),
+            json.dumps(result.get("details", {}), default=float),
+        )
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            metrics.inc("journal_dropped_total")
+            log("Signal journal queue full; dropping a record", level="WARNING")
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="zpt-journal", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and (left := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=left))
+                except queue.Empty:
+                    break
+            try:
+                with self._connect() as conn:
+                    conn.executemany(
+                        f"INSERT INTO signals ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", batch)
+                metrics.inc("journal_writes_total", len(batch))
+            except Exception as e:
+                metrics.inc("journal_dropped_total", len(batch))
+                log(f"Signal journal write error: {e}", level="ERROR")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued records are committed; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> dict:
+        entry = dict(row)
+        entry["tp"] = json.loads(entry["tp"] or "[]")
+        entry["details"] = json.loads(entry["details"] or "{}")
+        return entry
+
+    def by_sn(self, sn: str) -> Optional[dict]:
+        """The signal issued under a serial (the latest, should a serial ever repeat)."""
+        if not self.enabled:
+            return None
+        row = self._connect().execute(
+            "SELECT * FROM signals WHERE sn = ? ORDER BY created_at DESC LIMIT 1", (normalize_sn(sn),)).fetchone()
+        return self._entry(row) if row else None
+
+    def recent(self, symbol: Optional[str] = None, limit: int = 20) -> list:
+        """Newest-first signals for a symbol (any spelling, see asset_key), or across all symbols."""
+        if not self.enabled:
+            return []
+        if symbol:
+            rows = self._connect().execute(
+                "SELECT * FROM signals WHERE asset = ? ORDER BY created_at DESC LIMIT ?", (asset_key(symbol), limit))
+        else:
+            rows = self._connect().execute("SELECT * FROM signals ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._entry(r) for r in rows.fetchall()]
+
+journal = SignalJournal()
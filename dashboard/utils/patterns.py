@@ -0,0 +1,113 @@
+"""Vectorized candlestick pattern library.
+
+Inputs are dicts of 2-D float arrays shaped (symbols, bars) with open/high/low/
+close/volume keys (see `stack_ohlcv`); shorter histories are left-padded with NaN.
+Every pattern returns a boolean array of the same shape that is True on the bar
+completing the pattern, so one call scans every bar of every symbol. Comparisons
+against NaN are False, so padding and the first bar of two-bar patterns never match.
+"""
+import numpy as np
+import pandas as pd
+
+from .indicators import stack
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+def stack_ohlcv(frames, columns=OHLCV) -> dict:
+    """Right-aligned (symbols, bars) arrays for each column of many OHLCV frames."""
+    return {c: stack([df[c].to_numpy(dtype=float) for df in frames]) for c in columns}
+
+def _prev(x: np.ndarray, k: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, k:] = x[:, :-k]
+    return out
+
+def _body(x):
+    return np.abs(x["close"] - x["open"])
+
+def _range(x):
+    return x["high"] - x["low"]
+
+def bullish_engulfing(x) -> np.ndarray:
+    """Bearish bar followed by a bullish bar whose body covers the previous body."""
+    o, c = x["open"], x["close"]
+    o1, c1 = _prev(o), _prev(c)
+    return (c1 < o1) & (c > o) & (o <= c1) & (c >= o1)
+
+def bearish_engulfing(x) -> np.ndarray:
+    o, c = x["open"], x["close"]
+    o1, c1 = _prev(o), _prev(c)
+    return (c1 > o1) & (c < o) & (o >= c1) & (c <= o1)
+
+def bullish_pin_bar(x, wick: float = 2 / 3) -> np.ndarray:
+    """Hammer: the lower wick is at least `wick` of the bar's range and twice the body."""
+    lower = np.minimum(x["open"], x["close"]) - x["low"]
+    return (lower >= wick * _range(x)) & (lower >= 2 * _body(x)) & (_range(x) > 0)
+
+def bearish_pin_bar(x, wick: float = 2 / 3) -> np.ndarray:
+    """Shooting star: the upper wick is at least `wick` of the bar's range and twice the body."""
+    upper = x["high"] - np.maximum(x["open"], x["close"])
+    return (upper >= wick * _range(x)) & (upper >= 2 * _body(x)) & (_range(x) > 0)
+
+def inside_bar(x) -> np.ndarray:
+    return (x["high"] < _prev(x["high"])) & (x["low"] > _prev(x["low"]))
+
+def outside_bar(x) -> np.ndarray:
+    return (x["high"] > _prev(x["high"])) & (x["low"] < _prev(x["low"]))
+
+def volume_spike(x, factor: float = 1.5, window=None) -> np.ndarray:
+    """Wyckoff effort: volume above `factor` x its mean.
+
+    The mean is over the whole array by default; with `window` it is the mean of
+    the last `window` bars up to and including each bar, i.e. what a `window`-bar
+    frame's whole mean is when that bar is the newest (no look-ahead, for backtests).
+    """
+    v = x.get("volume")
+    if v is None:
+        return np.zeros(x["close"].shape, dtype=bool)
+    if window is None:
+        with np.errstate(invalid="ignore"):
+            mean = np.nanmean(v, axis=1, keepdims=True) if v.shape[1] else np.full((v.shape[0], 1), np.nan)
+    else:
+        # Rolling sums from cumulative sums: O(bars) regardless of the window length
+        total = np.cumsum(np.nan_to_num(v), axis=1)
+        count = np.cumsum(~np.isnan(v), axis=1).astype(float)
+        total[:, window:] -= total[:, :-window].copy()
+        count[:, window:] -= count[:, :-window].copy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+        mean[:, :window - 1] = np.nan
+    return v > factor * mean
+
+def upper_wick_grab(x, pct: float = 0.01) -> np.ndarray:
+    """SMC liquidity grab: an upper wick longer than `pct` of the close."""
+    return x["high"] - x["close"] > x["close"] * pct
+
+def lower_wick_rejection(x, pct: float = 0.01) -> np.ndarray:
+    """Bullish candle that traded more than `pct` below its open before closing up."""
+    return (x["close"] > x["open"]) & (x["low"] < x["open"] * (1 - pct))
+
+# name -> (detector, direction the pattern votes for)
+PATTERNS = {
+    "bullish_engulfing": (bullish_engulfing, "LONG"),
+    "bearish_engulfing": (bearish_engulfing, "SHORT"),
+    "bullish_pin_bar": (bullish_pin_bar, "LONG"),
+    "bearish_pin_bar": (bearish_pin_bar, "SHORT"),
+    "inside_bar": (inside_bar, "HOLD"),
+    "outside_bar": (outside_bar, "HOLD"),
+    "volume_spike": (volume_spike, "LONG"),
+    "upper_wick_grab": (upper_wick_grab, "LONG"),
+    "lower_wick_rejection": (lower_wick_rejection, "LONG"),
+}
+
+def detect_patterns(x: dict, names=None, **options) -> dict:
+    """Boolean (symbols, bars) arrays for each requested pattern (all by default).
+
+    Per-pattern keyword arguments go in `options`, e.g. volume_spike={"window": 100}.
+    """
+    return {name: PATTERNS[name][0](x, **options.get(name, {})) for name in (names or PATTERNS)}
+
+def pattern_frame(df: pd.DataFrame, names=None) -> pd.DataFrame:
+    """Pattern flags for one OHLC(V) DataFrame as bool columns aligned with its rows."""
+    x = stack_ohlcv([df], [c for c in OHLCV if c in df.columns])
+    return pd.DataFrame({name: hits[0] for name, hits in detect_patterns(x, names).items()}, index=df.index)
@@ -1,13 +1,136 @@
+import contextvars
+import threading
 import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Histogram bucket upper bounds (seconds) for per-stage timings
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current_path = contextvars.ContextVar("zpt_span_path", default=())
+_current_monitor = contextvars.ContextVar("zpt_monitor", default=None)
+
+class Metrics:
+    """Process-wide stage histograms and labelled counters, exportable as Prometheus text."""
+
+    def __init__(self, recent=1024):
+        self._lock = threading.Lock()
+        self._buckets = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+        self._sums = defaultdict(float)
+        self._recent = defaultdict(lambda: deque(maxlen=recent))
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self.started_at = time.time()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            idx = next((i for i, le in enumerate(BUCKETS) if seconds <= le), len(BUCKETS))
+            self._buckets[stage][idx] += 1
+            self._sums[stage] += seconds
+            self._recent[stage].append(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def gauges(self, name: str) -> dict:
+        """{labels-tuple: value} for one gauge name."""
+        with self._lock:
+            return {labels: v for (n, labels), v in self._gauges.items() if n == name}
+
+    def counters(self, name: str) -> dict:
+        """{labels-tuple: value} for one counter name."""
+        with self._lock:
+            return {labels: v for (n, labels), v in self._counters.items() if n == name}
+
+    def stage_summary(self) -> dict:
+        with self._lock:
+            recent = {stage: list(samples) for stage, samples in self._recent.items()}
+            counts = {stage: sum(b) for stage, b in self._buckets.items()}
+        return {
+            stage: {
+                "count": counts[stage],
+                "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 2),
+                "p95_ms": round(float(np.percentile(samples, 95)) * 1000, 2),
+            }
+            for stage, samples in recent.items() if samples
+        }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP zpt_stage_seconds Time spent per pipeline stage",
+            "# TYPE zpt_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, buckets in sorted(self._buckets.items()):
+                cumulative = 0
+                for le, n in zip([*map(str, BUCKETS), "+Inf"], buckets):
+                    cumulative += n
+                    lines.append(f'zpt_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'zpt_stage_seconds_sum{{stage="{stage}"}} {self._sums[stage]}')
+                lines.append(f'zpt_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE zpt_{name} counter")
+                    typed.add(name)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"zpt_{name}{{{label_text}}} {value}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE zpt_{name} gauge")
+                    typed.add(name)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"zpt_{name}{{{label_text}}} {value}")
+        lines.append("# TYPE zpt_uptime_seconds gauge")
+        lines.append(f"zpt_uptime_seconds {time.time() - self.started_at}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+@contextmanager
+def span(stage: str):
+    """Time a pipeline stage; nests under any enclosing span and reports to the active monitor."""
+    path = _current_path.get() + (stage,)
+    token = _current_path.set(path)
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        elapsed_ns = time.perf_counter_ns() - start
+        _current_path.reset(token)
+        metrics.observe(stage, elapsed_ns / 1e9)
+        monitor = _current_monitor.get()
+        if monitor is not None:
+            monitor.spans.append(("/".join(path), elapsed_ns))
 
 class PerformanceMonitor:
     def __init__(self):
-        self.start_time = None
+        self.start_ns = None
+        self.spans = []  # (path, elapsed_ns) for every span finished while this monitor was active
 
     def start(self):
-        self.start_time = time.time()
+        self.start_ns = time.perf_counter_ns()
+        _current_monitor.set(self)
 
     def elapsed(self):
-        if self.start_time is None:
+        if self.start_ns is None:
             return 0.0
-        return time.time() - self.start_time
\ No newline at end of file
+        return (time.perf_counter_ns() - self.start_ns) / 1e9
+
+    def span(self, stage: str):
+        return span(stage)
+
+    def breakdown(self) -> dict:
+        """Total milliseconds per span path, e.g. {"analyze/fetch": 120.5, "analyze/ai": 900.1}."""
+        totals = defaultdict(float)
+        for path, elapsed_ns in self.spans:
+            totals[path] += elapsed_ns / 1e6
+        return dict(totals)
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+# Seconds a quote stays fresh, by the source that produced it
+DEFAULT_QUOTE_TTLS = {"binance": 2.0, "bybit": 2.0, "stream": 2.0, "metalsapi": 60.0}
+# When the upstream fails, a quote up to this many TTLs old is served instead of nothing
+DEFAULT_MAX_STALE = 30.0
+
+class QuoteCache:
+    """TTL + LRU cache for quotes that collapses concurrent misses into one upstream call.
+
+    All calls must come from the same event loop (the price engine loop).
+    `fetch` coroutines return a (value, source) tuple; the source picks the TTL.
+    If a refetch fails the expired value is served, up to `max_stale` TTLs old.
+    """
+
+    def __init__(self, ttls=None, default_ttl=2.0, max_size=512, max_stale=DEFAULT_MAX_STALE):
+        self.ttls = dict(DEFAULT_QUOTE_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.max_stale = max_stale
+        self._entries = OrderedDict()  # key -> (value, source, stored_at)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # expired entries refetched
+        self.stale_served = 0  # expired entries returned because the refetch failed
+        self.coalesced = 0
+
+    def ttl(self, source) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    def peek(self, key):
+        """Return the cached value for key if still fresh, without touching counters."""
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[2] < self.ttl(entry[1]):
+            return entry[0]
+        return None
+
+    def lookup(self, key):
+        """peek() that counts a hit or miss, for callers that fetch on a miss themselves."""
+        value = self.peek(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value, source):
+        self._entries[key] = (value, source, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, key, fetch):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[2] < self.ttl(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.stale += 1
+        else:
+            self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield so one cancelled waiter doesn't cancel the shared upstream call
+        return await asyncio.shield(task)
+
+    async def _load(self, key, fetch):
+        value, source = await fetch()
+        if value is not None:
+            self.put(key, value, source)
+            return value
+        # Upstream failed: fall back to the last known quote unless it is too old to trust
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[2] < self.ttl(entry[1]) * self.max_stale:
+            self.stale_served += 1
+            return entry[0]
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "stale_served": self.stale_served,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,43 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second refill up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, weight: float = 1) -> float:
+        """Take `weight` tokens if available; otherwise return the seconds to wait (0.0 on success)."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= weight:
+                self._tokens -= weight
+                return 0.0
+            return (weight - self._tokens) / self.rate
+
+    def drain(self, tokens: float = 0.0):
+        """Cap the available tokens (e.g. to what the server says is left)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, tokens)
+
+    def acquire(self, weight: float = 1, timeout=None) -> bool:
+        """Block until `weight` tokens are taken; False if that would exceed `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(weight)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
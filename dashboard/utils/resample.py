@@ -0,0 +1,108 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import config
+from .zpt_utils import get_env
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "8h": 28_800_000,
+    "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+# Binance weeks open Monday 00:00 UTC; the Unix epoch was a Thursday
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+# Settings: env overrides config.toml's [resample] table, which may hold per-symbol tables:
+#   [resample]                 timeframes = ["15m", "1h", "4h"]   bases = ["15m", "1d"]
+#   [resample.symbols.DOGEUSDT] timeframes = ["1h", "4h", "1d"]
+DEFAULT_TIMEFRAMES = "15m,1h,4h"
+DEFAULT_BASES = "15m,1d"
+
+def _intervals(value) -> list:
+    items = value.split(",") if isinstance(value, str) else value
+    return [i.strip() for i in items if i.strip() in INTERVAL_MS]
+
+def _setting(symbol: Optional[str], key: str, env: str, default: str) -> list:
+    section = config.get("resample", {})
+    per_symbol = section.get("symbols", {}).get((symbol or "").upper(), {})
+    if key in per_symbol:
+        return _intervals(per_symbol[key])
+    return _intervals(get_env(env, section.get(key, default)))
+
+def mtf_timeframes(symbol: Optional[str] = None) -> list:
+    """Timeframes scored by multi_timeframe_confluence (MTF_TIMEFRAMES)."""
+    return _setting(symbol, "timeframes", "MTF_TIMEFRAMES", DEFAULT_TIMEFRAMES) or _intervals(DEFAULT_TIMEFRAMES)
+
+def resample_bases(symbol: Optional[str] = None) -> list:
+    """Base series downloaded per symbol (RESAMPLE_BASES); every other timeframe is derived from one.
+
+    An empty list fetches every timeframe natively.
+    """
+    return _setting(symbol, "bases", "RESAMPLE_BASES", DEFAULT_BASES)
+
+def _offset(interval: str) -> int:
+    return WEEK_OFFSET_MS if interval == "1w" else 0
+
+def bar_open(open_time, interval: str):
+    """Open time (ms) of the `interval` bar containing `open_time` (scalar or array)."""
+    step, offset = INTERVAL_MS[interval], _offset(interval)
+    return (open_time - offset) // step * step + offset
+
+def can_resample(base: str, target: str) -> bool:
+    """Whether whole `base` bars tile every `target` bar exactly."""
+    if base not in INTERVAL_MS or target not in INTERVAL_MS:
+        return False
+    b, t = INTERVAL_MS[base], INTERVAL_MS[target]
+    return t > b and t % b == 0 and _offset(target) % b == 0
+
+def pick_base(target: str, bases) -> Optional[str]:
+    """Coarsest configured base that `target` is (or can be resampled from); None = fetch natively."""
+    usable = [b for b in bases if b == target or can_resample(b, target)]
+    return max(usable, key=INTERVAL_MS.get) if usable else None
+
+def base_bars_needed(base: str, target: str, limit: int) -> int:
+    # One extra target bar covers a partial leading bucket that gets dropped
+    return (limit + 1) * (INTERVAL_MS[target] // INTERVAL_MS[base])
+
+def _floats(series: pd.Series) -> np.ndarray:
+    try:
+        return series.to_numpy(dtype=float)  # also parses Binance's numeric strings, much faster than to_numeric
+    except (TypeError, ValueError):
+        return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+
+def resample_klines(df: pd.DataFrame, target: str) -> pd.DataFrame:
+    """Aggregate a kline frame into `target` bars aligned to exchange bar boundaries.
+
+    open=first, high=max, low=min, close=last, volumes/trade counts summed. The
+    first bucket is dropped when the base history starts part-way through it; the
+    last bucket is the forming bar, exactly like the exchange's own latest candle.
+    """
+    if df.empty:
+        return df
+    step = INTERVAL_MS[target]
+    df = df.sort_values("open_time")
+    buckets = bar_open(df["open_time"].to_numpy(dtype=np.int64), target)
+    # Rows are sorted, so each bucket is one contiguous run starting at `starts`
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    col = lambda c: _floats(df[c])
+    summed = lambda c: np.add.reduceat(col(c), starts)
+    out = pd.DataFrame({
+        "open_time": buckets[starts],
+        "open": col("open")[starts],
+        "high": np.maximum.reduceat(col("high"), starts),
+        "low": np.minimum.reduceat(col("low"), starts),
+        "close": col("close")[ends],
+        "volume": summed("volume"),
+        "close_time": buckets[starts] + step - 1,
+        "qav": summed("qav"),
+        "num_trades": np.nan_to_num(summed("num_trades")).astype("int64"),
+        "taker_base_vol": summed("taker_base_vol"),
+        "taker_quote_vol": summed("taker_quote_vol"),
+        "ignore": "0",
+    })
+    if int(df["open_time"].iloc[0]) != int(out["open_time"].iloc[0]):
+        out = out.iloc[1:]
+    return out.reset_index(drop=True)
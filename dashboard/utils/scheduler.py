@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from .performance import metrics
+from .ratelimit import TokenBucket
+from .zpt_utils import log
+
+# Lower runs first: Telegram/UI requests jump ahead of the signal refresher and scans
+PRIORITIES = {"interactive": 0, "normal": 1, "background": 2}
+
+_priority = contextvars.ContextVar("zpt_request_priority", default="interactive")
+
+@contextmanager
+def request_priority(name: str):
+    """Tag outbound requests made inside the block (on this thread/task) with a priority class."""
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> str:
+    return _priority.get()
+
+async def with_priority(coro, name: str):
+    """Await `coro` under `name`; used to carry a caller's priority onto the engine loop."""
+    with request_priority(name):
+        return await coro
+
+def request_weight(source: str, path: str, params: Optional[dict] = None) -> int:
+    """Request weight as charged by the exchange (Binance spot API weights)."""
+    params = params or {}
+    if source == "binance":
+        if path.endswith("/api/v3/klines"):
+            limit = int(params.get("limit", 500))
+            return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+        if path.endswith("/api/v3/ticker/price"):
+            return 2 if "symbol" in params else 4
+    return 1
+
+class SourceLimit:
+    """Budget for one upstream: `limit` weight per `window` seconds, scheduled at `safety` of it."""
+
+    def __init__(self, limit: float, window: float, safety: float = 0.8, burst: float = 5.0):
+        self.limit = limit
+        self.window = window
+        self.nominal_rate = limit * safety / window
+        self.bucket = TokenBucket(rate=self.nominal_rate, capacity=self.nominal_rate * burst)
+        self.queue = []  # heap of (priority, seq, weight, future)
+        self.pump: Optional[asyncio.Task] = None
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.used = None  # last used-weight reported by the exchange
+
+# Published IP limits: Binance 6000 weight/min, Bybit 600 requests/5s; MetalPriceAPI is plan-bound
+DEFAULT_LIMITS = {
+    "binance": lambda: SourceLimit(6000, 60),
+    "bybit": lambda: SourceLimit(600, 5, safety=0.5),
+    "metalsapi": lambda: SourceLimit(60, 60),
+}
+
+class RequestScheduler:
+    """Weight budgets, priority queues and adaptive backoff for outbound exchange requests.
+
+    All calls must come from the same event loop (the price engine loop). Sources
+    without a limit (e.g. the market-data daemon) are never delayed. Budgets follow
+    the exchanges' own accounting via their used-weight headers; a 418/429 pauses
+    the source (Retry-After or exponential) and halves its rate, which then creeps
+    back to nominal on successful responses.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = {src: make() for src, make in (limits or DEFAULT_LIMITS).items()}
+        self._seq = itertools.count()
+
+    async def acquire(self, source: str, weight: float = 1, priority: Optional[str] = None):
+        lim = self.limits.get(source)
+        if lim is None:
+            return
+        rank = PRIORITIES.get(priority or current_priority(), PRIORITIES["normal"])
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(lim.queue, (rank, next(self._seq), weight, fut))
+        if lim.pump is None or lim.pump.done():
+            lim.pump = asyncio.ensure_future(self._pump(source, lim))
+        started = time.monotonic()
+        await fut
+        waited = time.monotonic() - started
+        if waited > 0.05:
+            metrics.inc("ratelimit_wait_seconds_total", waited, source=source)
+
+    async def _pump(self, source: str, lim: SourceLimit):
+        """Grant queued requests in priority order as the budget allows."""
+        while lim.queue:
+            _, _, weight, fut = lim.queue[0]
+            if fut.done():  # caller gave up (deadline/cancel)
+                heapq.heappop(lim.queue)
+                continue
+            pause = lim.paused_until - time.monotonic()
+            wait = pause if pause > 0 else lim.bucket.try_acquire(weight)
+            if wait > 0:
+                # Re-check the head afterwards: a higher-priority request may have arrived meanwhile
+                await asyncio.sleep(min(wait, 1.0))
+                continue
+            heapq.heappop(lim.queue)
+            fut.set_result(None)
+
+    def observe(self, source: str, status: int, headers) -> None:
+        """Feed back a response: used-weight headers, rate-limit statuses and recovery."""
+        lim = self.limits.get(source)
+        if lim is None:
+            return
+        now = time.monotonic()
+        if status in (418, 429):
+            lim.strikes += 1
+            retry_after = headers.get("Retry-After")
+            backoff = float(retry_after) if retry_after else min(2.0 ** lim.strikes, 120.0)
+            lim.paused_until = max(lim.paused_until, now + backoff)
+            lim.bucket.rate = max(lim.bucket.rate / 2, lim.nominal_rate / 16)
+            lim.bucket.drain()
+            metrics.inc("ratelimit_backoff_total", source=source, status=str(status))
+            log(f"{source} rate limited ({status}); pausing {backoff:.1f}s at {lim.bucket.rate:.1f}/s", level="WARNING")
+            return
+        if status < 400:
+            lim.strikes = 0
+            lim.bucket.rate = min(lim.nominal_rate, lim.bucket.rate + lim.nominal_rate * 0.05)
+        used = headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None:
+            lim.used = int(used)
+            remaining = lim.limit * 0.9 - lim.used
+            if remaining <= 0:
+                # Exchange says the minute is spent: wait for its window to roll over
+                lim.paused_until = max(lim.paused_until, now + lim.window - time.time() % lim.window)
+            lim.bucket.drain(max(remaining, 0))
+        remaining = headers.get("X-Bapi-Limit-Status")
+        if remaining is not None:
+            lim.used = int(headers.get("X-Bapi-Limit", lim.limit)) - int(remaining)
+            if int(remaining) <= 1:
+                reset_ms = headers.get("X-Bapi-Limit-Reset-Timestamp")
+                reset_in = (int(reset_ms) / 1000 - time.time()) if reset_ms else lim.window
+                lim.paused_until = max(lim.paused_until, now + max(reset_in, 0.0))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            src: {
+                "rate": round(lim.bucket.rate, 2),
+                "queued": sum(1 for *_, fut in lim.queue if not fut.done()),
+                "paused_s": round(max(lim.paused_until - now, 0.0), 1),
+                "used": lim.used,
+            }
+            for src, lim in self.limits.items()
+        }
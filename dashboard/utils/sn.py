@@ -1,8 +1,102 @@
-import random
-from datetime import datetime
+"""Time-ordered, collision-free IDs for signal serials and referral codes.
+
+IDs are 63-bit Snowflake-style integers:
+
+    41 bits  milliseconds since ID_EPOCH (good until 2093)
+    10 bits  node: SN_NODE_ID, or derived from hostname + pid
+    12 bits  per-process sequence
+
+Timestamps come from a monotonic clock anchored to wall time at startup, so they
+never step back within a process. When 4096 IDs are drawn within one millisecond
+the next ones borrow the following millisecond instead of waiting, so IDs are
+strictly increasing per process. Set SN_NODE_ID (0-1023) per container/process
+to rule out node collisions; the derived node is only probabilistically distinct.
+"""
+import os
+import socket
+import threading
+import time
+import zlib
+
+ID_EPOCH_MS = 1_704_067_200_000  # 2024-01-01 UTC
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+NODE_MASK = (1 << NODE_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # base32 without I, L, O, U
+
+class IdGenerator:
+    """Thread-safe generator of time-ordered 63-bit IDs (see module docstring).
+
+    CPython has no compare-and-swap, so the (millisecond, sequence) update is one
+    short critical section; at well under a microsecond it is never the bottleneck.
+    """
+
+    def __init__(self, node=None):
+        self._fixed_node = node
+        self._reset()
+
+    def _reset(self):
+        self._node = self._fixed_node
+        self._wall_ms = time.time_ns() // 1_000_000
+        self._mono_ns = time.monotonic_ns()
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._seq = 0
+
+    @property
+    def node(self) -> int:
+        if self._node is None:
+            configured = os.getenv("SN_NODE_ID")
+            if configured:
+                self._node = int(configured) & NODE_MASK
+            else:
+                self._node = zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode()) & NODE_MASK
+        return self._node
+
+    def now_ms(self) -> int:
+        return self._wall_ms + (time.monotonic_ns() - self._mono_ns) // 1_000_000
+
+    def next_id(self) -> int:
+        node = self.node
+        now = self.now_ms() - ID_EPOCH_MS
+        with self._lock:
+            if now > self._last_ms:
+                self._last_ms, self._seq = now, 0
+            elif self._seq < SEQUENCE_MASK:
+                self._seq += 1
+            else:
+                self._last_ms, self._seq = self._last_ms + 1, 0
+            ms, seq = self._last_ms, self._seq
+        return (ms << (NODE_BITS + SEQUENCE_BITS)) | (node << SEQUENCE_BITS) | seq
+
+    def after_fork(self):
+        """A forked child must not share its parent's node, sequence or (possibly held) lock."""
+        self._reset()
+
+def id_time_ms(value: int) -> int:
+    """Unix milliseconds an ID was generated at."""
+    return (value >> (NODE_BITS + SEQUENCE_BITS)) + ID_EPOCH_MS
+
+def encode_id(value: int) -> str:
+    """Fixed-width (13 char) Crockford base32; string order matches numeric order."""
+    chars = []
+    for _ in range(13):
+        chars.append(CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def decode_id(code: str) -> int:
+    value = 0
+    for c in code.upper():
+        value = value * 32 + CROCKFORD.index(c)
+    return value
+
+ids = IdGenerator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ids.after_fork)
 
 def generate_sn(asset):
-    """Generate unique serial number for each signal."""
-    now = datetime.utcnow()
-    code = random.randint(1000,9999)
-    return f"#SN-{code}-{asset}-{now.strftime('%m%d')}"
\ No newline at end of file
+    """Generate unique serial number for each signal: #SN-<id>-<ASSET>-<MMDD>, MMDD in UTC."""
+    value = ids.next_id()
+    return f"#SN-{encode_id(value)}-{asset}-{time.strftime('%m%d', time.gmtime(id_time_ms(value) / 1000))}"
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+import pandas as pd
+try:
+    import websockets
+except ImportError:
+    websockets = None  # streaming disabled, prices/candles keep coming from REST
+
+from .candle_store import klines_to_frame
+from .zpt_utils import get_env, log
+
+BINANCE_WS_URL = get_env("BINANCE_WS_URL", "wss://stream.binance.com:9443")
+BYBIT_WS_URL = get_env("BYBIT_WS_URL", "wss://stream.bybit.com/v5/public/linear")
+
+class StreamFeed:
+    """Latest quotes and forming candles kept current from exchange websocket streams.
+
+    Binance supplies tickers and klines (the analysis klines are Binance's), Bybit
+    supplies tickers only. Each connection reconnects with jittered exponential
+    backoff; while a source is down its data is not served, and `on_connect` is
+    awaited after every (re)connect so callers can backfill the gap over REST.
+    """
+
+    def __init__(self, max_age: float = 5.0, max_candles: int = 500):
+        self.max_age = max_age
+        self.max_candles = max_candles
+        self.quotes = {}  # symbol -> (price, received_at monotonic, source)
+        self._candles = defaultdict(dict)  # (symbol, interval) -> {open_time: kline row}
+        self._candles_lock = threading.Lock()  # written on the engine loop, read from caller threads
+        self._live = {"binance": False, "bybit": False}
+        self._futures = []
+        self.on_connect = None  # async callable(source, symbols)
+        self.reconnects = 0
+
+    @property
+    def enabled(self) -> bool:
+        return websockets is not None
+
+    def is_live(self, source: str = "binance") -> bool:
+        return self._live.get(source, False)
+
+    def quote(self, symbol: str) -> Optional[float]:
+        entry = self.quotes.get(symbol)
+        if entry and self._live.get(entry[2]) and time.monotonic() - entry[1] <= self.max_age:
+            return entry[0]
+        return None
+
+    def candles(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Candles streamed since the current Binance connection opened (incl. the forming one)."""
+        with self._candles_lock:
+            rows = self._candles.get((symbol, interval))
+            if not self._live["binance"] or not rows:
+                return None
+            rows = [rows[t] for t in sorted(rows)]
+        return klines_to_frame(rows)
+
+    # --- message handling ---
+
+    def _set_quote(self, symbol: str, price, source: str):
+        try:
+            self.quotes[symbol] = (float(price), time.monotonic(), source)
+        except (TypeError, ValueError):
+            pass
+
+    def handle_binance(self, msg: dict):
+        data = msg.get("data", msg)
+        event = data.get("e")
+        if event in ("24hrMiniTicker", "24hrTicker"):
+            self._set_quote(data["s"], data.get("c"), "binance")
+        elif event == "kline":
+            k = data["k"]
+            with self._candles_lock:
+                rows = self._candles[(data["s"], k["i"])]
+                rows[k["t"]] = [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], "0"]
+                if len(rows) > self.max_candles:
+                    del rows[min(rows)]
+            self._set_quote(data["s"], k["c"], "binance")
+
+    def handle_bybit(self, msg: dict):
+        topic = msg.get("topic", "")
+        if topic.startswith("tickers."):
+            data = msg.get("data", {})
+            if data.get("lastPrice") is not None:  # deltas may omit unchanged fields
+                self._set_quote(data.get("symbol", topic.split(".", 1)[1]), data["lastPrice"], "bybit")
+
+    # --- connections ---
+
+    async def _connection(self, source: str, url: str, handle, subscribe=None, heartbeat=None, symbols=()):
+        delay = 1.0
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=20, open_timeout=10) as ws:
+                    if subscribe is not None:
+                        await ws.send(json.dumps(subscribe))
+                    self._live[source] = True
+                    delay = 1.0
+                    log(f"{source} stream connected")
+                    if self.on_connect is not None:
+                        await self.on_connect(source, list(symbols))
+                    while True:
+                        try:
+                            raw = await asyncio.wait_for(ws.recv(), timeout=20)
+                        except asyncio.TimeoutError:
+                            if heartbeat is None:
+                                raise
+                            await ws.send(json.dumps(heartbeat))
+                            continue
+                        try:
+                            handle(json.loads(raw))
+                        except (KeyError, TypeError, ValueError) as e:
+                            log(f"{source} stream: skipped malformed message ({e})", level="DEBUG")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"{source} stream error: {e}", level="WARNING")
+            finally:
+                self._live[source] = False
+                if source == "binance":
+                    # Candles received on a dead connection may have gaps; REST backfills them
+                    with self._candles_lock:
+                        self._candles.clear()
+            self.reconnects += 1
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            delay = min(delay * 2, 60.0)
+
+    def start(self, loop: asyncio.AbstractEventLoop, symbols, intervals=("15m", "1h", "4h")):
+        """Open both exchange streams on `loop` (the price engine loop)."""
+        if not self.enabled:
+            log("websockets not installed; live stream disabled", level="WARNING")
+            return
+        if self._futures:
+            return
+        symbols = list(symbols)
+        streams = [f"{s.lower()}@miniTicker" for s in symbols]
+        streams += [f"{s.lower()}@kline_{i}" for s in symbols for i in intervals]
+        binance = self._connection(
+            "binance", f"{BINANCE_WS_URL}/stream?streams={'/'.join(streams)}", self.handle_binance, symbols=symbols)
+        bybit = self._connection(
+            "bybit", BYBIT_WS_URL, self.handle_bybit,
+            subscribe={"op": "subscribe", "args": [f"tickers.{s}" for s in symbols]},
+            heartbeat={"op": "ping"}, symbols=symbols)
+        self._futures = [asyncio.run_coroutine_threadsafe(c, loop) for c in (binance, bybit)]
+
+    def stop(self):
+        for fut in self._futures:
+            fut.cancel()
+        self._futures = []
@@ -2,7 +2,10 @@ import os
 import logging
 from dotenv import load_dotenv
 from datetime import datetime
-import random
+import time
+from .performance import metrics
+from .breaker import breaker_report
+from .sn import encode_id, ids
 
 # Error-tolerant loading
 try:
@@ -42,12 +45,40 @@ def map_symbol(symbol: str) -> str:
     return sym if sym.endswith("USDT") else f"{sym}USDT"
 
 def health_report() -> dict:
-    """Return system health metrics (stub implementation)."""
-    return {}
+    """Return system health metrics: uptime, per-stage latency, upstream calls and breaker state per source."""
+    calls, errors = {}, {}
+    for labels, value in metrics.counters("upstream_requests_total").items():
+        labels = dict(labels)
+        source = labels.get("source", "unknown")
+        calls[source] = int(calls.get(source, 0) + value)
+        if labels.get("outcome") != "ok":
+            errors[source] = int(errors.get(source, 0) + value)
+    return {
+        "uptime_s": int(time.time() - metrics.started_at),
+        "stages": metrics.stage_summary(),
+        "upstream_calls": calls,
+        "upstream_errors": errors,
+        "breakers": breaker_report(),
+    }
+
+def health_summary(health: dict, assets) -> dict:
+    """Short, flat status for users: core asset prices, uptime and whether each data source is up.
+
+    `health` is a price_health() result; its stage, call and rate-limit diagnostics stay
+    on /metrics and /health.
+    """
+    summary = {asset: health.get(asset) if health.get(asset) is not None else "unavailable" for asset in assets}
+    uptime = health.get("uptime_s")
+    if uptime is not None:
+        summary["uptime"] = f"{int(uptime) // 3600}h {int(uptime) % 3600 // 60:02d}m"
+    breakers = health.get("breakers") or {}
+    if breakers:
+        states = {"closed": "ok", "half_open": "recovering"}
+        summary["data sources"] = ", ".join(f"{name} {states.get(b.get('state'), 'down')}" for name, b in breakers.items())
+    return summary
 
 def generate_referral_code(user_id):
-    base = f"{user_id}-{random.randint(1000,9999)}"
-    return f"REF-{base}"
+    return f"REF-{user_id}-{encode_id(ids.next_id())}"
 
 def get_aura_points(user_data):
     return user_data.get("aura_points", 0)
@@ -17,9 +17,15 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 load_dotenv(os.path.join(script_dir, ".env"))
 
 from utils.zpt_utils import get_env
+from utils.candle_cache import CandleCache
+from utils.patterns import pattern_frame
 
+# Daily bars persisted between runs; closed days are final so only missing days are fetched
+_daily_cache = CandleCache()
+DAILY_COLUMNS = ["date", "open", "high", "low", "close"]
 
-def fetch_daily_ohlc(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+
+def _fetch_timeseries(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
     api_key = get_env("METALS_API_KEY")
     if not api_key:
         print("ERROR: METALS_API_KEY not set. Please add your Metals-API key to dashboard/.env", file=sys.stderr)
@@ -49,25 +55,60 @@ def fetch_daily_ohlc(symbol: str, start_date: str, end_date: str) -> pd.DataFram
             "low": bar.get("l"),
             "close": bar.get("c"),
         })
+    if not rows:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
     df = pd.DataFrame(rows).sort_values("date")
     df[["open", "high", "low", "close"]] = df[["open", "high", "low", "close"]].astype(float)
     return df
 
 
+def _missing_ranges(cached_dates, start_date: str, end_date: str, today: str) -> list:
+    """(first, last) runs of days in [start_date, end_date] to fetch: closed days not cached
+    (placeholders for days without a bar count as cached) and today onwards, still forming."""
+    have = {d for d in cached_dates if d < today}
+    ranges = []
+    for day in pd.date_range(start_date, end_date, freq="D"):
+        if day.strftime("%Y-%m-%d") in have:
+            continue
+        if ranges and day - ranges[-1][1] == pd.Timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [(first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")) for first, last in ranges]
+
+
+def fetch_daily_ohlc(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    name = f"{symbol}_1d"
+    cached = _daily_cache.load(name, key="date")
+    today = datetime.now(timezone.utc).date().isoformat()
+    ranges = _missing_ranges(cached["date"] if not cached.empty else [], start_date, end_date, today)
+    # One request per gap, so ranges cached by earlier runs are never downloaded again
+    fetched = [_fetch_timeseries(symbol, first, last) for first, last in ranges]
+    fresh = pd.concat(fetched, ignore_index=True) if fetched else pd.DataFrame(columns=DAILY_COLUMNS)
+    # Closed days are final. Days without a bar (weekends, holidays) are stored as empty
+    # placeholders so they are not requested again; the forming day is never stored
+    requested = [d.strftime("%Y-%m-%d") for first, last in ranges for d in pd.date_range(first, last, freq="D")]
+    returned = set(fresh["date"])
+    no_bar = pd.DataFrame({"date": [d for d in requested if d < today and d not in returned]})
+    no_bar = no_bar.reindex(columns=DAILY_COLUMNS).astype({c: float for c in DAILY_COLUMNS[1:]})
+    closed = [f for f in (fresh[fresh["date"] < today], no_bar) if not f.empty]
+    if closed:
+        _daily_cache.append(name, pd.concat(closed, ignore_index=True), key="date")
+    frames = [f for f in (cached, fresh) if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    df = df.drop_duplicates("date", keep="last").sort_values("date").dropna(subset=["close"])
+    return df[(df["date"] >= start_date) & (df["date"] <= end_date)].reset_index(drop=True)
+
+
 def detect_bullish_engulfing(df: pd.DataFrame) -> bool:
     """
     Returns True if the last two bars form a bullish engulfing pattern.
     """
     if len(df) < 2:
         return False
-    prev, curr = df.iloc[-2], df.iloc[-1]
-    # previous must be bearish, current must be bullish
-    if prev["close"] >= prev["open"] or curr["close"] <= curr["open"]:
-        return False
-    # curr body engulfs prev body
-    if curr["open"] > prev["close"] or curr["close"] < prev["open"]:
-        return False
-    return True
+    return bool(pattern_frame(df, ["bullish_engulfing"])["bullish_engulfing"].iloc[-1])
 
 
 def main():
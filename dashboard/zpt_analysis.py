@@ -1,13 +1,7 @@
+from functools import cached_property
+
+import numpy as np
 import pandas as pd
-import requests
-import ta
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
-try:
-    from ta.trend import MACD
-except ImportError:
-    MACD = None  # or raise ImportError("MACD indicator not found in ta.trend")
-import openai
 from utils import (
     get_env,
     log,
@@ -17,135 +11,233 @@ from utils import (
     get_aura_points,
     pro_features_unlocked,
     generate_sn,
+    CandleStore,
+    CandleCache,
+    klines_to_frame,
+    resample_klines,
+    pick_base,
+    base_bars_needed,
+    mtf_timeframes,
+    resample_bases,
+    TTLMemo,
+    span,
 )
-from zpt_pricefeed import get_price, get_new_bybit_coins
+from utils.indicators import compute_indicators
+from utils.patterns import stack_ohlcv, detect_patterns
+import zpt_llm as llm
+from zpt_pricefeed import get_price, fetch_json, run_sync, live_feed, client_mode, query_marketdata, BINANCE_API_URL
 
-openai.api_key = get_env("OPENAI_API_KEY")
+BINANCE_KLINES_PER_REQUEST = 1000
+# Longest base window kept per (symbol, base interval); bounds the bars derived timeframes can use
+MAX_BASE_BARS = int(get_env("RESAMPLE_MAX_BARS", 2000))
 
-def fetch_ohlc_binance(symbol: str, interval: str = "1h", limit: int = 100) -> pd.DataFrame:
-    url = f"https://api.binance.com/api/v3/klines?symbol={map_symbol(symbol)}&interval={interval}&limit={limit}"
+def _fetch_klines(symbol: str, interval: str, limit: int, start_time=None) -> pd.DataFrame:
+    """Klines in pages of at most 1000: forwards from start_time, else backwards from now."""
+    url = f"{BINANCE_API_URL}/api/v3/klines"
+    rows, end_time = [], None
     try:
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
-        df = pd.DataFrame(data, columns=[
-            "open_time", "open", "high", "low", "close", "volume",
-            "close_time", "qav", "num_trades", "taker_base_vol", "taker_quote_vol", "ignore"
-        ])
-        for col in ["open", "high", "low", "close", "volume"]:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        return df
+        while len(rows) < limit:
+            params = {"symbol": map_symbol(symbol), "interval": interval,
+                      "limit": min(limit - len(rows), BINANCE_KLINES_PER_REQUEST)}
+            if start_time is not None:
+                params["startTime"] = start_time
+            elif end_time is not None:
+                params["endTime"] = end_time
+            with span("fetch"):
+                page = run_sync(fetch_json(url, params))
+            if not isinstance(page, list):
+                raise ValueError(page)
+            rows = rows + page if start_time is not None else page + rows
+            if len(page) < params["limit"]:
+                break
+            if start_time is not None:
+                start_time = int(page[-1][6]) + 1
+            else:
+                end_time = int(page[0][0]) - 1
+        return klines_to_frame(rows)
     except Exception as e:
         log(f"OHLC fetch error: {e}", level="ERROR")
         return pd.DataFrame()
 
+# Rolling candle windows; after warm-up only the forming/new candles are fetched.
+# Fetched bars are also persisted so restarted processes warm-start from disk.
+_candles = CandleStore(_fetch_klines, max_bars=MAX_BASE_BARS, disk=CandleCache())
+
+def fetch_ohlc_binance(symbol: str, interval: str = "1h", limit: int = 100) -> pd.DataFrame:
+    """OHLCV for any timeframe; those above a configured base are resampled from that base's series."""
+    if client_mode():
+        rows = query_marketdata("/ohlc", {"symbol": symbol, "interval": interval, "limit": limit})
+        if rows is not None:
+            return klines_to_frame(rows)
+    bases = resample_bases(symbol)
+    base = pick_base(interval, bases)
+    if base is None:
+        return _stored_klines(symbol, interval, limit)
+    df = _stored_klines(symbol, base, _base_window(symbol, bases, base, interval, limit))
+    if base != interval:
+        df = resample_klines(df.tail(base_bars_needed(base, interval, limit)), interval)
+    return df.tail(limit).reset_index(drop=True)
+
+def _base_window(symbol: str, bases: list, base: str, interval: str, limit: int) -> int:
+    """Base bars to keep: enough for this request and for every configured timeframe derived from the base."""
+    needs = [base_bars_needed(base, tf, 100) for tf in mtf_timeframes(symbol) if pick_base(tf, bases) == base]
+    return min(max([base_bars_needed(base, interval, limit) if base != interval else limit] + needs), MAX_BASE_BARS)
+
+def _stored_klines(symbol: str, interval: str, limit: int) -> pd.DataFrame:
+    # While the kline stream is live, streamed candles extend the stored window without REST;
+    # a gap (e.g. after a reconnect) falls through to the incremental REST backfill.
+    live = live_feed.candles(map_symbol(symbol), interval)
+    if live is not None:
+        _candles.apply_live(symbol, interval, live)
+    return _candles.get(symbol, interval, limit)
+
 def multi_timeframe_confluence(symbol: str) -> dict:
-    timeframes = ["15m", "1h", "4h"]
-    results = {}
-    for tf in timeframes:
-        df = fetch_ohlc_binance(symbol, interval=tf, limit=100)
-        action, conf = ta_signal(df) if not df.empty else ("HOLD", 0.5)
-        results[tf] = {"action": action, "confidence": conf}
-    actions = [r["action"] for r in results.values()]
-    final = max(set(actions), key=actions.count)
-    avg_conf = sum([r["confidence"] for r in results.values()]) / len(results)
-    return {"action": final, "confidence": avg_conf, "details": results}
+    if client_mode():
+        mtf = query_marketdata("/confluence", {"symbol": symbol})
+        if mtf is not None:
+            return mtf
+    return confluence_batch({symbol: confluence_frames(symbol)})[symbol]
+
+def confluence_frames(symbol: str) -> dict:
+    """The 100-bar frame of every timeframe multi_timeframe_confluence votes on, by timeframe."""
+    return {tf: fetch_ohlc_binance(symbol, interval=tf, limit=100) for tf in mtf_timeframes(symbol)}
+
+def confluence_batch(frames: dict) -> dict:
+    """multi_timeframe_confluence for many symbols' confluence_frames, scored in one indicator pass."""
+    keys = [(symbol, tf) for symbol, by_tf in frames.items() for tf in by_tf]
+    signals = dict(zip(keys, ta_signals([frames[symbol][tf] for symbol, tf in keys])))
+    out = {}
+    for symbol, by_tf in frames.items():
+        results = {tf: {"action": signals[symbol, tf][0], "confidence": signals[symbol, tf][1]} for tf in by_tf}
+        actions = [r["action"] for r in results.values()]
+        final = max(set(actions), key=actions.count)
+        avg_conf = sum([r["confidence"] for r in results.values()]) / len(results)
+        out[symbol] = {"action": final, "confidence": avg_conf, "details": results}
+    return out
+
+SIGNAL_PATTERNS = ["upper_wick_grab", "volume_spike", "lower_wick_rejection"]
+SL_TP_LEVELS = 6
+
+def signal_arrays(cols: dict, volume_window=None):
+    """ta_signal's action and confidence at every bar of (symbols, bars) OHLCV arrays.
+
+    `volume_window=None` scores volume against the whole array (ta_signal on a frame);
+    with a window each bar sees the same mean it would as the newest bar of a frame
+    that long, so backtests reproduce live signals bar by bar.
+    """
+    with span("indicators"):
+        ind = compute_indicators(cols["close"], cols["volume"])
+        patterns = detect_patterns(cols, SIGNAL_PATTERNS, volume_spike={"window": volume_window})
+    # SMC wick grab, Wyckoff volume spike and candle rejection each vote on every bar
+    longs = sum(patterns[name].astype(int) for name in SIGNAL_PATTERNS)
+    action = np.where(longs >= 2, "LONG", "HOLD")
+    confidence = np.where(action != "HOLD", 0.90, 0.80)
+    oversold = (ind["rsi"] < 30) & (ind["macd"] > ind["macd_signal"])
+    overbought = ~oversold & (ind["rsi"] > 70) & (ind["macd"] < ind["macd_signal"])
+    action = np.where(oversold, "LONG", np.where(overbought, "SHORT", action))
+    confidence = np.minimum(confidence + np.where(oversold | overbought, 0.05, 0.0), 0.99)
+    return action, confidence
+
+def ta_signals(frames) -> list[tuple[str, float]]:
+    """Vectorized ta_signal over many OHLCV frames: one indicator pass for all symbols."""
+    results = [("HOLD", 0.5)] * len(frames)
+    idx = [i for i, df in enumerate(frames) if not df.empty]
+    if not idx:
+        return results
+    action, confidence = signal_arrays(stack_ohlcv([frames[i] for i in idx]))
+    for j, i in enumerate(idx):
+        results[i] = (str(action[j, -1]), float(confidence[j, -1]))
+    return results
 
 def ta_signal(df: pd.DataFrame) -> tuple[str, float]:
-    if df.empty:
-        return "HOLD", 0.5
-    # Calculate RSI and add to DataFrame
-    rsi = RSIIndicator(df["close"])
-    df["rsi"] = rsi.rsi()
-    if MACD is not None:
-        macd = MACD(df["close"])
-        df["macd"] = macd.macd()
-        df["macd_signal"] = macd.macd_signal()
-    else:
-        df["macd"] = 0
-        df["macd_signal"] = 0
-    df["bb_width"] = BollingerBands(df["close"]).bollinger_wband()
-    last = df.iloc[-1]
-    wick_size = last["high"] - last["close"]
-    smc_signal = "LONG" if wick_size > last["close"] * 0.01 else "SHORT" if wick_size < -last["close"] * 0.01 else "HOLD"
-    wyckoff_signal = "LONG" if last["volume"] > df["volume"].mean() * 1.5 else "HOLD"
-    candle_signal = "HOLD"
-    if (last["close"] > last["open"] and (last["low"] < last["open"] * 0.99)):
-        candle_signal = "LONG"
-    votes = [smc_signal, wyckoff_signal, candle_signal]
-    final_action = max(set(votes), key=votes.count)
-    confidence = 0.90 if final_action != "HOLD" else 0.80
-    if last["rsi"] < 30 and last["macd"] > last["macd_signal"]:
-        final_action = "LONG"
-        confidence += 0.05
-    elif last["rsi"] > 70 and last["macd"] < last["macd_signal"]:
-        final_action = "SHORT"
-        confidence += 0.05
-    confidence = min(confidence, 0.99)
-    return final_action, confidence
+    return ta_signals([df])[0]
+
+def sl_tp_levels(close, volatility, confidence):
+    """Long-side SL, TP1..TP6 and the number of TPs offered, vectorized over entries."""
+    close, volatility = np.asarray(close, dtype=float), np.asarray(volatility, dtype=float)
+    sl = close - volatility
+    tp = close[..., None] + volatility[..., None] * np.arange(1, SL_TP_LEVELS + 1)
+    n_tp = np.where(np.asarray(confidence) < 0.9, 3, SL_TP_LEVELS)
+    return sl, tp, n_tp
 
 def sl_tp_logic(df, confidence):
     if df.empty:
         return {"SL": None, "TP": []}
-    latest = df.iloc[-1]
-    volatility = df["high"].std()
-    sl = latest["close"] - volatility
-    tp = []
-    if confidence < 0.9:
-        tp = [latest["close"] + volatility * i for i in range(1, 4)]
-    else:
-        tp = [latest["close"] + volatility * i for i in range(1, 7)]
-    return {"SL": round(sl,2), "TP": [round(x,2) for x in tp]}
+    sl, tp, n_tp = sl_tp_levels(df["close"].iloc[-1], df["high"].std(), confidence)
+    return {"SL": round(float(sl), 2), "TP": [round(float(x), 2) for x in tp[:int(n_tp)]]}
 
 
-def ai_explain(symbol: str, action: str, price: float, confidence: float) -> str:
+AI_UNAVAILABLE = "AI explanation unavailable."
+
+# Explanations memoized by (symbol, action, price bucket, confidence %); identical in-flight prompts share one call
+_explanations = TTLMemo(ttl=float(get_env("AI_EXPLAIN_TTL", 900)))
+
+def _price_bucket(price: float) -> float:
+    """Round to 3 significant digits so tiny ticks reuse the same explanation."""
+    return float(f"{price:.3g}") if price else 0.0
+
+def _ai_explain(symbol: str, action: str, price: float, confidence: float) -> str:
     prompt = (
         f"Asset: {symbol}, Price: {price}, Signal: {action}, Confidence: {int(confidence*100)}%.\n"
         f"Explain in plain English the technical and AI logic behind this signal, referencing multi-timeframe, SMC, Wyckoff, and candle analysis. "
         f"Keep it concise but informative for traders."
     )
     try:
-        # Updated to use new OpenAI client
-        import openai
-        client = openai.OpenAI(api_key=get_env("OPENAI_API_KEY"))
-        
-        resp = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150,
-            temperature=0.7
-        )
-        content = getattr(resp.choices[0].message, "content", None)
-        if content is not None:
-            return content.strip()
-        else:
-            return "AI explanation unavailable."
+        # Memoized by _explanations with a coarser key, so the gateway's exact-match cache is skipped
+        return llm.complete_sync(prompt, max_tokens=150, temperature=0.7, cache=False) or AI_UNAVAILABLE
     except Exception as e:
         log(f"OpenAI error: {e}", level="ERROR")
-        return "AI explanation unavailable."
+        return AI_UNAVAILABLE
+
+def ai_explain(symbol: str, action: str, price: float, confidence: float) -> str:
+    key = (symbol.upper(), action, _price_bucket(price), int(confidence * 100))
+    return _explanations.get(
+        key,
+        lambda: _ai_explain(symbol, action, price, confidence),
+        cacheable=lambda text: text != AI_UNAVAILABLE,
+    )
+
+class SignalResult(dict):
+    """analyze() result; `.explanation` (an attribute, not a key) is generated and paid for on first access."""
+
+    def __init__(self, *args, explain=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._explain = explain
+
+    @cached_property
+    def explanation(self) -> str:
+        return self._explain() if self._explain is not None else AI_UNAVAILABLE
 
-def analyze(symbol: str = "BTCUSDT", user_data=None) -> dict:
-    mtf = multi_timeframe_confluence(symbol)
-    price = get_price(symbol)
+def build_signal(symbol: str, mtf: dict, price=None, user_data=None) -> dict:
+    """Expensive part of analyze(): price, SL/TP, serial and a lazy AI explanation for a scored symbol.
+
+    Nothing is journaled here: callers that hand the signal to a user record it (see zpt_intents).
+    """
+    if price is None:
+        price = get_price(symbol)
     if price is None:
         price = 0.0
-    explanation = ai_explain(symbol, mtf["action"], price, mtf["confidence"])
     df = fetch_ohlc_binance(symbol)
     sltp = sl_tp_logic(df, mtf["confidence"])
     sn = generate_sn(symbol)
     aura_points = get_aura_points(user_data or {})
     pro_unlocked = pro_features_unlocked(user_data or {})
-    return {
+    result = SignalResult({
         "symbol": symbol,
         "action": mtf["action"],
         "confidence": mtf["confidence"],
         "price": price,
         "details": mtf["details"],
-        "explanation": explanation,
         "SLTP": sltp,
         "SN": sn,
         "aura_points": aura_points,
         "pro_unlocked": pro_unlocked
-    }
+    }, explain=lambda: ai_explain(symbol, mtf["action"], price, mtf["confidence"]))
+    return result
+
+def analyze(symbol: str = "BTCUSDT", user_data=None, price=None) -> dict:
+    with span("analyze"):
+        return build_signal(symbol, multi_timeframe_confluence(symbol), price, user_data)
 
 def vibe_response(user_vibe, trade_signal):
     if user_vibe == "revenge":
@@ -159,20 +251,11 @@ def vibe_response(user_vibe, trade_signal):
 
 def meme_shitcoin_analysis(user_data=None):
     """Analyze meme/shitcoins, filter for 90%+ confidence, short/long-term."""
-    coins = ["DOGEUSDT", "SHIBUSDT", "PEPEUSDT"]
-    # Add new Bybit coins
-    new_bybit_coins = get_new_bybit_coins()
-    coins += [c for c in new_bybit_coins if c not in coins]
-    results = []
-    for coin in coins:
-        res = analyze(coin, user_data)
-        # Only include ultra-high-confidence signals (95.5%+)
-        if res["confidence"] >= 0.955:
-            res["trend"] = "long-term" if res["action"] == "LONG" else "short-term" if res["action"] == "SHORT" else "hold"
-            results.append(res)
-    return results
+    from zpt_scanner import iter_meme_scan
+    return [res for _, _, res in iter_meme_scan(user_data) if res is not None]
 
 if __name__ == "__main__":
     print("Meme/Shitcoin analysis:")
     for r in meme_shitcoin_analysis({"aura_points": 200, "pro_unlock_code_valid": True}):
-        print(r)
\ No newline at end of file
+        print(r)
+        print(f"  AI: {r.explanation}")
\ No newline at end of file
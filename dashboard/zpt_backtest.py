@@ -0,0 +1,217 @@
+"""Backtest ta_signal's votes and sl_tp_logic's levels against OHLC history.
+
+    python zpt_backtest.py                                  # candle cache, 15m/1h/4h
+    python zpt_backtest.py --source synthetic --count 40 --years 3 --output bt.json
+    python zpt_backtest.py --source fixtures                # klines recorded by bench.record
+
+`synthetic` needs no network or recorded data, so it is the offline source (CI,
+scale runs); `fixtures` replays whatever `python -m bench.record` saved.
+
+Each symbol's base series is loaded once and the other timeframes are resampled
+from it. Every bar is scored in one vectorized pass with the same kernels as the
+live signals (signal_arrays, sl_tp_levels), each bar seeing what a `window`-bar
+frame ending there would. Every LONG/SHORT bar opens an independent trade at its
+close: a win if TP1 trades before the SL within `horizon` bars, a loss if the SL
+trades first or in the same bar, otherwise it expires. sl_tp_logic only emits
+long-side levels, so SHORT trades use the same distances mirrored. Symbols run in
+parallel worker processes.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import CandleCache, INTERVAL_MS, klines_to_frame, log, resample_klines
+from utils.patterns import stack_ohlcv
+from utils.resample import can_resample
+from zpt_analysis import SL_TP_LEVELS, signal_arrays, sl_tp_levels
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench", "fixtures")
+DEFAULT_SYMBOLS = ["BTCUSDT", "ETHUSDT", "DOGEUSDT", "SHIBUSDT", "PEPEUSDT"]
+FRAME_BARS = 100  # live signals and SL/TP are computed on 100-bar frames
+ENTRY_CHUNK = 20_000  # entries simulated per block, bounds the (entries, horizon) arrays
+
+# --- history sources ---
+
+def synthetic_klines(symbol: str, interval: str, bars: int, end_ms=None) -> pd.DataFrame:
+    """Deterministic fat-tailed random walk per symbol, for offline scale runs."""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    step = INTERVAL_MS[interval]
+    end = (end_ms or int(time.time() * 1000)) // step * step
+    open_time = end - step * np.arange(bars, dtype=np.int64)[::-1]
+    sigma = 0.0015 * np.sqrt(step / INTERVAL_MS["15m"])
+    close = 100 * np.exp(np.cumsum(rng.standard_t(4, bars) * sigma))
+    open_ = np.r_[100.0, close[:-1]]
+    wicks = np.abs(rng.standard_t(4, (2, bars))) * sigma * 0.6
+    volume = rng.gamma(2.0, 50.0, bars) * np.where(rng.random(bars) < 0.05, 4, 1)
+    return pd.DataFrame({
+        "open_time": open_time, "open": open_, "high": np.maximum(open_, close) * (1 + wicks[0]),
+        "low": np.minimum(open_, close) * (1 - wicks[1]), "close": close, "volume": volume,
+        "close_time": open_time + step - 1, "qav": volume * close, "num_trades": rng.integers(100, 1000, bars),
+        "taker_base_vol": 0.0, "taker_quote_vol": 0.0, "ignore": "0",
+    })
+
+def fixture_symbols(interval: str) -> list:
+    """Symbols with a recorded `interval` kline fixture."""
+    prefix, suffix = "binance_klines_", f"_{interval}.json"
+    names = os.listdir(FIXTURES_DIR) if os.path.isdir(FIXTURES_DIR) else []
+    return sorted(n[len(prefix):-len(suffix)] for n in names if n.startswith(prefix) and n.endswith(suffix))
+
+def load_history(source: str, symbol: str, interval: str, bars: int) -> pd.DataFrame:
+    """History for one series: the on-disk candle cache, recorded bench fixtures or synthetic."""
+    if source == "synthetic":
+        return synthetic_klines(symbol, interval, bars)
+    if source == "fixtures":
+        path = os.path.join(FIXTURES_DIR, f"binance_klines_{symbol}_{interval}.json")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        with open(path) as f:
+            return klines_to_frame(json.load(f)).tail(bars).reset_index(drop=True)
+    df = CandleCache().load(f"{symbol}_{interval}")
+    return df.tail(bars).reset_index(drop=True) if not df.empty else df
+
+# --- simulation ---
+
+def _first_true(hit: np.ndarray) -> np.ndarray:
+    """Index of the first True per row, or the row length if none."""
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), hit.shape[1])
+
+def simulate(df: pd.DataFrame, horizon: int, window: int = FRAME_BARS) -> dict:
+    """Score every bar of `df` and resolve the trade each LONG/SHORT bar would open."""
+    action, confidence = (a[0] for a in signal_arrays(stack_ohlcv([df]), volume_window=window))
+    high, low, close = (df[c].to_numpy(dtype=float) for c in ("high", "low", "close"))
+    # sl_tp_logic's volatility: std of the highs across the frame
+    volatility = pd.Series(high).rolling(window).std().to_numpy()
+    n = len(df)
+    entries = np.flatnonzero((action != "HOLD") & ~np.isnan(volatility) & (np.arange(n) < n - horizon))
+    out = {"confidence": [], "side": [], "outcome": [], "tp_reached": []}
+    for block in np.array_split(entries, max(1, -(-len(entries) // ENTRY_CHUNK))):
+        if not len(block):
+            continue
+        side = np.where(action[block] == "LONG", 1.0, -1.0)
+        # Shorts are simulated as longs on negated prices: SL above, TPs below the entry
+        sl, tp, n_tp = sl_tp_levels(side * close[block], volatility[block], confidence[block])
+        ahead = block[:, None] + np.arange(1, horizon + 1)
+        up = np.where(side[:, None] > 0, high[ahead], -low[ahead])
+        down = np.where(side[:, None] > 0, low[ahead], -high[ahead])
+        sl_at = _first_true(down <= sl[:, None])
+        tp_at = np.stack([_first_true(up >= tp[:, k, None]) for k in range(SL_TP_LEVELS)], axis=1)
+        win = tp_at[:, 0] < sl_at
+        outcome = np.where(win, 1, np.where(sl_at < horizon, 0, -1))
+        reached = ((tp_at < sl_at[:, None]) & (np.arange(SL_TP_LEVELS) < n_tp[:, None])).sum(axis=1)
+        for key, values in (("confidence", confidence[block]), ("side", side), ("outcome", outcome), ("tp_reached", reached)):
+            out[key].append(values)
+    return {k: np.concatenate(v) if v else np.array([]) for k, v in out.items()}
+
+def backtest_symbol(symbol: str, source: str, base: str, timeframes, bars: int, horizon: int, window: int) -> dict:
+    """Trades per timeframe for one symbol; runs in a worker process."""
+    history = load_history(source, symbol, base, bars)
+    results = {}
+    if history.empty:
+        log(f"Backtest: no {base} history for {symbol} ({source})", level="WARNING")
+        return results
+    for tf in timeframes:
+        if tf == base:
+            df = history
+        elif can_resample(base, tf):
+            df = resample_klines(history, tf)
+        else:
+            log(f"Backtest: {tf} cannot be built from {base}; skipped", level="WARNING")
+            continue
+        if len(df) > window + horizon:
+            results[tf] = simulate(df, horizon, window)
+    return results
+
+# --- reporting ---
+
+def summarize(trades: dict) -> dict:
+    """Win rate, expiry share and confidence calibration for one timeframe's trades."""
+    outcome, confidence = trades["outcome"], trades["confidence"]
+    resolved = outcome >= 0
+    wins = outcome == 1
+    report = {
+        "trades": int(len(outcome)),
+        "long": int((trades["side"] > 0).sum()),
+        "short": int((trades["side"] < 0).sum()),
+        "win_rate": float(wins[resolved].mean()) if resolved.any() else None,
+        "expired": float((~resolved).mean()) if len(outcome) else None,
+        "avg_tp_reached": float(trades["tp_reached"].mean()) if len(outcome) else None,
+        "brier": float(((confidence[resolved] - wins[resolved]) ** 2).mean()) if resolved.any() else None,
+        "calibration": [],
+    }
+    for conf in np.unique(np.round(confidence, 2)):
+        sel = resolved & (np.round(confidence, 2) == conf)
+        if sel.any():
+            report["calibration"].append({
+                "confidence": float(conf), "trades": int(sel.sum()), "realized": float(wins[sel].mean())})
+    return report
+
+def run(symbols, source: str = "cache", base: str = "15m", timeframes=("15m", "1h", "4h"), bars: int = 50_000,
+        horizon: int = FRAME_BARS, window: int = FRAME_BARS, workers=None) -> dict:
+    jobs = [(s, source, base, list(timeframes), bars, horizon, window) for s in symbols]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            per_symbol = list(pool.map(backtest_symbol, *zip(*jobs)))
+    else:
+        per_symbol = [backtest_symbol(*job) for job in jobs]
+    report = {}
+    for tf in timeframes:
+        parts = [r[tf] for r in per_symbol if tf in r]
+        if parts:
+            report[tf] = summarize({k: np.concatenate([p[k] for p in parts]) for k in parts[0]})
+    return report
+
+def _pct(x) -> str:
+    return f"{x * 100:5.1f}%" if x is not None else "   n/a"
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["cache", "fixtures", "synthetic"], default="cache")
+    parser.add_argument("--symbols", nargs="*", help="default: the majors and memes; fixtures: every recorded symbol")
+    parser.add_argument("--count", type=int, help="synthetic: number of generated symbols (overrides --symbols)")
+    parser.add_argument("--years", type=float, default=1.0, help="synthetic: history length")
+    parser.add_argument("--base", default="15m", help="series loaded per symbol; timeframes are resampled from it")
+    parser.add_argument("--timeframes", nargs="*", default=["15m", "1h", "4h"])
+    parser.add_argument("--bars", type=int, default=50_000, help="most recent base bars used (cache/fixtures)")
+    parser.add_argument("--horizon", type=int, default=FRAME_BARS, help="bars a trade may stay open")
+    parser.add_argument("--window", type=int, default=FRAME_BARS, help="bars per signal frame, as in live analysis")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    symbols = args.symbols or DEFAULT_SYMBOLS
+    bars = args.bars
+    if args.source == "fixtures" and not args.symbols:
+        symbols = fixture_symbols(args.base)
+        if not symbols:
+            print(f"No {args.base} klines in {FIXTURES_DIR}: record them with `python -m bench.record` "
+                  f"or run offline with --source synthetic", file=sys.stderr)
+            return 1
+    if args.source == "synthetic":
+        bars = int(args.years * 365 * 86_400_000 / INTERVAL_MS[args.base])
+        if args.count:
+            symbols = [f"SYN{i:03d}USDT" for i in range(args.count)]
+
+    started = time.perf_counter()
+    report = run(symbols, args.source, args.base, args.timeframes, bars, args.horizon, args.window, args.workers)
+    elapsed = time.perf_counter() - started
+    for tf, r in report.items():
+        print(f"{tf:4s} trades={r['trades']:7d} (long {r['long']}, short {r['short']}) win={_pct(r['win_rate'])} "
+              f"expired={_pct(r['expired'])} avg_tp={r['avg_tp_reached'] or 0:.2f} brier={r['brier'] or 0:.3f}")
+        for row in r["calibration"]:
+            print(f"      advertised {_pct(row['confidence'])} -> realized {_pct(row['realized'])} over {row['trades']} trades")
+    print(f"{len(symbols)} symbols, up to {bars} {args.base} bars each, in {elapsed:.1f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"symbols": symbols, "source": args.source, "elapsed_s": elapsed, "timeframes": report}, f, indent=2)
+    return 0 if report else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Free-text message routing shared by the worker and manager bots.
+
+classify() runs the local IntentRouter (utils/intents.py) over the exchange's
+symbol universe, refreshed in the background every ROUTER_REFRESH seconds; until
+the first refresh lands the core assets are recognised. The answer_* coroutines
+reply to the locally handled intents; everything else goes to the LLM.
+"""
+import asyncio
+import re
+import time
+
+from utils import IntentRouter, get_env, log, map_symbol, get_aura_points, handler_pool, journal, metrics
+from zpt_analysis import analyze
+from zpt_pricefeed import CORE_ASSETS, get_symbols_async
+from zpt_replies import ProgressiveReply, reply, render_meme_signals, render_signal
+from zpt_scanner import iter_meme_scan
+
+ROUTER_REFRESH = float(get_env("ROUTER_REFRESH", 3600))
+ROUTER_RETRY = 60.0  # after a failed refresh
+# A full meme scan may legitimately take a while; it still gives up (and cancels) past this
+SCAN_TIMEOUT = float(get_env("SCAN_TIMEOUT", 180))
+
+_router = IntentRouter([map_symbol(a) for a in CORE_ASSETS if a != "XAUUSD"], core=CORE_ASSETS)
+_next_refresh = 0.0
+_refreshing = None
+
+async def refresh():
+    """Rebuild the router from the current symbol universe (built off the event loop)."""
+    global _router, _next_refresh
+    try:
+        symbols = await get_symbols_async()
+        if not symbols:
+            raise ValueError("empty symbol universe")
+        _router = await asyncio.to_thread(IntentRouter, symbols, CORE_ASSETS)
+        _next_refresh = time.monotonic() + ROUTER_REFRESH
+        log(f"Intent router rebuilt: {len(symbols)} symbols, {_router.size} phrases")
+    except Exception as e:
+        _next_refresh = time.monotonic() + ROUTER_RETRY
+        log(f"Intent router refresh failed: {e}", level="WARNING")
+
+def classify(text: str) -> dict:
+    """Intent of a free-text message; a due refresh is started in the background, never awaited."""
+    global _refreshing
+    if time.monotonic() >= _next_refresh and (_refreshing is None or _refreshing.done()):
+        try:
+            _refreshing = asyncio.get_running_loop().create_task(refresh())
+        except RuntimeError:
+            pass  # no event loop (scripts): keep the current router
+    intent = _router.classify(text)
+    metrics.inc("intents_total", intent=intent["intent"])
+    return intent
+
+def lot_size_text(text: str) -> str:
+    """2% risk with a 200-pip stop on gold; the first amount in the message is the balance."""
+    match = re.search(r"([£$€]?)(\d+(\.\d+)?)", text)
+    balance = float(match.group(2)) if match else 30
+    risk_pct = 0.02
+    sl_pips = 200
+    account_currency = match.group(1) if match else "£"
+    risk_amount = balance * risk_pct
+    lot_size = risk_amount / (sl_pips * 10)
+    return (
+        f"For a {account_currency}{balance} balance on gold/XAUUSD:\n"
+        f"- Max risk per trade: {account_currency}{risk_amount:.2f}\n"
+        f"- Suggested lot size: {lot_size:.3f}\n"
+        f"Adjust lot size for tighter SL/lower risk."
+    )
+
+async def answer_signal(message, user_id, asset: str):
+    user_data = {"aura_points": get_aura_points({"id": user_id}), "pro_unlock_code_valid": True}
+    # Show the signal as soon as it is scored, then fill in the AI reasoning by editing the same message
+    card = ProgressiveReply(message)
+    result = await card.wait_for(handler_pool.run(user_id, analyze, asset, user_data), f"Analyzing {asset}…")
+    await card.finish(render_signal(asset, result))
+    journal.record(result)  # only signals a user received; snapshots and the dashboard are not journaled
+    explanation = await handler_pool.run(user_id, lambda: result.explanation)
+    await card.finish(render_signal(asset, result, explanation))
+
+async def answer_meme_scan(message, user_id):
+    status = ProgressiveReply(message)
+    await status.update("Scanning meme coins...")
+    signals = []
+    scan = None
+    # Advance the scan on the handler pool and report progress by editing one message;
+    # the whole scan shares one slot/timeout and closing the generator cancels queued coins
+    try:
+        async with handler_pool.slot(user_id, timeout=SCAN_TIMEOUT):
+            scan = await handler_pool.execute(iter_meme_scan)
+            while (item := await handler_pool.execute(next, scan, None)) is not None:
+                done, total, res = item
+                if res is not None:
+                    signals.append(res)
+                if done < total:
+                    await status.update(f"Scanning meme coins... {done}/{total} ({len(signals)} signals)")
+    finally:
+        if scan is not None:
+            try:
+                scan.close()
+            except ValueError:
+                pass  # a step is still running on the pool; the generator closes when it returns
+    await status.finish(render_meme_signals(signals))
+    for res in signals:
+        journal.record(res)
+
+async def answer_intent(message, user_id, intent: dict, handled=("lot_size", "shitcoin", "signal")) -> bool:
+    """Reply to a locally handled intent; False for "help", "chat" and intents not in `handled`."""
+    if intent["intent"] not in handled:
+        return False
+    if intent["intent"] == "lot_size":
+        await reply(message, lot_size_text(message.text))
+    elif intent["intent"] == "shitcoin":
+        await answer_meme_scan(message, user_id)
+    elif intent["intent"] == "signal" and intent["asset"]:
+        await answer_signal(message, user_id, intent["asset"])
+    elif intent["intent"] == "signal":
+        await reply(message, "Which asset? Send e.g. \"btc signal\", \"eth\" or \"gold\".")
+    else:
+        return False
+    return True
@@ -0,0 +1,170 @@
+"""Shared LLM gateway: one pooled OpenAI client, concurrency caps, a response cache and streaming.
+
+All OpenAI traffic runs on the price engine loop (see zpt_pricefeed), so the bots'
+event loops, analysis threads and Streamlit share one keep-alive connection pool,
+one global concurrency cap and one cache:
+
+- at most LLM_MAX_CONCURRENCY requests in flight, at most LLM_PER_USER per user
+  (a user's extra questions queue behind their own, not everyone's); calls
+  without a user_id (e.g. AI explanations) are only held to the global cap;
+- identical requests (same prompt, model, max_tokens, temperature) within
+  LLM_CACHE_TTL are answered from memory, and concurrent ones share one call;
+- `stream` yields the answer while it is generated, for replies edited in place.
+
+OPENAI_BASE_URL points the client at another server, e.g. bench/fake_upstream.py.
+"""
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncIterator, Optional
+
+import openai
+
+from utils import get_env, metrics, span, QuoteCache
+from zpt_pricefeed import _get_engine_loop, run_async, run_sync
+
+OPENAI_MODEL = get_env("OPENAI_MODEL", "gpt-4")
+LLM_TIMEOUT = float(get_env("LLM_TIMEOUT", 30))
+LLM_MAX_CONCURRENCY = int(get_env("LLM_MAX_CONCURRENCY", 8))
+LLM_PER_USER = int(get_env("LLM_PER_USER", 1))
+
+# Exact-match answers, all stored under the "openai" source and its TTL
+_responses = QuoteCache(ttls={"openai": float(get_env("LLM_CACHE_TTL", 600))},
+                        max_size=int(get_env("LLM_CACHE_SIZE", 1024)))
+
+# Engine-loop state
+_client: Optional[openai.AsyncOpenAI] = None
+_global_slots: Optional[asyncio.Semaphore] = None
+_user_slots = {}  # user_id -> [asyncio.Semaphore, refcount]
+_in_flight = 0
+_END = object()
+
+def _openai() -> openai.AsyncOpenAI:
+    """Return the pooled client; only called from the engine loop."""
+    global _client
+    if _client is None:
+        # Keep-alive pool; in-flight requests are already capped by _slot
+        _client = openai.AsyncOpenAI(api_key=get_env("OPENAI_API_KEY"), timeout=LLM_TIMEOUT)
+    return _client
+
+@asynccontextmanager
+async def _slot(user_id):
+    """Per-user, then global concurrency limit (engine loop); anonymous calls only take the global one."""
+    global _global_slots, _in_flight
+    if _global_slots is None:
+        _global_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    entry = None
+    if user_id is not None:
+        entry = _user_slots.setdefault(user_id, [asyncio.Semaphore(LLM_PER_USER), 0])
+        entry[1] += 1
+    try:
+        async with entry[0] if entry else nullcontext(), _global_slots:
+            _in_flight += 1
+            metrics.set_gauge("llm_in_flight", _in_flight)
+            try:
+                yield
+            finally:
+                _in_flight -= 1
+                metrics.set_gauge("llm_in_flight", _in_flight)
+    finally:
+        if entry:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _user_slots.pop(user_id, None)
+
+def _request(prompt: str, max_tokens: int, temperature) -> dict:
+    request = {"model": OPENAI_MODEL, "messages": [{"role": "user", "content": prompt}], "max_tokens": max_tokens}
+    if temperature is not None:
+        request["temperature"] = temperature
+    return request
+
+def _key(request: dict) -> tuple:
+    return (request["model"], request["messages"][-1]["content"], request["max_tokens"], request.get("temperature"))
+
+async def _create(request: dict, user_id, stream: bool = False):
+    """One chat.completions call inside the concurrency limits; yields text deltas."""
+    async with _slot(user_id):
+        outcome = "ok"
+        try:
+            with span("ai"):
+                if not stream:
+                    resp = await _openai().chat.completions.create(**request)
+                    yield resp.choices[0].message.content or ""
+                    return
+                chunks = await _openai().chat.completions.create(**request, stream=True)
+                async for chunk in chunks:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            metrics.inc("upstream_requests_total", source="openai", outcome=outcome)
+
+async def _complete(request: dict, user_id, cache: bool) -> str:
+    async def fetch():
+        text = "".join([delta async for delta in _create(request, user_id)]).strip()
+        return text or None, "openai"
+    if not cache:
+        return (await fetch())[0] or ""
+    return await _responses.get(_key(request), fetch) or ""
+
+async def _stream(request: dict, user_id, cache: bool, emit) -> str:
+    """Stream on the engine loop, calling emit(text so far) per delta; cached answers are emitted whole."""
+    key = _key(request)
+    cached = _responses.lookup(key) if cache else None
+    if cached is not None:
+        emit(cached)
+        return cached
+    text = ""
+    async for delta in _create(request, user_id, stream=True):
+        text += delta
+        emit(text)
+    text = text.strip()
+    if cache and text:
+        _responses.put(key, text, "openai")
+    return text
+
+async def complete(prompt: str, user_id=None, max_tokens: int = 200, temperature=None, cache: bool = True) -> str:
+    """Whole answer to `prompt`; awaitable from any event loop. Raises on OpenAI errors."""
+    return await run_async(_complete(_request(prompt, max_tokens, temperature), user_id, cache))
+
+def complete_sync(prompt: str, user_id=None, max_tokens: int = 200, temperature=None, cache: bool = True) -> str:
+    """complete() for threads (analysis, Streamlit); must not be called on the engine loop."""
+    return run_sync(_complete(_request(prompt, max_tokens, temperature), user_id, cache))
+
+async def stream(prompt: str, user_id=None, max_tokens: int = 200, temperature=None,
+                 cache: bool = True) -> AsyncIterator[str]:
+    """Yield the answer so far as tokens arrive (a slow consumer skips to the latest text).
+
+    The request runs on the engine loop; closing the iterator early cancels it.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def emit(text):
+        if not loop.is_closed():  # the consumer's loop may be gone by the time a cancelled call ends
+            loop.call_soon_threadsafe(queue.put_nowait, text)
+
+    done = asyncio.run_coroutine_threadsafe(
+        _stream(_request(prompt, max_tokens, temperature), user_id, cache, emit), _get_engine_loop())
+    done.add_done_callback(lambda _: emit(_END))
+    try:
+        finished = False
+        while not finished and (text := await queue.get()) is not _END:
+            while not queue.empty():
+                latest = queue.get_nowait()
+                if latest is _END:
+                    finished = True
+                    break
+                text = latest
+            yield text
+        done.result()  # surface upstream errors after whatever was already shown
+    finally:
+        done.cancel()
+
+def cache_stats() -> dict:
+    return _responses.stats()
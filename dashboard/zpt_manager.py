@@ -1,4 +1,3 @@
-import asyncio
 from telegram import Update
 from telegram.ext import ApplicationBuilder, MessageHandler, CommandHandler, filters, ContextTypes
 import telegram.ext._updater as _updater_mod
@@ -7,71 +6,74 @@ class _PatchedUpdater(_updater_mod.Updater):
 _updater_mod.Updater = _PatchedUpdater
 import telegram.ext._applicationbuilder as _appb_mod
 _appb_mod.Updater = _PatchedUpdater
-from telegram.constants import ParseMode
-from zpt_pricefeed import price_health
-from utils import get_env, log, generate_referral_code, get_aura_points
-from zpt_analysis import analyze, meme_shitcoin_analysis
-import openai
-
-try:
-    openai.api_key = get_env("OPENAI_API_KEY")
-except Exception as e:
-    log(f"OpenAI key setup error: {e}", level="ERROR")
+from zpt_pricefeed import start_stream
+from zpt_signals import signal_service
+from zpt_replies import send_dashboard, send_streamed, send_signal_lookup, send_history, reply
+from utils import get_env, log, generate_referral_code, get_aura_points, handler_pool, PoolBusy
+import zpt_llm as llm
+from zpt_intents import answer_intent, classify
 
 MANAGER_BOT_TOKEN = get_env("MANAGER_BOT_TOKEN")
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(
+    await reply(
+        update.message,
         "👋 Hi! I am the Manager Bot.\n"
         "Send any text to get AI-powered answers, or use /dashboard to view system health and signals."
     )
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(
+    await reply(
+        update.message,
         "/start - Welcome message\n"
         "/help - This help text\n"
         "/dashboard - Show system health and AI signals\n"
-        "<any text> - Ask me anything!"
+        "/signal <serial> - Look up a signal by its serial\n"
+        "/history <asset> [n] - Last signals issued for an asset\n"
+        "<any text> - Ask me anything! Send \"meme scan\" for meme coin signals"
     )
 
 async def dashboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    health = price_health()
-    health_lines = [f"{k}: {v}" for k, v in health.items()]
-    await update.message.reply_text(
-        "*System Health:*\n" + "\n".join(health_lines),
-        parse_mode=ParseMode.MARKDOWN,
-    )
-    assets = ["BTC", "ETH", "XAUUSD"]
-    for asset in assets:
-        res = analyze(asset)
-        await update.message.reply_text(
-            f"*{asset}* signal: {res['action']}, Confidence: {int(res['confidence']*100)}%",
-            parse_mode=ParseMode.MARKDOWN,
-        )
+    # Rendered from the background-refreshed snapshot as one message; no exchange/OpenAI calls per request
+    await send_dashboard(update.message)
+
+async def signal_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await reply(update.message, "Usage: /signal <serial>, e.g. /signal #SN-0K4ZQ7M1B2C3D-BTCUSDT-0101")
+        return
+    await send_signal_lookup(update.message, context.args[0])
+
+async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await reply(update.message, "Usage: /history <asset> [count], e.g. /history btc 5")
+        return
+    limit = int(context.args[1]) if len(context.args) > 1 and context.args[1].isdigit() else 5
+    await send_history(update.message, context.args[0], min(limit, 20))
 
 async def natural_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
-        text = update.message.text.lower()
-        if "shitcoin" in text or "meme coin" in text:
-            signals = meme_shitcoin_analysis()
-            if signals:
-                reply = "\n".join([f"{s['symbol']}: score {s['score']:.2f}" for s in signals])
-                await update.message.reply_text("Shitcoin signals (90%+):\n" + reply)
-            else:
-                await update.message.reply_text("No high-potential shitcoin signals now.")
+        user_id = update.effective_user.id
+        # "Ask me anything": only meme scans and help are answered locally, the rest goes to the LLM
+        intent = classify(update.message.text)
+        if await answer_intent(update.message, user_id, intent, handled=("shitcoin",)):
             return
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": update.message.text}],
-            max_tokens=200
-        )
-        await update.message.reply_text(response.choices[0].message.content.strip())
+        if intent["intent"] == "help":
+            await help_command(update, context)
+            return
+        async with handler_pool.slot(user_id):
+            await send_streamed(update.message, llm.stream(update.message.text, user_id=user_id))
+    except PoolBusy:
+        await reply(update.message, "I'm handling a lot of requests right now, please try again in a moment.")
+    except TimeoutError:
+        await reply(update.message, "That took too long, please try again.")
     except Exception as e:
         log(f"Manager natural message error: {e}", level="ERROR")
-        await update.message.reply_text("Error processing request. Check logs or try again.")
+        await reply(update.message, "Error processing request. Check logs or try again.")
 
 async def _on_startup(app):
     await app.bot.delete_webhook(drop_pending_updates=True)
+    start_stream()
+    signal_service.start()
 
 def main():
     try:
@@ -79,11 +81,14 @@ def main():
             ApplicationBuilder()
             .token(MANAGER_BOT_TOKEN)
             .post_init(_on_startup)
+            .concurrent_updates(True)  # handlers await their work; don't serialize users behind each other
             .build()
         )
         app.add_handler(CommandHandler("start", start_command))
         app.add_handler(CommandHandler("help", help_command))
         app.add_handler(CommandHandler("dashboard", dashboard_command))
+        app.add_handler(CommandHandler("signal", signal_command))
+        app.add_handler(CommandHandler("history", history_command))
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, natural_message))
         log("Manager bot running (natural language)...")
         app.run_polling()
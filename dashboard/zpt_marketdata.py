@@ -0,0 +1,103 @@
+"""Shared market-data daemon: the one process that talks to the exchanges.
+
+It owns upstream fetching, the quote/candle caches, the websocket feed, indicator
+computation and the signal snapshots, and serves them over a small localhost
+HTTP API. Bots and the Streamlit UI set MARKETDATA_URL to run in client mode.
+
+    python zpt_marketdata.py
+
+GET /price?symbol=BTC                       -> price or null
+GET /prices?symbols=BTC,ETH                 -> {symbol: price}
+GET /health                                 -> price_health()
+GET /status                                 -> health_report(): uptime, stage latency, breakers
+GET /new_coins                              -> [symbol, ...]
+GET /symbols                                -> every listed USDT symbol
+GET /ohlc?symbol=BTCUSDT&interval=1h&limit=100 -> raw kline rows
+GET /confluence?symbol=BTC                  -> multi_timeframe_confluence()
+GET /snapshot?timeout=60                    -> latest signal snapshot
+GET /subscribe?after=<version>&timeout=25   -> long-poll for the next snapshot
+GET /metrics                                -> Prometheus text
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import zpt_pricefeed
+zpt_pricefeed.MARKETDATA_URL = ""  # the daemon itself always talks to the exchanges
+
+from utils import get_env, health_report, log, metrics, KLINE_COLUMNS
+from zpt_pricefeed import get_price, get_prices, price_health, get_new_bybit_coins, get_symbols, start_stream
+from zpt_analysis import fetch_ohlc_binance, multi_timeframe_confluence
+from zpt_signals import signal_service
+
+MARKETDATA_HOST = get_env("MARKETDATA_HOST", "127.0.0.1")
+MARKETDATA_PORT = int(get_env("MARKETDATA_PORT", 8765))
+MAX_WAIT = 60.0  # cap on client-supplied long-poll timeouts (seconds)
+
+def _wait(q, default: float) -> float:
+    return min(float(q.get("timeout", default)), MAX_WAIT)
+
+def _ohlc(q):
+    df = fetch_ohlc_binance(q["symbol"], q.get("interval", "1h"), int(q.get("limit", 100)))
+    return df[KLINE_COLUMNS].astype(object).values.tolist() if not df.empty else []
+
+ROUTES = {
+    "/price": lambda q: get_price(q["symbol"]),
+    "/prices": lambda q: get_prices(q["symbols"].split(",")),
+    "/health": lambda q: price_health(),
+    "/status": lambda q: health_report(),
+    "/new_coins": lambda q: get_new_bybit_coins(),
+    "/symbols": lambda q: get_symbols(),
+    "/ohlc": _ohlc,
+    "/confluence": lambda q: multi_timeframe_confluence(q["symbol"]),
+    "/snapshot": lambda q: signal_service.wait_ready(_wait(q, 60)),
+    "/subscribe": lambda q: signal_service.wait_newer(int(q.get("after", 0)), _wait(q, 25)),
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (e.g. its own timeout expired)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        if parsed.path == "/metrics":
+            return self._send(200, metrics.render_prometheus().encode(), "text/plain; version=0.0.4")
+        route = ROUTES.get(parsed.path)
+        if route is None:
+            return self._send(404, json.dumps({"error": "not found"}).encode())
+        try:
+            payload = route(q)
+        except (KeyError, ValueError) as e:
+            return self._send(400, json.dumps({"error": f"bad request: {e}"}).encode())
+        except Exception as e:
+            log(f"Market-data {parsed.path} error: {e}", level="ERROR")
+            return self._send(500, json.dumps({"error": str(e)}).encode())
+        self._send(200, json.dumps(payload, default=str).encode())
+
+def make_server(host: str = MARKETDATA_HOST, port: int = MARKETDATA_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    start_stream()
+    signal_service.start()
+    server = make_server()
+    log(f"Market-data daemon listening on http://{MARKETDATA_HOST}:{MARKETDATA_PORT}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
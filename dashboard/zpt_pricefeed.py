@@ -1,90 +1,456 @@
-import requests
-from utils import get_env, map_symbol, log, safe_float, health_report
+import asyncio
+import logging
+import threading
+import time
+import httpx
+from utils import (
+    get_env, map_symbol, log, safe_float, health_report, QuoteCache, DEFAULT_QUOTE_TTLS, DEFAULT_MAX_STALE, StreamFeed, metrics, span,
+    RequestScheduler, current_priority, with_priority, request_weight, source_health, resample_bases,
+)
+from urllib.parse import urlparse
 from typing import Optional
 
-def get_xauusd_metalsapi() -> Optional[float]:
+# httpx logs every request at INFO; upstream calls are counted in utils.performance.metrics instead
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+CORE_ASSETS = ["XAUUSD", "BTC", "ETH", "DOGE", "SHIB", "PEPE"]
+
+# Upstream base URLs (overridable, e.g. to point at the local bench stand-in)
+BINANCE_API_URL = get_env("BINANCE_API_URL", "https://api.binance.com")
+BYBIT_API_URL = get_env("BYBIT_API_URL", "https://api.bybit.com")
+METALPRICE_API_URL = get_env("METALPRICE_API_URL", "https://api.metalpriceapi.com")
+
+# Client mode: with MARKETDATA_URL set (e.g. http://127.0.0.1:8765) quotes, candles and signals come
+# from the shared market-data daemon (zpt_marketdata.py) instead of each process hitting the exchanges.
+MARKETDATA_URL = get_env("MARKETDATA_URL", "")
+
+# Per-request deadline (seconds) for a single upstream call / exchange race
+PRICE_DEADLINE = float(get_env("PRICE_DEADLINE", 5))
+# Hedged fallback: start the next-healthiest source once the current one exceeds its p95
+# latency (PRICE_HEDGE_DELAY until enough samples exist); PRICE_HEDGE=0 fails over only on error
+PRICE_HEDGE = str(get_env("PRICE_HEDGE", "1")) != "0"
+PRICE_HEDGE_DELAY = float(get_env("PRICE_HEDGE_DELAY", 0.5))
+# Error replies that mean "no such symbol" rather than a failing exchange
+BINANCE_INVALID_SYMBOL = -1121
+BYBIT_PARAMS_ERROR = 10001
+
+# The price engine runs on one background event loop that owns a single pooled
+# keep-alive client, so sync callers and other event loops share connections.
+_engine_lock = threading.Lock()
+_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[httpx.AsyncClient] = None
+
+# Shared quote cache, keyed by normalized symbol; TTLs overridable via QUOTE_TTL_<SOURCE>,
+# the stale fallback's age limit (in TTLs) via QUOTE_MAX_STALE
+_quotes = QuoteCache(
+    ttls={src: float(get_env(f"QUOTE_TTL_{src.upper()}", ttl)) for src, ttl in DEFAULT_QUOTE_TTLS.items()},
+    max_size=int(get_env("QUOTE_CACHE_SIZE", 512)),
+    max_stale=float(get_env("QUOTE_MAX_STALE", DEFAULT_MAX_STALE)),
+)
+# Websocket-fed quotes/candles; consulted before the cache and REST while connected
+live_feed = StreamFeed()
+STREAM_SYMBOLS = [map_symbol(a) for a in CORE_ASSETS if a != "XAUUSD"]
+
+# Outbound weight budgets and priority queues per exchange (interactive before background scans)
+scheduler = RequestScheduler()
+
+# Whole-exchange ticker snapshots (symbol -> price), one entry per exchange
+_snapshots = QuoteCache(ttls=_quotes.ttls, max_size=4, max_stale=_quotes.max_stale)
+
+def _get_engine_loop() -> asyncio.AbstractEventLoop:
+    global _engine_loop
+    with _engine_lock:
+        if _engine_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="zpt-pricefeed", daemon=True).start()
+            _engine_loop = loop
+    return _engine_loop
+
+def _http() -> httpx.AsyncClient:
+    """Return the pooled client; only called from the engine loop."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=PRICE_DEADLINE,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+def run_sync(coro):
+    """Run a coroutine on the engine loop and block until it finishes."""
+    loop = _get_engine_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the price engine loop; await the coroutine instead")
+    # Carry the caller's request priority onto the engine loop
+    return asyncio.run_coroutine_threadsafe(with_priority(coro, current_priority()), loop).result()
+
+async def run_async(coro):
+    """Await a coroutine on the engine loop from any other event loop."""
+    loop = _get_engine_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(with_priority(coro, current_priority()), loop))
+
+def client_mode() -> bool:
+    return bool(MARKETDATA_URL)
+
+def _source_of(url: str) -> str:
+    for base, source in ((BINANCE_API_URL, "binance"), (BYBIT_API_URL, "bybit"), (METALPRICE_API_URL, "metalsapi")):
+        if url.startswith(base):
+            return source
+    return "other"
+
+async def fetch_json(url: str, params: Optional[dict] = None):
+    source = _source_of(url)
+    await scheduler.acquire(source, request_weight(source, urlparse(url).path, params))
+    try:
+        resp = await _http().get(url, params=params)
+        scheduler.observe(source, resp.status_code, resp.headers)
+        data = resp.json()
+    except Exception:
+        metrics.inc("upstream_requests_total", source=source, outcome="error")
+        raise
+    metrics.inc("upstream_requests_total", source=source, outcome="ok" if resp.is_success else f"http_{resp.status_code}")
+    return data
+
+async def fetch_marketdata(path: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+    """GET a daemon endpoint; raises on transport/HTTP errors so callers can fall back to local fetching."""
+    try:
+        resp = await _http().get(f"{MARKETDATA_URL}{path}", params=params, timeout=timeout or PRICE_DEADLINE)
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception:
+        metrics.inc("upstream_requests_total", source="marketdata", outcome="error")
+        raise
+    metrics.inc("upstream_requests_total", source="marketdata", outcome="ok")
+    return data
+
+def query_marketdata(path: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+    """Sync daemon query for client mode; None (after logging) if the daemon is unreachable."""
+    try:
+        return run_sync(fetch_marketdata(path, params, timeout))
+    except Exception as e:
+        log(f"Market-data daemon unavailable ({e}); computing locally", level="WARNING")
+        return None
+
+async def _from_daemon(path: str, params: Optional[dict], local):
+    """Serve from the daemon in client mode, falling back to the local pipeline if it is down."""
+    if client_mode():
+        try:
+            return await fetch_marketdata(path, params)
+        except Exception as e:
+            log(f"Market-data daemon unavailable ({e}); fetching locally", level="WARNING")
+    return await local()
+
+class SourceError(Exception):
+    """An upstream failed (transport, 5xx, throttling, error reply), as opposed to not listing a symbol."""
+
+# Quote fetchers for the fallback chain: None means the source answered but doesn't list
+# the symbol (not held against its breaker); any exception is a failure of the source.
+
+async def _metalsapi_quote(_symbol: str = "XAUUSD") -> Optional[float]:
     api_key = get_env("METALS_API_KEY")
     if not api_key:
         log("METALS_API_KEY not set in environment.", level="ERROR")
         return None
     # Use MetalPriceAPI endpoint for latest rates (free plan supports timeseries only)
-    url = (
-        f"https://api.metalpriceapi.com/v1/latest"
-        f"?api_key={api_key}"
-        f"&base=USD"
-        f"&currencies=XAU"
-    )
-    try:
-        resp = requests.get(url, timeout=10)
-        data = resp.json()
-        # Handle invalid key or API error
-        if data.get("status") == "error" or data.get("error"):
-            err = data.get("error") or data.get("message") or data.get("info")
-            log(f"Metals API error: {err}", level="ERROR")
-            return None
-        rate = data.get("rates", {}).get("XAU")
-        if rate is None:
-            log("Metals API: XAU rate missing in response.", level="ERROR")
-            return None
-        # 'rate' is ounces per USD; invert to get USD per ounce
-        price = 1 / rate
-        return round(price, 2)
-    except Exception as e:
-        log(f"Metals API error: {e}", level="ERROR")
+    url = f"{METALPRICE_API_URL}/v1/latest"
+    data = await fetch_json(url, {"api_key": api_key, "base": "USD", "currencies": "XAU"})
+    # Handle invalid key or API error
+    if data.get("status") == "error" or data.get("error"):
+        raise SourceError(data.get("error") or data.get("message") or data.get("info"))
+    rate = data.get("rates", {}).get("XAU")
+    if rate is None:
+        raise SourceError("XAU rate missing in response")
+    # 'rate' is ounces per USD; invert to get USD per ounce
+    return round(1 / rate, 2)
+
+async def _binance_quote(symbol: str) -> Optional[float]:
+    data = await fetch_json(f"{BINANCE_API_URL}/api/v3/ticker/price", {"symbol": map_symbol(symbol)})
+    if isinstance(data, dict) and data.get("code") == BINANCE_INVALID_SYMBOL:
         return None
+    if not isinstance(data, dict) or "price" not in data:
+        raise SourceError(data)
+    return safe_float(data["price"])
 
-def get_crypto_binance(symbol: str) -> Optional[float]:
-    url = f"https://api.binance.com/api/v3/ticker/price?symbol={map_symbol(symbol)}"
+async def _bybit_quote(symbol: str) -> Optional[float]:
+    data = await fetch_json(f"{BYBIT_API_URL}/v5/market/tickers", {"category": "linear", "symbol": map_symbol(symbol)})
+    if data.get("retCode") == BYBIT_PARAMS_ERROR:
+        return None  # the symbol is the only parameter that varies
+    if data.get("retCode") != 0:
+        raise SourceError(data.get("retMsg") or data)
+    tickers = data.get("result", {}).get("list", [])
+    return safe_float(tickers[0]["lastPrice"]) if tickers else None
+
+async def _quietly(label: str, fetcher, *args) -> Optional[float]:
+    """A single source outside the fallback chain: failures are logged and read as None."""
     try:
-        resp = requests.get(url, timeout=10)
-        return safe_float(resp.json()["price"])
+        return await fetcher(*args)
     except Exception as e:
-        log(f"Binance error: {e}", level="WARNING")
+        log(f"{label} error: {e}", level="WARNING")
         return None
 
-def get_crypto_bybit(symbol: str) -> Optional[float]:
-    url = f"https://api.bybit.com/v5/market/tickers?category=linear&symbol={map_symbol(symbol)}"
+async def _tracked(source: str, fetcher, symbol: str):
+    """Call one source, feeding its latency/outcome into that source's breaker.
+
+    Only failures count against the breaker; "symbol not listed" is a healthy answer,
+    so unlisted coins and typos can't open it for every other symbol.
+    """
+    health = source_health(source)
+    started = time.perf_counter()
     try:
-        resp = requests.get(url, timeout=10)
-        tickers = resp.json().get("result", {}).get("list", [])
-        if tickers:
-            return safe_float(tickers[0]["lastPrice"])
+        price = await fetcher(symbol)
+    except asyncio.CancelledError:
+        health.record_abandoned(time.perf_counter() - started)
+        raise
     except Exception as e:
-        log(f"Bybit error: {e}", level="WARNING")
-    return None
+        log(f"{source} error: {e}", level="WARNING")
+        if health.record_failure(time.perf_counter() - started):
+            log(f"{source} circuit opened after {health.failures} failures", level="WARNING")
+        return None, source
+    health.record_success(time.perf_counter() - started)
+    return price, source
 
-def get_price(symbol: str) -> Optional[float]:
-    symbol = symbol.upper()
+def _hedge_delay(source: str) -> float:
+    p95 = source_health(source).p95()
+    return max(p95, 0.05) if p95 is not None else PRICE_HEDGE_DELAY
+
+async def _fallback(symbol: str, fetchers: dict) -> tuple[Optional[float], Optional[str]]:
+    """Try sources healthiest-first within the deadline; return the first non-None (price, source).
+
+    Sources with an open breaker are skipped (the healthiest is still tried if all are open).
+    The next source starts as soon as the current one fails, or, when hedging, once it runs
+    past its p95 latency; whichever answers first wins and the rest are cancelled.
+    """
+    ranked = sorted(fetchers, key=lambda s: source_health(s).score())
+    queue = list(ranked)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + PRICE_DEADLINE
+    pending = set()
+    hedge_at = None
+
+    def start(source: str):
+        nonlocal hedge_at
+        pending.add(asyncio.ensure_future(_tracked(source, fetchers[source], symbol)))
+        hedge_at = loop.time() + _hedge_delay(source) if PRICE_HEDGE and queue else None
+
+    def launch_next() -> bool:
+        nonlocal hedge_at
+        while queue:
+            source = queue.pop(0)
+            if source_health(source).available():  # claims the probe slot of a half-open breaker
+                start(source)
+                return True
+        hedge_at = None
+        return False
+
+    if not launch_next():
+        start(ranked[0])
+    try:
+        while pending:
+            now = loop.time()
+            if now >= deadline:
+                log(f"Price fetch for {symbol} exceeded {PRICE_DEADLINE}s deadline", level="WARNING")
+                break
+            timeout = deadline - now if hedge_at is None else max(min(deadline, hedge_at) - now, 0)
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                price, source = task.result()
+                if price is not None:
+                    return price, source
+            if done or (hedge_at is not None and loop.time() >= hedge_at):
+                launch_next()
+    finally:
+        for task in pending:
+            task.cancel()
+    return None, None
+
+async def _fetch_quote(symbol: str) -> tuple[Optional[float], Optional[str]]:
     if symbol == "XAUUSD":
-        return get_xauusd_metalsapi()
-    for fetcher in [get_crypto_binance, get_crypto_bybit]:
-        price = fetcher(symbol)
-        if price is not None:
-            return price
-    log(f"Failed to fetch price for {symbol}", level="ERROR")
-    return None
+        return await _fallback(symbol, {"metalsapi": _metalsapi_quote})
+    price, source = await _fallback(symbol, {"binance": _binance_quote, "bybit": _bybit_quote})
+    if price is None:
+        log(f"Failed to fetch price for {symbol}", level="ERROR")
+    return price, source
 
-def get_new_bybit_coins():
-    """Fetch new coins from Bybit API (spot/linear/futures)."""
-    url = f"https://api.bybit.com/v5/market/tickers?category=spot"
+async def _get_price(symbol: str) -> Optional[float]:
+    return await _from_daemon("/price", {"symbol": symbol}, lambda: _get_price_local(symbol))
+
+async def _get_price_local(symbol: str) -> Optional[float]:
+    symbol = symbol.upper()
+    live = live_feed.quote(map_symbol(symbol))
+    if live is not None:
+        return live
+    return await _quotes.get(map_symbol(symbol), lambda: _fetch_quote(symbol))
+
+async def _binance_snapshot() -> tuple[Optional[dict], str]:
+    """All Binance spot tickers in one request (no symbol param)."""
+    try:
+        data = await fetch_json(f"{BINANCE_API_URL}/api/v3/ticker/price")
+        return {t["symbol"]: safe_float(t["price"]) for t in data}, "binance"
+    except Exception as e:
+        log(f"Binance snapshot error: {e}", level="WARNING")
+        return None, "binance"
+
+async def _bybit_snapshot() -> tuple[Optional[dict], str]:
+    """All Bybit linear tickers in one request (no symbol param)."""
+    try:
+        data = await fetch_json(f"{BYBIT_API_URL}/v5/market/tickers", {"category": "linear"})
+        tickers = data.get("result", {}).get("list", [])
+        return {t["symbol"]: safe_float(t["lastPrice"]) for t in tickers}, "bybit"
+    except Exception as e:
+        log(f"Bybit snapshot error: {e}", level="WARNING")
+        return None, "bybit"
+
+async def _get_prices(symbols) -> dict:
+    symbols = list(symbols)
+    return await _from_daemon("/prices", {"symbols": ",".join(symbols)}, lambda: _get_prices_local(symbols))
+
+async def _get_prices_local(symbols) -> dict:
+    symbols = [s.upper() for s in symbols]
+    prices = {}
+    for s in symbols:
+        live = live_feed.quote(map_symbol(s))
+        if live is not None:
+            _quotes.put(map_symbol(s), live, "stream")
+    # Only pull exchange snapshots when some crypto symbol isn't already fresh in the quote cache
+    stale = [s for s in symbols if s != "XAUUSD" and _quotes.peek(map_symbol(s)) is None]
+    if stale:
+        indexes = await asyncio.gather(
+            _snapshots.get("binance", _binance_snapshot),
+            _snapshots.get("bybit", _bybit_snapshot),
+        )
+        for s in stale:
+            key = map_symbol(s)
+            for source, index in zip(("binance", "bybit"), indexes):
+                price = (index or {}).get(key)
+                if price is not None:
+                    _quotes.put(key, price, source)
+                    break
+    for s in symbols:
+        if s == "XAUUSD":
+            prices[s] = await _get_price_local(s)
+        else:
+            prices[s] = _quotes.peek(map_symbol(s))
+            if prices[s] is None:
+                log(f"Failed to fetch price for {s}", level="ERROR")
+    return prices
+
+async def _get_symbols():
+    return await _from_daemon("/symbols", None, _get_symbols_local)
+
+async def _get_symbols_local() -> list:
+    """Every USDT pair on Binance spot or Bybit linear, from the shared ticker snapshots."""
+    indexes = await asyncio.gather(
+        _snapshots.get("binance", _binance_snapshot),
+        _snapshots.get("bybit", _bybit_snapshot),
+    )
+    return sorted({s for index in indexes for s in (index or {}) if s.endswith("USDT")})
+
+async def _get_new_bybit_coins():
+    return await _from_daemon("/new_coins", None, _get_new_bybit_coins_local)
+
+async def _get_new_bybit_coins_local():
+    url = f"{BYBIT_API_URL}/v5/market/tickers"
     try:
-        resp = requests.get(url, timeout=10)
-        coins = resp.json().get("result", {}).get("list", [])
+        data = await fetch_json(url, {"category": "spot"})
+        coins = data.get("result", {}).get("list", [])
         new_coins = [c for c in coins if c.get("listTime") and int(c["listTime"]) > 1680000000000]  # Example: filter listed after a certain timestamp
+        # Keep the prices from this snapshot instead of refetching them per coin
+        for c in new_coins:
+            price = safe_float(c.get("lastPrice"))
+            if price is not None:
+                _quotes.put(map_symbol(c["symbol"]), price, "bybit")
         return [c["symbol"] for c in new_coins]
     except Exception as e:
         log(f"Bybit new coins error: {e}", level="WARNING")
         return []
 
-def price_health():
-    """Expose health status to other modules/bots."""
-    core_assets = ["XAUUSD", "BTC", "ETH", "DOGE", "SHIB", "PEPE"]
-    status = {asset: get_price(asset) for asset in core_assets}
+async def _price_health() -> dict:
+    return await _from_daemon("/health", None, _price_health_local)
+
+async def _price_health_local() -> dict:
+    status = await _get_prices_local(CORE_ASSETS)
     status.update(health_report())
+    status["rate_limits"] = {src: f"{st['rate']}/s, queued {st['queued']}" + (f", paused {st['paused_s']}s" if st["paused_s"] else "")
+                             for src, st in scheduler.stats().items()}
     return status
 
+async def _on_stream_connect(source: str, symbols):
+    """After a (re)connect, refresh quotes over REST for whatever the stream missed."""
+    await _get_prices_local(symbols)
+
+def start_stream(symbols=None, intervals=None):
+    """Start the websocket feed on the engine loop (disable with PRICE_STREAM=0; the daemon owns it in client mode).
+
+    Only the resampling base intervals are streamed; higher timeframes are derived from them.
+    """
+    if client_mode() or str(get_env("PRICE_STREAM", "1")) == "0":
+        return
+    live_feed.on_connect = _on_stream_connect
+    live_feed.start(_get_engine_loop(), symbols or STREAM_SYMBOLS, intervals or resample_bases() or ("15m", "1h", "4h"))
+
+# Async API: await directly from telegram handlers / other event loops
+
+async def get_price_async(symbol: str) -> Optional[float]:
+    with span("fetch"):
+        return await run_async(_get_price(symbol))
+
+async def get_prices_async(symbols) -> dict:
+    with span("fetch"):
+        return await run_async(_get_prices(symbols))
+
+async def get_symbols_async() -> list:
+    return await run_async(_get_symbols())
+
+async def price_health_async() -> dict:
+    """Expose health status to other modules/bots; all assets are fetched concurrently."""
+    with span("fetch"):
+        return await run_async(_price_health())
+
+# Sync wrappers (drop-in replacements for the original blocking functions)
+
+def get_xauusd_metalsapi() -> Optional[float]:
+    return run_sync(_quietly("Metals API", _metalsapi_quote))
+
+def get_crypto_binance(symbol: str) -> Optional[float]:
+    return run_sync(_quietly("Binance", _binance_quote, symbol))
+
+def get_crypto_bybit(symbol: str) -> Optional[float]:
+    return run_sync(_quietly("Bybit", _bybit_quote, symbol))
+
+def get_price(symbol: str) -> Optional[float]:
+    with span("fetch"):
+        return run_sync(_get_price(symbol))
+
+def get_prices(symbols) -> dict:
+    """Bulk prices for many symbols: one ticker snapshot per exchange instead of one call per symbol."""
+    with span("fetch"):
+        return run_sync(_get_prices(symbols))
+
+def get_symbols() -> list:
+    """The tradable USDT symbol universe (empty if both exchanges are unreachable)."""
+    return run_sync(_get_symbols())
+
+def get_new_bybit_coins():
+    """Fetch new coins from Bybit API (spot/linear/futures)."""
+    return run_sync(_get_new_bybit_coins())
+
+def price_health():
+    """Expose health status to other modules/bots."""
+    with span("fetch"):
+        return run_sync(_price_health())
+
+def quote_cache_stats() -> dict:
+    """Hit/miss/stale/stale_served/coalesced counters for the shared quote cache."""
+    return _quotes.stats()
+
 if __name__ == "__main__":
-    for asset in ["XAUUSD", "BTC", "ETH", "DOGE", "SHIB", "PEPE"]:
-        price = get_price(asset)
+    for asset, price in price_health().items():
         log(f"{asset} price: {price}")
-    log(f"New Bybit coins: {get_new_bybit_coins()}")
\ No newline at end of file
+    log(f"New Bybit coins: {get_new_bybit_coins()}")
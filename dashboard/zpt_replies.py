@@ -0,0 +1,218 @@
+"""Shared Telegram reply rendering and rate-limited sending for the three bots.
+
+One message per command: /dashboard is rendered as a single text, long-running
+requests edit one placeholder message as results arrive, and every outgoing
+send/edit goes through `outbox`, which keeps under Telegram's flood limits.
+"""
+import asyncio
+import time
+
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
+from telegram.helpers import escape_markdown
+
+from utils import TokenBucket, health_summary, journal, log, metrics
+from zpt_pricefeed import CORE_ASSETS
+from zpt_signals import latest_snapshot, snapshot_age
+
+MAX_MESSAGE_CHARS = 4096
+GLOBAL_SENDS_PER_SECOND = 25  # Telegram allows ~30/s per bot
+CHAT_MIN_INTERVAL = 1.0  # ~1 message/s per chat before flood control kicks in
+EDIT_MIN_INTERVAL = 2.0  # progress edits are coalesced to at most one per this many seconds
+
+# --- rendering ---
+
+def _fit(text: str) -> str:
+    return text if len(text) <= MAX_MESSAGE_CHARS else text[:MAX_MESSAGE_CHARS - 1] + "…"
+
+def _fit_lines(lines: list, budget: int) -> list:
+    """Leading whole lines that fit in `budget` characters once joined, plus "…" if any were dropped.
+
+    Cutting between lines never splits a Markdown escape or entity.
+    """
+    if len("\n".join(lines)) <= budget:
+        return lines
+    kept, used = [], 1  # the "…" line
+    for line in lines:
+        if used + len(line) + 1 > budget:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept + ["…"]
+
+def render_signal_line(asset: str, res: dict) -> str:
+    return f"*{escape_markdown(asset)}* signal: {res['action']}, Confidence: {int(res['confidence']*100)}%"
+
+def render_dashboard(snapshot: dict) -> str:
+    """Every core signal, then system health, as one Markdown message.
+
+    Signals come first; if the message would run past Telegram's limit the health
+    section is trimmed, line by line, instead of the signals.
+    """
+    signal_lines = [render_signal_line(asset, res) for asset, res in snapshot["signals"].items()]
+    health_lines = [escape_markdown(f"{k}: {v}") for k, v in health_summary(snapshot["health"], CORE_ASSETS).items()]
+    header = "*System Health:*"
+    footer = f"_Updated {snapshot_age(snapshot):.0f}s ago (v{snapshot['version']})_"
+    room = MAX_MESSAGE_CHARS - len(header) - len(footer) - 4  # blank line after the signals, header/footer breaks
+    signals = "\n".join(_fit_lines(signal_lines, room))
+    health = _fit_lines(health_lines, room - len(signals))
+    return (signals + "\n\n" if signals else "") + "\n".join([header, *health, footer])
+
+def render_signal(asset: str, result: dict, explanation: str = "…") -> str:
+    """Plain-text signal card for one analyzed asset."""
+    return _fit(
+        f"📈 {asset} Signal\n"
+        f"Price: {result['price']}\n"
+        f"Action: {result['action']}\n"
+        f"Confidence: {int(result['confidence']*100)}%\n"
+        f"SL: {result['SLTP']['SL']}, TP: {result['SLTP']['TP']}\n"
+        f"Serial: {result['SN']}\n"
+        f"AI Reasoning: {explanation}"
+    )
+
+def render_meme_signals(signals: list) -> str:
+    if not signals:
+        return "No high-potential shitcoin signals now."
+    return _fit("Shitcoin signals (90%+):\n" + "\n".join(
+        f"{s['symbol']}: {s['action']} ({int(s['confidence']*100)}%)" for s in signals))
+
+def render_journal_entry(entry: dict) -> str:
+    """A journaled signal as a user quoted its serial back."""
+    issued = time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(entry["created_at"]))
+    return _fit(
+        f"{entry['sn']} ({issued})\n"
+        f"{entry['symbol']}: {entry['action']}, Confidence: {int(entry['confidence']*100)}%\n"
+        f"Price: {entry['price']}\n"
+        f"SL: {entry['sl']}, TP: {entry['tp']}"
+    )
+
+def render_history(symbol: str, entries: list) -> str:
+    if not entries:
+        return f"No journaled signals for {symbol.upper()} yet."
+    return _fit(f"Last {len(entries)} {symbol.upper()} signals:\n" + "\n".join(
+        f"{time.strftime('%m-%d %H:%M', time.gmtime(e['created_at']))} {e['action']} "
+        f"({int(e['confidence']*100)}%) @ {e['price']} {e['sn']}" for e in entries))
+
+# --- sending ---
+
+class Outbox:
+    """Paces outgoing sends/edits: a global token bucket plus a minimum gap per chat.
+
+    Flood-control replies (RetryAfter) are waited out and retried once.
+    """
+
+    def __init__(self, per_second: float = GLOBAL_SENDS_PER_SECOND, chat_interval: float = CHAT_MIN_INTERVAL):
+        self.bucket = TokenBucket(rate=per_second, capacity=per_second)
+        self.chat_interval = chat_interval
+        self._chats = {}  # chat_id -> [asyncio.Lock, last_sent monotonic]
+
+    def _chat(self, chat_id):
+        if len(self._chats) > 1000:
+            cutoff = time.monotonic() - 60
+            self._chats = {c: e for c, e in self._chats.items() if e[1] > cutoff or e[0].locked()}
+        return self._chats.setdefault(chat_id, [asyncio.Lock(), 0.0])
+
+    async def send(self, chat_id, call, *args, **kwargs):
+        """Await `call(*args, **kwargs)` (a Bot/Message API coroutine) within the limits."""
+        entry = self._chat(chat_id)
+        async with entry[0]:
+            gap = entry[1] + self.chat_interval - time.monotonic()
+            if gap > 0:
+                await asyncio.sleep(gap)
+            while (wait := self.bucket.try_acquire()) > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await call(*args, **kwargs)
+            except RetryAfter as e:
+                retry_after = getattr(e.retry_after, "total_seconds", lambda: e.retry_after)()
+                metrics.inc("telegram_flood_waits_total")
+                await asyncio.sleep(float(retry_after))
+                result = await call(*args, **kwargs)
+            finally:
+                entry[1] = time.monotonic()
+            metrics.inc("telegram_sends_total")
+            return result
+
+outbox = Outbox()
+
+async def reply(message, text: str, **kwargs):
+    """message.reply_text through the outbox."""
+    return await outbox.send(message.chat_id, message.reply_text, text, **kwargs)
+
+class ProgressiveReply:
+    """One reply message that is sent once and then edited in place as results arrive."""
+
+    def __init__(self, message, parse_mode=None):
+        self.message = message
+        self.parse_mode = parse_mode
+        self.sent = None
+        self._text = None
+        self._edited_at = 0.0
+
+    async def _show(self, text: str):
+        if text == self._text:
+            return
+        if self.sent is None:
+            self.sent = await reply(self.message, text, parse_mode=self.parse_mode)
+        else:
+            try:
+                await outbox.send(self.message.chat_id, self.sent.edit_text, text, parse_mode=self.parse_mode)
+            except BadRequest as e:
+                if "not modified" not in str(e).lower():
+                    raise
+        self._text = text
+        self._edited_at = time.monotonic()
+
+    async def update(self, text: str):
+        """Show intermediate progress; skipped if the last edit was under EDIT_MIN_INTERVAL ago."""
+        if self.sent is None or time.monotonic() - self._edited_at >= EDIT_MIN_INTERVAL:
+            await self._show(text)
+
+    async def finish(self, text: str):
+        """Show the final text (always delivered)."""
+        await self._show(text)
+
+    async def wait_for(self, aw, placeholder: str, after: float = 1.0):
+        """Await `aw`, showing `placeholder` only if it takes longer than `after` seconds."""
+        task = asyncio.ensure_future(aw)
+        done, _ = await asyncio.wait({task}, timeout=after)
+        if not done:
+            await self.update(placeholder)
+        return await task
+
+async def send_streamed(message, answer) -> str:
+    """Reply with an answer streamed from zpt_llm.stream, editing one message as it grows.
+
+    The first words go out as soon as they arrive; later edits are coalesced to
+    EDIT_MIN_INTERVAL. If the stream fails part-way the partial answer is kept.
+    """
+    progress = ProgressiveReply(message)
+    text = ""
+    try:
+        async for text in answer:
+            await progress.update(_fit(text + " …"))
+    except Exception as e:
+        if not text:
+            raise
+        log(f"Streamed answer cut short: {e}", level="WARNING")
+        text += " …(answer cut short, please ask again)"
+    await progress.finish(_fit(text) if text else "Sorry, I have no answer to that. Try rephrasing?")
+    return text
+
+async def send_dashboard(message):
+    """Reply to /dashboard with one message (edited in place if signals are still warming up)."""
+    progress = ProgressiveReply(message, parse_mode=ParseMode.MARKDOWN)
+    snapshot = await progress.wait_for(latest_snapshot(), "Loading signals…")
+    if snapshot is None:
+        await progress.finish("Signals are still warming up, please try again shortly.")
+        return
+    await progress.finish(render_dashboard(snapshot))
+
+async def send_signal_lookup(message, sn: str):
+    """Reply with the journaled signal for a serial (indexed lookup, off the event loop)."""
+    entry = await asyncio.to_thread(journal.by_sn, sn)
+    await reply(message, render_journal_entry(entry) if entry else f"No signal found for {sn}.")
+
+async def send_history(message, symbol: str, limit: int = 5):
+    entries = await asyncio.to_thread(journal.recent, symbol, limit)
+    await reply(message, render_history(symbol, entries))
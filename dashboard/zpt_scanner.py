@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils import get_env, log, request_priority
+from zpt_pricefeed import client_mode, get_prices, get_new_bybit_coins
+import zpt_analysis
+
+MEME_COINS = ["DOGEUSDT", "SHIBUSDT", "PEPEUSDT"]
+CONFIDENCE_GATE = 0.955
+SCAN_WORKERS = int(get_env("SCAN_WORKERS", 8))
+
+def meme_universe() -> list:
+    coins = list(MEME_COINS)
+    coins += [c for c in get_new_bybit_coins() if c not in coins]
+    return coins
+
+def _fetch(load, coin: str):
+    # Scans are paced by the pricefeed's request scheduler behind interactive requests
+    with request_priority("background"):
+        return load(coin)
+
+def _build(coin: str, mtf: dict, price, user_data):
+    # Only ultra-high-confidence signals (95.5%+) get SL/TP, serial and the AI explanation
+    with request_priority("background"):
+        res = zpt_analysis.build_signal(coin, mtf, price, user_data)
+    res["trend"] = "long-term" if res["action"] == "LONG" else "short-term" if res["action"] == "SHORT" else "hold"
+    return res
+
+def _completed(futures: dict):
+    """(key, result or None) per future as it finishes; errors are logged."""
+    for fut in as_completed(futures):
+        try:
+            yield futures[fut], fut.result()
+        except Exception as e:
+            log(f"Scan error: {e}", level="WARNING")
+            yield futures[fut], None
+
+def iter_scan(coins, user_data=None, workers: int = SCAN_WORKERS):
+    """Score coins: yield (done, total, None) as each coin's candles arrive, then (total, total, signal).
+
+    Candles are fetched concurrently, then every coin and timeframe is scored in one vectorized
+    pass (zpt_analysis.confluence_batch) and only coins past the gate are built into signals.
+    In client mode the daemon scores each coin instead.
+    """
+    remote = client_mode()
+    load = zpt_analysis.multi_timeframe_confluence if remote else zpt_analysis.confluence_frames
+    total = len(coins)
+    with request_priority("background"):
+        prices = get_prices(coins) if coins else {}
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zpt-scan")
+    try:
+        loaded = {}
+        fetches = {pool.submit(_fetch, load, coin): coin for coin in coins}
+        for done, (coin, result) in enumerate(_completed(fetches), start=1):
+            if result is not None:
+                loaded[coin] = result
+            if done < total:
+                yield done, total, None
+        scored = loaded if remote or not loaded else zpt_analysis.confluence_batch(loaded)
+        passed = [coin for coin in coins if coin in scored and scored[coin]["confidence"] >= CONFIDENCE_GATE]
+        builds = {pool.submit(_build, coin, scored[coin], prices.get(coin), user_data): coin for coin in passed}
+        for _, res in _completed(builds):
+            yield total, total, res
+        if not passed and total:
+            yield total, total, None
+    finally:
+        # Stop queued work if the consumer abandons the scan early
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def iter_meme_scan(user_data=None):
+    return iter_scan(meme_universe(), user_data)
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+from utils import get_env, log, request_priority
+from zpt_pricefeed import price_health, client_mode, fetch_marketdata, run_async
+from zpt_analysis import analyze
+
+CORE_SIGNAL_ASSETS = ["BTC", "ETH", "XAUUSD"]
+SIGNAL_REFRESH_SECONDS = float(get_env("SIGNAL_REFRESH_SECONDS", 60))
+
+class SignalService:
+    """Refreshes core health + signals on a fixed cadence and publishes versioned snapshots.
+
+    Snapshots are plain dicts replaced atomically, so readers never see a partial update:
+    {"version", "updated_at", "health", "signals": {asset: {"action", "confidence", "price"}}}
+    """
+
+    def __init__(self, assets=None, interval: float = SIGNAL_REFRESH_SECONDS):
+        self.assets = assets or CORE_SIGNAL_ASSETS
+        self.interval = interval
+        self._snapshot: Optional[dict] = None
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._published = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> dict:
+        with self._refresh_lock:
+            previous = self._snapshot or {"version": 0, "signals": {}}
+            health = price_health()
+            signals = {}
+            for asset in self.assets:
+                try:
+                    res = analyze(asset)
+                    signals[asset] = {"action": res["action"], "confidence": res["confidence"], "price": res["price"]}
+                except Exception as e:
+                    log(f"Signal refresh error for {asset}: {e}", level="ERROR")
+                    if asset in previous["signals"]:
+                        signals[asset] = previous["signals"][asset]
+            self._snapshot = {
+                "version": previous["version"] + 1,
+                "updated_at": time.time(),
+                "health": health,
+                "signals": signals,
+            }
+            self._ready.set()
+            with self._published:
+                self._published.notify_all()
+            return self._snapshot
+
+    def latest(self) -> Optional[dict]:
+        return self._snapshot
+
+    def wait_ready(self, timeout: Optional[float] = None) -> Optional[dict]:
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    def wait_newer(self, version: int, timeout: Optional[float] = None) -> Optional[dict]:
+        """Block until a snapshot other than `version` is published (a restarted service counts from 1 again)."""
+        with self._published:
+            self._published.wait_for(lambda: self._snapshot is not None and self._snapshot["version"] != version, timeout)
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with request_priority("normal"):
+                    self.refresh()
+            except Exception as e:
+                log(f"Signal service error: {e}", level="ERROR")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if client_mode():
+            log("Signal snapshots served by the market-data daemon")
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="zpt-signals", daemon=True)
+            self._thread.start()
+            log(f"Signal service refreshing {self.assets} every {self.interval:.0f}s")
+
+    def stop(self):
+        self._stop.set()
+
+def snapshot_age(snapshot: dict) -> float:
+    return time.time() - snapshot["updated_at"]
+
+# Shared per-process service used by the bots
+signal_service = SignalService()
+
+async def latest_snapshot(timeout: float = 60) -> Optional[dict]:
+    """Latest snapshot for handlers; only the very first request after startup waits for a refresh."""
+    if client_mode():
+        try:
+            return await run_async(fetch_marketdata("/snapshot", {"timeout": timeout}, timeout=timeout + 5))
+        except Exception as e:
+            log(f"Market-data daemon unavailable ({e}); refreshing signals locally", level="WARNING")
+    snapshot = signal_service.latest()
+    if snapshot is None:
+        signal_service.start()
+        snapshot = await asyncio.to_thread(signal_service.wait_ready, timeout)
+    return snapshot
+
+async def subscribe_snapshots(after: int = 0, poll_timeout: float = 25):
+    """Yield every newly published snapshot; long-polls the daemon in client mode."""
+    while True:
+        try:
+            if client_mode():
+                snapshot = await run_async(fetch_marketdata(
+                    "/subscribe", {"after": after, "timeout": poll_timeout}, timeout=poll_timeout + 5))
+            else:
+                signal_service.start()
+                snapshot = await asyncio.to_thread(signal_service.wait_newer, after, poll_timeout)
+        except Exception as e:
+            log(f"Snapshot subscription error: {e}", level="WARNING")
+            await asyncio.sleep(5)
+            continue
+        if snapshot is not None and snapshot["version"] != after:
+            after = snapshot["version"]
+            yield snapshot
@@ -1,106 +1,79 @@
-import asyncio
 from telegram import Update
 from telegram.ext import ApplicationBuilder, MessageHandler, CommandHandler, filters, ContextTypes
-from utils import get_env, log, generate_referral_code, pro_features_unlocked, get_aura_points
-from zpt_analysis import analyze
+from utils import get_env, log, generate_referral_code, pro_features_unlocked, handler_pool, PoolBusy
+import zpt_llm as llm
+from zpt_intents import answer_intent, classify
 import telegram.ext._updater as _updater_mod
 class _PatchedUpdater(_updater_mod.Updater):
     pass
 _updater_mod.Updater = _PatchedUpdater
 import telegram.ext._applicationbuilder as _appb_mod
 _appb_mod.Updater = _PatchedUpdater
-from telegram.constants import ParseMode
-from zpt_pricefeed import price_health
-import openai
-import re
-
-try:
-    openai.api_key = get_env("OPENAI_API_KEY")
-except Exception as e:
-    log(f"OpenAI key setup error: {e}", level="ERROR")
+from zpt_pricefeed import start_stream
+from zpt_signals import signal_service
+from zpt_replies import send_dashboard, send_streamed, send_signal_lookup, send_history, reply
 
 TELEGRAM_BOT_TOKEN = get_env("TELEGRAM_BOT_TOKEN")
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(
+    await reply(
+        update.message,
         "👋 Hi! I am the Worker Bot.\n"
         "Send asset names (e.g. btc, eth, gold) for signals, or /dashboard for system overview."
     )
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(
+    await reply(
+        update.message,
         "/start - Welcome message\n"
         "/help - This help text\n"
         "/dashboard - Show system health and AI signals\n"
-        "<any text> - Natural analysis or lot size queries"
+        "/signal <serial> - Look up a signal by its serial\n"
+        "/history <asset> [n] - Last signals issued for an asset\n"
+        "<any text> - Signals (e.g. \"sol signal\", \"$PEPE\"), lot size, meme coin scans, or ask anything"
     )
 
 async def dashboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    health = price_health()
-    health_lines = [f"{k}: {v}" for k, v in health.items()]
-    await update.message.reply_text(
-        "*System Health:*\n" + "\n".join(health_lines),
-        parse_mode=ParseMode.MARKDOWN,
-    )
-    assets = ["BTC", "ETH", "XAUUSD"]
-    for asset in assets:
-        res = analyze(asset)
-        await update.message.reply_text(
-            f"*{asset}* signal: {res['action']}, Confidence: {int(res['confidence']*100)}%",
-            parse_mode=ParseMode.MARKDOWN,
-        )
+    # Rendered from the background-refreshed snapshot as one message; no exchange/OpenAI calls per request
+    await send_dashboard(update.message)
+
+async def signal_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await reply(update.message, "Usage: /signal <serial>, e.g. /signal #SN-0K4ZQ7M1B2C3D-BTCUSDT-0101")
+        return
+    await send_signal_lookup(update.message, context.args[0])
+
+async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await reply(update.message, "Usage: /history <asset> [count], e.g. /history btc 5")
+        return
+    limit = int(context.args[1]) if len(context.args) > 1 and context.args[1].isdigit() else 5
+    await send_history(update.message, context.args[0], min(limit, 20))
 
 async def natural_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         user_id = update.effective_user.id
-        text = update.message.text.lower()
-        asset = None
-        for coin in ["btc", "eth", "gold", "xauusd"]:
-            if coin in text:
-                asset = {"btc": "BTC", "eth": "ETH", "gold": "XAUUSD", "xauusd": "XAUUSD"}[coin]
-                break
-        if asset:
-            user_data = {"aura_points": get_aura_points({"id": user_id}), "pro_unlock_code_valid": True}
-            result = analyze(asset, user_data)
-            msg = (
-                f"📈 {asset} Signal\n"
-                f"Price: {result['price']}\n"
-                f"Action: {result['action']}\n"
-                f"Confidence: {int(result['confidence']*100)}%\n"
-                f"SL: {result['SLTP']['SL']}, TP: {result['SLTP']['TP']}\n"
-                f"Serial: {result['SN']}\n"
-                f"AI Reasoning: {result['explanation']}"
-            )
-            await update.message.reply_text(msg)
+        # Signals, lot sizes, meme scans and help are recognised locally; only the rest costs an LLM call
+        intent = classify(update.message.text)
+        if await answer_intent(update.message, user_id, intent):
             return
-        if "lot size" in text or "calculate" in text:
-            match = re.search(r"([£$€]?)(\d+(\.\d+)?)", text)
-            balance = float(match.group(2)) if match else 30
-            risk_pct = 0.02
-            sl_pips = 200
-            account_currency = match.group(1) if match else "£"
-            risk_amount = balance * risk_pct
-            lot_size = risk_amount / (sl_pips * 10)
-            await update.message.reply_text(
-                f"For a {account_currency}{balance} balance on gold/XAUUSD:\n"
-                f"- Max risk per trade: {account_currency}{risk_amount:.2f}\n"
-                f"- Suggested lot size: {lot_size:.3f}\n"
-                f"Adjust lot size for tighter SL/lower risk."
-            )
+        if intent["intent"] == "help":
+            await help_command(update, context)
             return
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": update.message.text}],
-            max_tokens=200
-        )
-        reply = response.choices[0].message.content.strip()
-        await update.message.reply_text(reply)
+        async with handler_pool.slot(user_id):
+            await send_streamed(update.message, llm.stream(update.message.text, user_id=user_id))
+    except PoolBusy:
+        await reply(update.message, "I'm handling a lot of requests right now, please try again in a moment.")
+    except TimeoutError:
+        await reply(update.message, "That took too long, please try again.")
     except Exception as e:
         log(f"Worker natural message error: {e}", level="ERROR")
-        await update.message.reply_text("Sorry, there was an error processing your request. Please try again or check logs.")
+        await reply(update.message, "Sorry, there was an error processing your request. Please try again or check logs.")
 
 async def _on_startup(app):
     await app.bot.delete_webhook(drop_pending_updates=True)
+    start_stream()
+    signal_service.start()
 
 def main():
     try:
@@ -108,11 +81,14 @@ def main():
             ApplicationBuilder()
             .token(TELEGRAM_BOT_TOKEN)
             .post_init(_on_startup)
+            .concurrent_updates(True)  # handlers await their work; don't serialize users behind each other
             .build()
         )
         app.add_handler(CommandHandler("start", start_command))
         app.add_handler(CommandHandler("help", help_command))
         app.add_handler(CommandHandler("dashboard", dashboard_command))
+        app.add_handler(CommandHandler("signal", signal_command))
+        app.add_handler(CommandHandler("history", history_command))
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, natural_message))
         log("Worker bot running (natural language)...")
         app.run_polling()
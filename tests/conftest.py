@@ -0,0 +1,16 @@
+"""Test setup: the dashboard modules import each other as top-level modules.
+
+Logs, the candle cache and the signal journal go to a throwaway directory so a
+test run never touches the working tree.
+"""
+import os
+import sys
+import tempfile
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard")
+sys.path.insert(0, DASHBOARD)
+
+_scratch = tempfile.mkdtemp(prefix="zpt-tests-")
+os.environ.setdefault("CANDLE_CACHE_DIR", os.path.join(_scratch, "candles"))
+os.environ.setdefault("SIGNAL_JOURNAL_PATH", os.path.join(_scratch, "journal.sqlite3"))
+os.chdir(_scratch)
@@ -0,0 +1,19 @@
+"""SignalResult: the AI explanation stays out of the dict and is generated once, on demand."""
+import json
+
+from zpt_analysis import AI_UNAVAILABLE, SignalResult
+
+def test_explanation_is_lazy_and_not_a_key():
+    calls = []
+    result = SignalResult({"symbol": "BTCUSDT", "action": "LONG"},
+                          explain=lambda: calls.append(1) or "Momentum and volume agree.")
+    assert "explanation" not in result
+    assert json.loads(json.dumps(result)) == {"symbol": "BTCUSDT", "action": "LONG"}
+    assert calls == []
+    assert result.explanation == "Momentum and volume agree."
+    assert result.explanation == "Momentum and volume agree."
+    assert calls == [1]
+    assert dict(result) == {"symbol": "BTCUSDT", "action": "LONG"}
+
+def test_without_an_explainer():
+    assert SignalResult({"symbol": "BTCUSDT"}).explanation == AI_UNAVAILABLE
@@ -0,0 +1,61 @@
+"""app.py's /metrics and /health report the market-data daemon, where the pipeline runs."""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+import app
+from bench.fake_upstream import FakeUpstream
+from tests.conftest import DASHBOARD
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    """zpt_marketdata.py in its own process, fetching from a FakeUpstream."""
+    upstream = FakeUpstream().start()
+    port = _free_port()
+    env = dict(os.environ, BINANCE_API_URL=upstream.url, BYBIT_API_URL=upstream.url,
+               METALPRICE_API_URL=upstream.url, METALS_API_KEY="test", MARKETDATA_PORT=str(port),
+               MARKETDATA_URL="", PRICE_STREAM="0")
+    proc = subprocess.Popen([sys.executable, os.path.join(DASHBOARD, "zpt_marketdata.py")], env=env,
+                            cwd=tmp_path_factory.mktemp("daemon"), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            requests.get(f"{url}/metrics", timeout=1)
+            break
+        except requests.ConnectionError:
+            assert proc.poll() is None and time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.1)
+    yield url
+    proc.terminate()
+    proc.wait(10)
+    upstream.stop()
+
+def test_metrics_and_health_come_from_the_daemon(daemon, monkeypatch):
+    assert requests.get(f"{daemon}/price", params={"symbol": "BTC"}, timeout=10).json() is not None
+    monkeypatch.setattr(app, "MARKETDATA_URL", daemon)
+    client = app.app.test_client()
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'zpt_stage_seconds_count{stage="fetch"}' in text
+    assert any(line.startswith("zpt_upstream_requests_total{") and 'source="binance"' in line
+               for line in text.splitlines())
+
+    health = client.get("/health").get_json()
+    assert "fetch" in health["stages"] and health["upstream_calls"]["binance"] >= 1
+
+def test_unreachable_daemon_is_a_502(monkeypatch):
+    monkeypatch.setattr(app, "MARKETDATA_URL", f"http://127.0.0.1:{_free_port()}")
+    client = app.app.test_client()
+    assert client.get("/metrics").status_code == 502
+    assert client.get("/health").status_code == 502
@@ -0,0 +1,61 @@
+"""zpt_backtest.simulate on hand-built frames with known TP/SL outcomes."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import zpt_backtest
+
+WINDOW = 4
+ENTRY = WINDOW - 1  # first bar with a full volatility window
+HIGHS = [100.5, 101.5, 100.5, 101.5]  # std 0.577: SL/TP steps of ~0.58 around a 100 entry
+
+def _frame(after):
+    """WINDOW bars closing at 100, then one (high, low) bar per horizon step after the entry."""
+    highs = HIGHS + [h for h, _ in after]
+    lows = [99.6] * WINDOW + [l for _, l in after]
+    return pd.DataFrame({"open": 100.0, "high": highs, "low": lows, "close": 100.0, "volume": 1.0})
+
+def _simulate(monkeypatch, side, after, confidence=0.7):
+    df = _frame(after)
+    action = np.full(len(df), "HOLD", dtype=object)
+    action[ENTRY] = side
+    monkeypatch.setattr(zpt_backtest, "signal_arrays",
+                        lambda cols, volume_window=None: (action[None], np.full((1, len(df)), confidence)))
+    return zpt_backtest.simulate(df, horizon=len(after), window=WINDOW)
+
+@pytest.mark.parametrize("side, after, outcome, reached", [
+    # LONG: SL 99.42, TP1 100.58, TP2 101.15, TP3 101.73
+    ("LONG", [(100.7, 99.8), (101.3, 99.9), (100.2, 99.9)], 1, 2),
+    ("LONG", [(101.0, 99.0), (103.0, 99.9), (100.2, 99.9)], 0, 0),  # TP1 and SL in one bar: a loss
+    ("LONG", [(100.2, 99.0), (103.0, 99.9), (100.2, 99.9)], 0, 0),
+    ("LONG", [(100.3, 99.8), (100.4, 99.7), (100.2, 99.9)], -1, 0),
+    ("LONG", [(103.0, 99.8), (100.4, 99.7), (100.2, 99.9)], 1, 3),  # five levels crossed, three offered
+    # SHORT, mirrored: SL 100.58, TP1 99.42, TP2 98.85
+    ("SHORT", [(100.2, 99.3), (100.4, 98.8), (100.2, 99.9)], 1, 2),
+    ("SHORT", [(100.8, 99.2), (100.4, 97.0), (100.2, 99.9)], 0, 0),  # TP1 and SL in one bar: a loss
+    ("SHORT", [(100.7, 99.9), (100.0, 99.0), (100.2, 99.9)], 0, 0),
+    ("SHORT", [(100.3, 99.8), (100.4, 99.7), (100.2, 99.9)], -1, 0),
+])
+def test_simulate_resolves_trades(monkeypatch, side, after, outcome, reached):
+    trades = _simulate(monkeypatch, side, after)
+    assert list(trades["side"]) == [1.0 if side == "LONG" else -1.0]
+    assert list(trades["outcome"]) == [outcome]
+    assert list(trades["tp_reached"]) == [reached]
+    assert list(trades["confidence"]) == [0.7]
+
+def test_high_confidence_offers_all_levels(monkeypatch):
+    trades = _simulate(monkeypatch, "LONG", [(103.0, 99.8), (100.4, 99.7), (100.2, 99.9)], confidence=0.95)
+    assert list(trades["tp_reached"]) == [5]
+
+def test_entries_without_a_full_horizon_are_skipped(monkeypatch):
+    df = _frame([(100.7, 99.8), (101.3, 99.9)])
+    action = np.full(len(df), "LONG", dtype=object)
+    monkeypatch.setattr(zpt_backtest, "signal_arrays",
+                        lambda cols, volume_window=None: (action[None], np.full((1, len(df)), 0.7)))
+    trades = zpt_backtest.simulate(df, horizon=2, window=WINDOW)
+    assert len(trades["outcome"]) == 1  # only the first full-window bar has two bars ahead
+
+def test_synthetic_source_runs_offline():
+    report = zpt_backtest.run(["SYN000USDT"], "synthetic", timeframes=("15m", "1h"), bars=3000, workers=1)
+    assert set(report) == {"15m", "1h"}
+    assert report["15m"]["trades"] > 0
@@ -0,0 +1,80 @@
+"""CandleStore: incremental refreshes fetch only the new bars and write each closed bar to disk once."""
+import threading
+import time
+
+import pandas as pd
+
+from utils.candle_store import CandleStore, klines_to_frame
+
+BAR_MS = 60_000
+
+class Exchange:
+    """1m klines up to the current (forming) bar; records each call's limit and start_time."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbol, interval, limit, start_time=None):
+        self.calls.append((limit, start_time))
+        forming = int(time.time() * 1000) // BAR_MS * BAR_MS
+        first = forming - (limit - 1) * BAR_MS if start_time is None else start_time
+        opens = list(range(first, forming + 1, BAR_MS))[:limit]
+        return klines_to_frame([[t, 1, 2, 0.5, 1.5, 10, t + BAR_MS - 1, 15, 3, 5, 7, "0"] for t in opens])
+
+class Disk:
+    def __init__(self, rows=None):
+        self.frame = klines_to_frame(rows or [])
+        self.appends = []
+
+    def load(self, name):
+        return self.frame
+
+    def append(self, name, df):
+        self.appends.append(df)
+
+def test_refresh_fetches_only_new_bars():
+    exchange = Exchange()
+    store = CandleStore(exchange, max_bars=1000, min_refresh=0)
+    assert len(store.get("BTCUSDT", "1m", 100)) == 100
+    store.get("BTCUSDT", "1m", 100)
+    limit, start = exchange.calls[-1]
+    assert start is not None and limit <= 3  # the forming bar (+ one that may have closed meanwhile)
+
+def test_only_new_closed_bars_are_persisted():
+    disk = Disk()
+    store = CandleStore(Exchange(), max_bars=1000, min_refresh=0, disk=disk)
+    for _ in range(5):
+        store.get("BTCUSDT", "1m", 100)
+    written = pd.concat(disk.appends)
+    now = int(time.time() * 1000)
+    assert (written["close_time"] < now).all()
+    assert written["open_time"].is_unique
+    assert len(disk.appends) <= 2  # the first download, and a bar closing during the test at most
+
+def test_warm_start_skips_bars_already_on_disk():
+    forming = int(time.time() * 1000) // BAR_MS * BAR_MS
+    rows = [[t, 1, 2, 0.5, 1.5, 10, t + BAR_MS - 1, 15, 3, 5, 7, "0"]
+            for t in range(forming - 200 * BAR_MS, forming - 5 * BAR_MS + 1, BAR_MS)]
+    disk = Disk(rows)
+    exchange = Exchange()
+    store = CandleStore(exchange, max_bars=1000, min_refresh=0, disk=disk)
+    df = store.get("BTCUSDT", "1m", 100)
+    assert exchange.calls[0][0] <= 8 and exchange.calls[0][1] == forming - 4 * BAR_MS
+    assert int(df["open_time"].iloc[-1]) >= forming
+    written = pd.concat(disk.appends)
+    assert written["open_time"].min() == forming - 4 * BAR_MS
+
+def test_one_lock_per_key_across_threads():
+    store = CandleStore(Exchange())
+    locks = []
+    barrier = threading.Barrier(8)
+
+    def grab():
+        barrier.wait()
+        locks.append(store._lock(("BTCUSDT", "1m")))
+    threads = [threading.Thread(target=grab) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(lock) for lock in locks}) == 1
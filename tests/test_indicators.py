@@ -0,0 +1,52 @@
+"""utils.indicators parity with the `ta` library and between its batch and incremental paths."""
+import numpy as np
+import pandas as pd
+import pytest
+from ta.momentum import RSIIndicator
+from ta.trend import MACD
+from ta.volatility import BollingerBands
+
+from utils.indicators import IndicatorState, compute_indicators, stack
+
+def _walk(n, seed, start=100.0):
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+# Different lengths (right-aligned by stack), a series shorter than MACD's slow window and a flat one
+CLOSES = [_walk(300, 1), _walk(120, 2, 3000.0), _walk(40, 3, 0.15), _walk(18, 4), np.full(60, 42.0)]
+VOLUMES = [np.random.default_rng(10 + i).uniform(50, 150, len(c)) for i, c in enumerate(CLOSES)]
+
+@pytest.fixture(scope="module")
+def batch():
+    return compute_indicators(stack(CLOSES), stack(VOLUMES))
+
+def _reference(close):
+    s = pd.Series(close)
+    macd = MACD(s)
+    return {
+        "rsi": RSIIndicator(s).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "bb_width": BollingerBands(s).bollinger_wband(),
+    }
+
+@pytest.mark.parametrize("row", range(len(CLOSES)))
+def test_matches_ta(batch, row):
+    n = len(CLOSES[row])
+    for name, expected in _reference(CLOSES[row]).items():
+        got = batch[name][row, -n:]
+        np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+        assert np.isnan(batch[name][row, :-n]).all()  # padding stays empty
+    assert batch["volume_mean"][row] == pytest.approx(VOLUMES[row].mean())
+
+def test_incremental_update_matches_full_recompute():
+    close, volume = stack(CLOSES), stack(VOLUMES)
+    warmup = 250
+    state = IndicatorState.from_history(close[:, :warmup], volume[:, :warmup])
+    for t in range(warmup, close.shape[1]):
+        step = state.update(close[:, t], volume[:, t])
+        full = compute_indicators(close[:, :t + 1], volume[:, :t + 1])
+        for name in ("rsi", "macd", "macd_signal", "bb_width"):
+            np.testing.assert_allclose(step[name], full[name][:, -1], rtol=1e-9, atol=1e-9, equal_nan=True,
+                                       err_msg=f"{name} at bar {t}")
+        np.testing.assert_allclose(step["volume_mean"], full["volume_mean"], rtol=1e-12)
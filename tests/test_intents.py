@@ -0,0 +1,64 @@
+import pytest
+
+from utils.intents import IntentRouter
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "DOGEUSDT", "SHIBUSDT", "PEPEUSDT", "SOLUSDT", "SUIUSDT", "APEUSDT",
+           "GOATUSDT", "VIRTUALUSDT", "DOGSUSDT", "ONEUSDT", "HOTUSDT", "AIUSDT", "PINUSDT", "BARUSDT"]
+CORE = ["XAUUSD", "BTC", "ETH", "DOGE", "SHIB", "PEPE"]
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter(SYMBOLS, core=CORE)
+
+@pytest.mark.parametrize("text, intent, asset", [
+    ("btc", "signal", "BTC"),
+    ("ETH signal", "signal", "ETH"),
+    ("gold analysis please", "signal", "XAUUSD"),
+    ("$SUI", "signal", "SUI"),
+    ("SUI", "signal", "SUI"),
+    ("suiusdt", "signal", "SUI"),
+    ("sui signal", "signal", "SUI"),
+    ("can you give me a signal for $APE today?", "signal", "APE"),
+    ("shiba inu setup", "signal", "SHIB"),
+    ("signal", "signal", None),
+    ("lot size for £500", "lot_size", None),
+    ("calculate lots 250", "lot_size", None),
+    ("what lot size should I use with $1000?", "lot_size", None),
+    ("memes", "shitcoin", None),
+    ("scan meme coins", "shitcoin", None),
+    ("give me some meme coin signals for today", "shitcoin", None),
+    ("help", "help", None),
+    ("what can you do", "help", None),
+    ("help BTC", "signal", "BTC"),
+    ("what about btc", "signal", "BTC"),
+    ("how is gold doing right now", "signal", "XAUUSD"),
+    ("what do you think about BTC in the long run", "signal", "BTC"),
+    ("is ethereum going to recover after the merge or should I wait", "signal", "ETH"),
+    ("find me a good meme coin", "shitcoin", None),
+    ("any shitcoin worth buying today?", "shitcoin", None),
+])
+def test_routes_strong_evidence(router, text, intent, asset):
+    assert router.classify(text) == {"intent": intent, "asset": asset}
+
+@pytest.mark.parametrize("text", [
+    "I lost lots of money yesterday",
+    "please help me understand what a pin bar is",
+    "what is a trading signal?",
+    "what is a lot size?",
+    "the goat is great",
+    "virtual reality",
+    "what do you think of dogs",
+    "explain the movie Ape escape",
+    "is it raining in Sui?",
+    "What are the top memes today",
+    "one more hot take on ai",
+    "hello there",
+])
+def test_ordinary_chat_goes_to_llm(router, text):
+    assert router.classify(text) == {"intent": "chat", "asset": None}
+
+def test_is_command():
+    assert IntentRouter.is_command("eth signal")
+    assert not IntentRouter.is_command("what is eth")
+    assert not IntentRouter.is_command("give me a signal for eth today")
+    assert not IntentRouter.is_command("")
@@ -0,0 +1,92 @@
+"""zpt_llm against the local fake OpenAI server (bench/fake_upstream.py)."""
+import asyncio
+import time
+from contextlib import aclosing
+
+import pytest
+
+import zpt_llm
+from bench.fake_upstream import FakeUpstream
+
+LATENCY = 0.2
+
+class Recorder:
+    """Stands in for utils.metrics: keeps the llm_in_flight peak and the outcome counters."""
+
+    def __init__(self):
+        self.peak = 0
+        self.outcomes = []
+
+    def set_gauge(self, name, value, **labels):
+        if name == "llm_in_flight":
+            self.peak = max(self.peak, value)
+
+    def inc(self, name, value=1, **labels):
+        if name == "upstream_requests_total":
+            self.outcomes.append(labels["outcome"])
+
+@pytest.fixture(scope="module")
+def upstream():
+    server = FakeUpstream(latency_ms=LATENCY * 1000, token_ms=20).start()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENAI_BASE_URL", f"{server.url}/v1")
+        mp.setenv("OPENAI_API_KEY", "test")
+        mp.setattr(zpt_llm, "_client", None)
+        yield server
+    server.stop()
+
+@pytest.fixture
+def recorder(monkeypatch):
+    rec = Recorder()
+    monkeypatch.setattr(zpt_llm, "metrics", rec)
+    return rec
+
+def _calls(upstream):
+    return upstream.requests.get("/v1/chat/completions", 0)
+
+async def _gather(*calls):
+    start = time.monotonic()
+    answers = await asyncio.gather(*calls)
+    return answers, time.monotonic() - start
+
+def test_identical_questions_share_one_call(upstream, recorder):
+    before, hits = _calls(upstream), zpt_llm.cache_stats()["hits"]
+    answers, _ = asyncio.run(_gather(*(zpt_llm.complete("What is a pin bar?", user_id=i) for i in range(5))))
+    assert len(set(answers)) == 1 and answers[0]
+    assert _calls(upstream) - before == 1
+
+    async def streamed():
+        return [text async for text in zpt_llm.stream("What is a pin bar?", user_id=9)]
+    assert asyncio.run(streamed()) == [answers[0]]  # served whole from the cache
+    assert _calls(upstream) - before == 1
+    assert zpt_llm.cache_stats()["hits"] - hits == 1
+
+def test_anonymous_calls_only_take_the_global_cap(upstream, recorder):
+    calls = (zpt_llm.complete(f"explain #{i}", cache=False) for i in range(4))
+    _, elapsed = asyncio.run(_gather(*calls))
+    assert recorder.peak == 4
+    assert elapsed < 2 * LATENCY
+
+def test_per_user_and_global_caps(upstream, recorder, monkeypatch):
+    monkeypatch.setattr(zpt_llm, "LLM_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(zpt_llm, "_global_slots", None)
+    _, elapsed = asyncio.run(_gather(*(zpt_llm.complete(f"same user #{i}", user_id=1, cache=False)
+                                       for i in range(3))))
+    assert recorder.peak == 1
+    assert elapsed >= 3 * LATENCY
+    recorder.peak = 0
+    asyncio.run(_gather(*(zpt_llm.complete(f"user #{i}", user_id=i, cache=False) for i in range(4))))
+    assert recorder.peak == 2
+    assert zpt_llm._user_slots == {}
+
+def test_closing_a_stream_cancels_the_request(upstream, recorder):
+    async def first_token():
+        async with aclosing(zpt_llm.stream("Tell me a long story", user_id=1, cache=False)) as tokens:
+            async for text in tokens:
+                return text
+    assert asyncio.run(first_token())
+    deadline = time.monotonic() + 2
+    while "cancelled" not in recorder.outcomes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert recorder.outcomes == ["cancelled"]
+    assert zpt_llm._in_flight == 0
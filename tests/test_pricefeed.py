@@ -0,0 +1,27 @@
+"""Price fallback chain against bench/fake_upstream: what does and doesn't trip the breakers."""
+import pytest
+
+import zpt_pricefeed as pf
+from bench.fake_upstream import FakeUpstream
+from utils import breaker
+
+@pytest.fixture
+def upstream(monkeypatch):
+    server = FakeUpstream().start()
+    monkeypatch.setattr(pf, "BINANCE_API_URL", server.url)
+    monkeypatch.setattr(pf, "BYBIT_API_URL", server.url)
+    monkeypatch.setattr(breaker, "_registry", {})
+    yield server
+    server.stop()
+
+def test_unlisted_symbols_leave_breakers_closed(upstream):
+    for typo in ["FOOBAR", "TYPO", "NOPE", "ZZZ"]:
+        assert pf.get_price(typo) is None
+    assert {s: r["state"] for s, r in breaker.breaker_report().items()} == {"binance": "closed", "bybit": "closed"}
+    assert pf.get_price("BTC") is not None
+
+def test_failing_exchanges_open_breakers(upstream):
+    upstream.error_rate = 1.0
+    for symbol in ["ETH", "DOGE", "SHIB"]:
+        assert pf.get_price(symbol) is None
+    assert {s: r["state"] for s, r in breaker.breaker_report().items()} == {"binance": "open", "bybit": "open"}
@@ -0,0 +1,57 @@
+"""QuoteCache: TTL hits, coalesced misses and the bounded stale fallback."""
+import asyncio
+
+from utils import quote_cache
+from utils.quote_cache import QuoteCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+def _cache(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(quote_cache, "time", clock)
+    return QuoteCache(ttls={"binance": 2.0}, **kwargs), clock
+
+def _fetcher(*values):
+    values = list(values)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return values.pop(0), "binance"
+    return fetch, calls
+
+def test_fresh_hits_and_coalesced_misses(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    fetch, calls = _fetcher(100.0)
+
+    async def both():
+        return await asyncio.gather(cache.get("BTCUSDT", fetch), cache.get("BTCUSDT", fetch))
+    assert asyncio.run(both()) == [100.0, 100.0]
+    clock.now += 1.0
+    assert asyncio.run(cache.get("BTCUSDT", fetch)) == 100.0
+    assert len(calls) == 1
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2, "stale": 0, "stale_served": 0, "coalesced": 1}
+
+def test_failed_refetch_serves_stale_quote_within_limit(monkeypatch):
+    cache, clock = _cache(monkeypatch, max_stale=10)
+    fetch, calls = _fetcher(100.0, None, None, 101.0)
+    assert asyncio.run(cache.get("BTCUSDT", fetch)) == 100.0
+    clock.now += 5.0  # expired, 2.5 TTLs old
+    assert asyncio.run(cache.get("BTCUSDT", fetch)) == 100.0
+    assert cache.stats()["stale_served"] == 1
+    clock.now += 20.0  # 12.5 TTLs old: past max_stale, no quote beats a wrong one
+    assert asyncio.run(cache.get("BTCUSDT", fetch)) is None
+    assert cache.stats()["stale_served"] == 1
+    assert asyncio.run(cache.get("BTCUSDT", fetch)) == 101.0  # recovers once the upstream does
+    assert len(calls) == 4 and cache.stats()["stale"] == 3
+
+def test_failed_first_fetch_returns_none(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    fetch, _ = _fetcher(None)
+    assert asyncio.run(cache.get("BTCUSDT", fetch)) is None
+    assert cache.stats()["stale_served"] == 0
@@ -0,0 +1,29 @@
+import time
+
+from zpt_replies import MAX_MESSAGE_CHARS, render_dashboard
+
+SIGNALS = {"BTC": {"action": "LONG", "confidence": 0.91, "price": 60000.0},
+           "ETH": {"action": "HOLD", "confidence": 0.8, "price": 3000.0},
+           "XAUUSD": {"action": "SHORT", "confidence": 0.95, "price": 2400.0}}
+
+def _snapshot(health):
+    return {"version": 7, "updated_at": time.time(), "health": health, "signals": SIGNALS}
+
+def test_signals_come_first_and_health_is_flat():
+    text = render_dashboard(_snapshot({"BTC": 60000.0, "uptime_s": 3725, "stages": {"fetch": {"count": 12}},
+                                       "breakers": {"binance": {"state": "closed"}, "bybit": {"state": "open"}}}))
+    assert text.startswith("*BTC* signal: LONG, Confidence: 91%\n*ETH* signal")
+    assert "stages" not in text and "{" not in text
+    assert "uptime: 1h 02m" in text and "data sources: binance ok, bybit down" in text
+    assert "XAUUSD: unavailable" in text
+
+def test_oversized_health_is_trimmed_by_whole_lines():
+    # Hundreds of breakers whose names all need Markdown escapes
+    breakers = {f"source_{i}_with_underscores": {"state": "open"} for i in range(400)}
+    text = render_dashboard(_snapshot({"uptime_s": 5, "breakers": breakers}))
+    assert len(text) <= MAX_MESSAGE_CHARS
+    assert all(f"*{asset}* signal" in text for asset in ("BTC", "ETH", "XAUUSD"))
+    assert text.endswith("_Updated 0s ago (v7)_")
+    health = text.split("*System Health:*\n", 1)[1].splitlines()[:-1]
+    assert health[-1] == "…"
+    assert all(not line.endswith("\\") for line in health)
@@ -0,0 +1,56 @@
+"""The meme scan scores every coin and timeframe in one vectorized pass."""
+import numpy as np
+
+import zpt_analysis
+import zpt_scanner
+from zpt_backtest import synthetic_klines
+
+COINS = ["DOGEUSDT", "SHIBUSDT", "PEPEUSDT", "NEW1USDT"]
+
+def _frames(coin, bars):
+    return {tf: synthetic_klines(coin, tf, bars, end_ms=1_717_000_000_000) for tf in ("15m", "1h", "4h")}
+
+def test_batch_matches_scoring_each_symbol_alone():
+    # New listings have shorter histories than the rest of the batch
+    frames = {coin: _frames(coin, bars) for coin, bars in zip(COINS, (100, 100, 60, 30))}
+    batch = zpt_analysis.confluence_batch(frames)
+    for coin in COINS:
+        alone = zpt_analysis.confluence_batch({coin: frames[coin]})[coin]
+        assert batch[coin]["action"] == alone["action"]
+        assert np.isclose(batch[coin]["confidence"], alone["confidence"])
+        assert batch[coin]["details"] == alone["details"]
+
+def test_scan_makes_one_indicator_pass(monkeypatch):
+    passes = []
+    signal_arrays = zpt_analysis.signal_arrays
+
+    def counting(cols, **kwargs):
+        passes.append(cols["close"].shape)
+        return signal_arrays(cols, **kwargs)
+    monkeypatch.setattr(zpt_analysis, "signal_arrays", counting)
+    monkeypatch.setattr(zpt_analysis, "confluence_frames", lambda coin: _frames(coin, 100))
+    monkeypatch.setattr(zpt_scanner, "get_prices", lambda coins: {})
+    items = list(zpt_scanner.iter_scan(COINS))
+    assert passes == [(len(COINS) * 3, 100)]
+    assert [done for done, _, _ in items[:len(COINS) - 1]] == list(range(1, len(COINS)))
+    assert all(total == len(COINS) for _, total, _ in items)
+
+def test_only_coins_past_the_gate_are_built(monkeypatch):
+    confidence = {"DOGEUSDT": 0.96, "SHIBUSDT": 0.90, "PEPEUSDT": 0.97}
+    batches, built = [], []
+
+    def batch(frames):
+        batches.append(sorted(frames))
+        return {c: {"action": "LONG", "confidence": confidence[c], "details": {}} for c in frames}
+
+    def build(coin, mtf, price, user_data):
+        built.append(coin)
+        return {"symbol": coin, "action": mtf["action"], "confidence": mtf["confidence"]}
+    monkeypatch.setattr(zpt_analysis, "confluence_frames", lambda coin: {})
+    monkeypatch.setattr(zpt_analysis, "confluence_batch", batch)
+    monkeypatch.setattr(zpt_analysis, "build_signal", build)
+    monkeypatch.setattr(zpt_scanner, "get_prices", lambda coins: {})
+    signals = [res for _, _, res in zpt_scanner.iter_scan(list(confidence)) if res is not None]
+    assert batches == [sorted(confidence)]
+    assert sorted(built) == ["DOGEUSDT", "PEPEUSDT"]
+    assert {s["symbol"]: s["trend"] for s in signals} == {"DOGEUSDT": "long-term", "PEPEUSDT": "long-term"}
@@ -0,0 +1,91 @@
+"""StreamFeed against bench/fake_stream.FakeStream, a local websocket stand-in for both exchanges."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bench.fake_stream import FakeStream
+from utils import stream as stream_module
+from utils.stream import StreamFeed
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+@pytest.fixture
+def run_feed(monkeypatch):
+    """Start a StreamFeed on its own engine loop against a FakeStream; both are stopped afterwards."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    started = []
+
+    def run(**fake_options):
+        fake = FakeStream(interval_s=0.05, **fake_options).start()
+        monkeypatch.setattr(stream_module, "BINANCE_WS_URL", fake.binance_url)
+        monkeypatch.setattr(stream_module, "BYBIT_WS_URL", fake.bybit_url)
+        feed = StreamFeed()
+        connects = []
+
+        async def on_connect(source, symbols):
+            connects.append((source, symbols))
+        feed.on_connect = on_connect
+        feed.start(loop, SYMBOLS, intervals=("15m",))
+        started.append((feed, fake))
+        return feed, fake, connects
+
+    yield run
+
+    async def drain():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for feed, fake in started:
+        feed.stop()
+        fake.stop()
+    asyncio.run_coroutine_threadsafe(drain(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+def test_subscribes_and_serves_quotes_and_candles(run_feed):
+    feed, fake, connects = run_feed()
+    _wait_for(lambda: all(feed.is_live(s) for s in ("binance", "bybit")))
+    assert sorted(fake.subscriptions) == [
+        ("binance", ["btcusdt@miniTicker", "ethusdt@miniTicker", "btcusdt@kline_15m", "ethusdt@kline_15m"]),
+        ("bybit", ["tickers.BTCUSDT", "tickers.ETHUSDT"]),
+    ]
+    assert sorted(connects) == [("binance", SYMBOLS), ("bybit", SYMBOLS)]
+
+    _wait_for(lambda: all(feed.quote(s) for s in SYMBOLS))
+    assert {feed.quotes[s][2] for s in SYMBOLS} <= {"binance", "bybit"}
+    _wait_for(lambda: feed.candles("BTCUSDT", "15m") is not None)
+    candles = feed.candles("BTCUSDT", "15m")
+    assert len(candles) == 1 and candles["open_time"].iloc[0] % (15 * 60_000) == 0
+
+    # Quotes keep updating while connected
+    first = feed.quotes["BTCUSDT"][1]
+    _wait_for(lambda: feed.quotes["BTCUSDT"][1] > first)
+    assert feed.reconnects == 0
+
+def test_reconnects_after_a_dropped_socket(run_feed):
+    feed, fake, connects = run_feed(drop_after=4)
+    _wait_for(lambda: feed.reconnects >= 2)  # both sources saw their socket close
+    _wait_for(lambda: sum(source == "binance" for source, _ in connects) >= 2)
+    _wait_for(lambda: sum(source == "bybit" for source, _ in connects) >= 2)
+    assert fake.connections >= 4
+    # Every reconnect subscribes again
+    assert [s for s in fake.subscriptions if s[0] == "bybit"][-1] == ("bybit", ["tickers.BTCUSDT", "tickers.ETHUSDT"])
+    # Quotes flow again on the new connections
+    _wait_for(lambda: feed.is_live("binance") and feed.quote("BTCUSDT") is not None)
+
+def test_a_dropped_source_stops_serving(run_feed):
+    feed, fake, _ = run_feed()
+    _wait_for(lambda: feed.is_live("binance") and feed.quote("BTCUSDT") is not None)
+    fake.stop()  # the server closes every connection; the feed backs off before retrying
+    _wait_for(lambda: not feed.is_live("binance") and not feed.is_live("bybit"))
+    assert feed.quote("BTCUSDT") is None
+    assert feed.candles("BTCUSDT", "15m") is None
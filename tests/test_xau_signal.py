@@ -0,0 +1,68 @@
+"""fetch_daily_ohlc only downloads the days of the requested window the cache lacks."""
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+import xau_signal
+from utils.candle_cache import CandleCache
+
+CLOSED = {"2024-01-06", "2024-01-07"}  # a weekend: the API has no bars for it
+
+@pytest.fixture
+def fetches(monkeypatch, tmp_path):
+    """Record (start, end) per upstream call; every trading day gets a bar closing at its day of month."""
+    calls = []
+
+    def fake_timeseries(symbol, start_date, end_date):
+        calls.append((start_date, end_date))
+        days = [d for d in pd.date_range(start_date, end_date, freq="D") if d.strftime("%Y-%m-%d") not in CLOSED]
+        if not days:
+            return pd.DataFrame(columns=xau_signal.DAILY_COLUMNS)
+        days = pd.DatetimeIndex(days)
+        return pd.DataFrame({"date": days.strftime("%Y-%m-%d"), "open": 1.0, "high": 2.0, "low": 0.5,
+                             "close": days.day.astype(float)})
+    monkeypatch.setattr(xau_signal, "_fetch_timeseries", fake_timeseries)
+    monkeypatch.setattr(xau_signal, "_daily_cache", CandleCache(root=str(tmp_path)))
+    return calls
+
+def test_fills_gaps_between_cached_ranges(fetches):
+    xau_signal.fetch_daily_ohlc("XAU", "2024-01-01", "2024-01-03")
+    xau_signal.fetch_daily_ohlc("XAU", "2024-01-05", "2024-01-05")
+    fetches.clear()
+    df = xau_signal.fetch_daily_ohlc("XAU", "2024-01-01", "2024-01-05")
+    assert fetches == [("2024-01-04", "2024-01-04")]
+    assert list(df["date"]) == [f"2024-01-0{d}" for d in range(1, 6)]
+    assert list(df["close"]) == [float(d) for d in range(1, 6)]
+
+def test_extends_both_ends_of_the_cache(fetches):
+    xau_signal.fetch_daily_ohlc("XAU", "2024-01-03", "2024-01-04")
+    fetches.clear()
+    df = xau_signal.fetch_daily_ohlc("XAU", "2024-01-01", "2024-01-05")
+    assert fetches == [("2024-01-01", "2024-01-02"), ("2024-01-05", "2024-01-05")]
+    assert len(df) == 5
+
+def test_days_without_bars_are_not_refetched(fetches):
+    df = xau_signal.fetch_daily_ohlc("XAU", "2024-01-04", "2024-01-09")
+    assert list(df["date"]) == ["2024-01-04", "2024-01-05", "2024-01-08", "2024-01-09"]
+    fetches.clear()
+    df = xau_signal.fetch_daily_ohlc("XAU", "2024-01-04", "2024-01-09")
+    assert fetches == []
+    assert list(df["date"]) == ["2024-01-04", "2024-01-05", "2024-01-08", "2024-01-09"]
+
+def test_the_forming_day_is_always_refetched(fetches):
+    today = datetime.now(timezone.utc).date()
+    start = (today - timedelta(days=2)).isoformat()
+    xau_signal.fetch_daily_ohlc("XAU", start, today.isoformat())
+    fetches.clear()
+    xau_signal.fetch_daily_ohlc("XAU", start, today.isoformat())
+    assert fetches == [(today.isoformat(), today.isoformat())]
+
+def test_missing_ranges():
+    today = "2024-02-01"
+    assert xau_signal._missing_ranges([], "2024-01-01", "2024-01-03", today) == [("2024-01-01", "2024-01-03")]
+    cached = ["2024-01-01", "2024-01-02", "2024-01-05", "2024-01-09"]
+    assert xau_signal._missing_ranges(cached, "2024-01-01", "2024-01-06", today) == [("2024-01-03", "2024-01-04"),
+                                                                                     ("2024-01-06", "2024-01-06")]
+    assert xau_signal._missing_ranges(["2024-01-31", "2024-02-01"], "2024-01-31", "2024-02-01", today) == [
+        ("2024-02-01", "2024-02-01")]